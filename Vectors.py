@@ -1,5 +1,12 @@
 import math
-from typing import Self
+import operator
+import os
+from array import array
+from itertools import repeat
+from typing import Callable, Iterable, Self
+
+# set the VECTORS_TYPE_CHECKED environment variable to validate the arguments given to Vector2i while debugging
+TYPE_CHECKED: bool = bool(os.environ.get("VECTORS_TYPE_CHECKED"))
 
 
 class Vector2:
@@ -200,39 +207,81 @@ class Vector2:
 
 
 class Vector2i:
-	def __init__(self, x: float | int = 0.0, y: float | int = 0.0) -> None:
-		self._x: int = 0
-		self._y: int = 0
-		self.set(x, y)
+	"""
+	Immutable vector of 2 integers, meant to be used as a grid position and as a dict/set key.
+
+	The hash is computed once at creation. :meth:`of` returns a shared instance for each position, which makes
+	the positions of a grid cheap to create and fast to compare. At most :meth:`interned_limit` instances are shared,
+	the owner of a bigger grid raises the limit with :meth:`set_interned_limit`.
+	"""
+	__slots__ = ('_x', '_y', '_hash')
+	__interned: dict[tuple[int, int], 'Vector2i'] = {}
+	# positions of a 256 by 256 grid
+	DEFAULT_INTERNED_LIMIT = 1 << 16
+	__interned_limit: int = DEFAULT_INTERNED_LIMIT
+
+	def __init__(self, x: float | int = 0, y: float | int = 0) -> None:
+		if TYPE_CHECKED:
+			if not isinstance(x, float | int):
+				raise TypeError("Cannot assign " + x.__class__.__name__ + " to Vector2i.x")
+			if not isinstance(y, float | int):
+				raise TypeError("Cannot assign " + y.__class__.__name__ + " to Vector2i.y")
+		x = int(x)
+		y = int(y)
+		self._x: int = x
+		self._y: int = y
+		self._hash: int = hash((x, y))
+
+	@classmethod
+	def of(cls, x: int, y: int) -> Self:
+		"""
+		:return: the shared instance of the position (x, y). The instance is kept until :meth:`clear_interned`, or
+			until the limit of shared instances is reached
+		"""
+		vector = cls.__interned.get((x, y))
+		if vector is None:
+			interned = cls.__interned
+			if len(interned) >= cls.__interned_limit:
+				# cheaper than tracking the least recently used instances. The positions still in use are shared again
+				# on their next call, and comparing them to the former instances still works since it compares values
+				interned.clear()
+			vector = interned[x, y] = cls(x, y)
+		return vector
+
+	@classmethod
+	def clear_interned(cls) -> None:
+		cls.__interned.clear()
+
+	@classmethod
+	def interned_limit(cls) -> int:
+		return cls.__interned_limit
+
+	@classmethod
+	def set_interned_limit(cls, limit: int) -> None:
+		"""
+		:param limit: maximum number of instances shared by :meth:`of`, for instance a few times the number of nodes of
+			the grid in use
+		"""
+		Vector2i.__interned_limit = max(1, limit)
+		if len(cls.__interned) > limit:
+			cls.__interned.clear()
 
 	# region properties
 	@property
 	def x(self) -> int:
 		return self._x
 
-	@x.setter
-	def x(self, value: float | int) -> None:
-		if not isinstance(value, float | int):
-			raise TypeError("Cannot assign " + value.__class__.__name__ + "to Vector2i.x")
-		self._x = int(value)
-
 	@property
 	def y(self) -> int:
 		return self._y
 
-	@y.setter
-	def y(self, value: float | int) -> None:
-		if not isinstance(value, float | int):
-			raise TypeError("Cannot assign " + value.__class__.__name__ + "to Vector2i.y")
-		self._y = int(value)
-
 	# endregion properties
 
 	# region methods
 	def angle(self, v2: Self | Vector2, use_radian: bool = False) -> float:
 		if not isinstance(v2, Vector2 | Vector2i):
 			raise TypeError(f"Cannot calculate angle between Vector2i and {v2.__class__.__name__}")
-		if self.x == self.y == 0 or v2.x == v2.y == 0:
+		if self._x == self._y == 0 or v2.x == v2.y == 0:
 			return 0.0
 		if self == -v2:
 			return math.radians(180.0) if use_radian else 180.0
@@ -243,29 +292,27 @@ class Vector2i:
 	def dot(self, v2: Self | Vector2) -> float:
 		if not isinstance(v2, Vector2 | Vector2i):
 			raise TypeError(f"Can't use dot product between Vector2i and {v2.__class__.__name__}")
-		return self.x * v2.x + self.y * v2.y
+		return self._x * v2.x + self._y * v2.y
 
 	def magnitude(self) -> float:
-		return math.sqrt(self.x * self.x + self.y * self.y)
+		return math.sqrt(self._x * self._x + self._y * self._y)
 
 	def normalize(self) -> None:
-		if self != Vector2i(0, 0):
-			self.set(*(self / self.magnitude()))
+		raise TypeError("Vector2i is immutable, use normalized() instead")
 
 	def normalized(self) -> Self:
-		if self == Vector2i(0, 0):
-			return Vector2i(0, 0)
+		if self._x == self._y == 0:
+			return self
 		return self / self.magnitude()
 
 	def set(self, x: float | int, y: float | int) -> None:
-		self.x = int(x)
-		self.y = int(y)
+		raise TypeError("Vector2i is immutable, create a new one instead")
 
 	def sqr_magnitude(self) -> float:
-		return self.x * self.x + self.y * self.y
+		return self._x * self._x + self._y * self._y
 
 	def swap(self) -> Self:
-		return Vector2i(self.y, self.x)
+		return Vector2i(self._y, self._x)
 
 	# endregion methods
 
@@ -300,108 +347,226 @@ class Vector2i:
 	# endregion static_methods
 
 	# region magic_methods
+	# the in-place operators are not defined: `a += b` rebinds `a` to the result of `a + b`
 	def __neg__(self) -> Self:
-		return Vector2i(-self.x, -self.y)
+		return Vector2i(-self._x, -self._y)
 
 	def __add__(self, other: Self | Vector2 | float | int) -> Self:
 		if isinstance(other, Vector2i | Vector2):
-			return Vector2i(self.x + other.x, self.y + other.y)
+			return Vector2i(self._x + other.x, self._y + other.y)
 		elif isinstance(other, float | int):
-			return Vector2i(self.x + other, self.y + other)
+			return Vector2i(self._x + other, self._y + other)
 		else:
 			raise TypeError("Can't add Vector2i and " + other.__class__.__name__)
 
 	def __radd__(self, other: Self | Vector2 | float | int) -> Self:
 		return self.__add__(other)
 
-	def __iadd__(self, other: Self | Vector2 | float | int) -> Self:
+	def __sub__(self, other: Self | Vector2 | float | int) -> Self:
 		if isinstance(other, Vector2i | Vector2):
-			self.set(self.x + other.x, self.y + other.y)
+			return Vector2i(self._x - other.x, self._y - other.y)
 		elif isinstance(other, float | int):
-			self.set(self.x + other, self.y + other)
+			return Vector2i(self._x - other, self._y - other)
 		else:
-			raise TypeError("Can't add Vector2i and " + other.__class__.__name__)
-		return self
-
-	def __sub__(self, other: Self | Vector2 | float | int) -> Self:
-		if not isinstance(other, Vector2i | Vector2 | float | int):
 			raise TypeError("Can't substract " + other.__class__.__name__ + " from a Vector2i")
-		return self.__add__(-other)
-
-	def __isub__(self, other: Self | Vector2 | float | int) -> Self:
-		if not isinstance(other, Vector2i | Vector2 | float | int):
-			raise TypeError("Can't substract " + other.__class__.__name__ + " from a Vector2i")
-		self.__iadd__(-other)
-		return self
 
 	def __mul__(self, other: Self | Vector2 | float | int) -> Self:
 		if isinstance(other, Vector2i | Vector2):
-			return Vector2i(self.x * other.x, self.y * other.y)
+			return Vector2i(self._x * other.x, self._y * other.y)
 		elif isinstance(other, float | int):
-			return Vector2i(self.x * other, self.y * other)
+			return Vector2i(self._x * other, self._y * other)
 		else:
 			raise TypeError("Can't multiply Vector2i and " + other.__class__.__name__)
 
 	def __rmul__(self, other: Self | Vector2 | float | int) -> Self:
 		return self.__mul__(other)
 
-	def __imul__(self, other: Self | Vector2 | float | int) -> Self:
-		if isinstance(other, Vector2i | Vector2):
-			self.set(self.x * other.x, self.y * other.y)
-		elif isinstance(other, float | int):
-			self.set(self.x * other, self.y * other)
-		else:
-			raise TypeError("Can't multiply Vector2i and " + other.__class__.__name__)
-		return self
-
 	def __truediv__(self, other: Self | Vector2 | float | int) -> Self:
 		if isinstance(other, Vector2i | Vector2):
-			return Vector2i(self.x // other.x, self.y // other.y)
+			return Vector2i(self._x // other.x, self._y // other.y)
 		elif isinstance(other, float | int):
-			return Vector2i(self.x // other, self.y // other)
+			return Vector2i(self._x // other, self._y // other)
 		else:
 			raise TypeError("Can't divide Vector2i with " + other.__class__.__name__)
 
-	def __itruediv__(self, other: Self | Vector2 | float | int) -> Self:
-		if isinstance(other, Vector2):
-			self.set(self.x / other.x, self.y / other.y)
-		elif isinstance(other, float | int):
-			self.set(self.x / other, self.y / other)
-		else:
-			raise TypeError("Can't divide Vector2i with " + other.__class__.__name__)
-		return self
-
 	def __floordiv__(self, other: Self | Vector2 | float | int) -> Self:
 		return self.__truediv__(other)
 
-	def __ifloordiv__(self, other: Self | Vector2 | float | int) -> Self:
-		self.__itruediv__(other)
-		return self
-
 	def __iter__(self):
-		return [self.x, self.y].__iter__()
+		return iter((self._x, self._y))
 
 	def __getitem__(self, item: int) -> int:
 		if item == 'x':
-			return self.x
+			return self._x
 		if item == 'y':
-			return self.y
+			return self._y
 		if isinstance(item, int):
 			if -2 <= item <= 1:
-				return (self.x, self.y)[item]
+				return (self._x, self._y)[item]
 			raise IndexError
 		raise TypeError("Invalid index. Got " + item.__class__.__name__ + " instead of int")
 
 	def __eq__(self, other) -> bool:
-		return (other is self) or isinstance(other, Vector2i | Vector2) and math.isclose(self.x, other.x) and math.isclose(self.y, other.y)
+		if other.__class__ is Vector2i:
+			return self._x == other._x and self._y == other._y
+		return isinstance(other, Vector2) and math.isclose(self._x, other.x) and math.isclose(self._y, other.y)
 
 	def __repr__(self) -> str:
-		return f"Vector2i({self.x}, {self.y})"
+		return f"Vector2i({self._x}, {self._y})"
 
 	def __str__(self) -> str:
-		return f"Vector2i({self.x}, {self.y})"
+		return f"Vector2i({self._x}, {self._y})"
 
 	def __hash__(self):
-		return hash((self.x, self.y))
+		return self._hash
 	# endregion magic_methods
 	pass
+
+
+class Vector2Array:
+	"""
+	Sequence of Vector2 stored as 2 arrays of doubles, with the Vector2 operations applied to every element.
+
+	Operands can be another array of the same length, a single vector applied to every element, or a number. The arrays
+	take a fraction of the memory of a list of Vector2, and an operation maps an operator over them without creating a
+	Vector2 per element, which is about 10 times faster than a list of Vector2. It still runs element by element: it is
+	not vectorized the way numpy is.
+	"""
+	__slots__ = ('x', 'y')
+	_typecode: str = 'd'
+	_division: Callable = staticmethod(operator.truediv)
+
+	def __init__(self, x: Iterable[float | int] = (), y: Iterable[float | int] = ()) -> None:
+		self.x: array = array(self._typecode, x)
+		self.y: array = array(self._typecode, y)
+		if len(self.x) != len(self.y):
+			raise ValueError(f"Cannot create {self.__class__.__name__} from {len(self.x)} x and {len(self.y)} y")
+
+	@classmethod
+	def from_vectors(cls, vectors: Iterable[Vector2 | Vector2i]) -> Self:
+		vectors = list(vectors)
+		return cls([v.x for v in vectors], [v.y for v in vectors])
+
+	# region methods
+	def _operands(self, other, operation: str) -> tuple[Iterable, Iterable]:
+		if isinstance(other, Vector2Array):
+			if len(other) != len(self):
+				raise ValueError(f"Can't {operation} arrays of {len(self)} and {len(other)} vectors")
+			return other.x, other.y
+		if isinstance(other, Vector2 | Vector2i):
+			return repeat(other.x), repeat(other.y)
+		if isinstance(other, float | int):
+			return repeat(other), repeat(other)
+		raise TypeError(f"Can't {operation} {self.__class__.__name__} and {other.__class__.__name__}")
+
+	def _result(self, x: Iterable, y: Iterable, other=None) -> 'Vector2Array':
+		return Vector2Array(x, y)
+
+	def _apply(self, function: Callable, other, operation: str) -> Self:
+		other_x, other_y = self._operands(other, operation)
+		return self._result(map(function, self.x, other_x), map(function, self.y, other_y), other)
+
+	def dot(self, other: Self | Vector2 | Vector2i) -> array:
+		if not isinstance(other, Vector2Array | Vector2 | Vector2i):
+			raise TypeError(f"Can't use dot product between {self.__class__.__name__} and {other.__class__.__name__}")
+		other_x, other_y = self._operands(other, "use dot product between")
+		return array('d', map(operator.add, map(operator.mul, self.x, other_x), map(operator.mul, self.y, other_y)))
+
+	def magnitude(self) -> array:
+		return array('d', map(math.hypot, self.x, self.y))
+
+	def sqr_magnitude(self) -> array:
+		return array('d', map(operator.add, map(operator.mul, self.x, self.x), map(operator.mul, self.y, self.y)))
+
+	def normalized(self) -> Self:
+		# null vectors stay null
+		magnitudes = [m or 1.0 for m in self.magnitude()]
+		return self._result(map(self._division, self.x, magnitudes), map(self._division, self.y, magnitudes))
+
+	def swap(self) -> Self:
+		return self.__class__(self.y, self.x)
+
+	# endregion methods
+
+	# region static_methods
+	@staticmethod
+	def max(v1: 'Vector2Array', v2: 'Vector2Array | Vector2 | Vector2i') -> 'Vector2Array':
+		if not isinstance(v1, Vector2Array):
+			raise TypeError("Wrong argument for Vector2Array.max, got " + v1.__class__.__name__ + " instead of Vector2Array")
+		return v1._apply(max, v2, "compare")
+
+	@staticmethod
+	def min(v1: 'Vector2Array', v2: 'Vector2Array | Vector2 | Vector2i') -> 'Vector2Array':
+		if not isinstance(v1, Vector2Array):
+			raise TypeError("Wrong argument for Vector2Array.min, got " + v1.__class__.__name__ + " instead of Vector2Array")
+		return v1._apply(min, v2, "compare")
+	# endregion static_methods
+
+	# region magic_methods
+	def __neg__(self) -> Self:
+		return self.__class__(map(operator.neg, self.x), map(operator.neg, self.y))
+
+	def __add__(self, other) -> Self:
+		return self._apply(operator.add, other, "add")
+
+	def __radd__(self, other) -> Self:
+		return self.__add__(other)
+
+	def __sub__(self, other) -> Self:
+		return self._apply(operator.sub, other, "substract")
+
+	def __mul__(self, other) -> Self:
+		return self._apply(operator.mul, other, "multiply")
+
+	def __rmul__(self, other) -> Self:
+		return self.__mul__(other)
+
+	def __truediv__(self, other) -> Self:
+		return self._apply(self._division, other, "divide")
+
+	def __floordiv__(self, other) -> Self:
+		return self._apply(operator.floordiv, other, "divide")
+
+	def __len__(self) -> int:
+		return len(self.x)
+
+	def __getitem__(self, item: int | slice) -> Vector2 | Self:
+		if isinstance(item, slice):
+			return self.__class__(self.x[item], self.y[item])
+		return Vector2(self.x[item], self.y[item])
+
+	def __iter__(self):
+		return map(Vector2, self.x, self.y)
+
+	def __eq__(self, other) -> bool:
+		return isinstance(other, Vector2Array) and self.x == other.x and self.y == other.y
+
+	def __repr__(self) -> str:
+		return f"{self.__class__.__name__}({self.x.tolist()}, {self.y.tolist()})"
+	# endregion magic_methods
+	pass
+
+
+class Vector2iArray(Vector2Array):
+	"""
+	Sequence of Vector2i stored as 2 arrays of 64 bits integers.
+
+	Like Vector2i, the results are truncated to integers and the division is a floor division.
+	"""
+	__slots__ = ()
+	_typecode: str = 'q'
+	_division: Callable = staticmethod(operator.floordiv)
+
+	def _result(self, x: Iterable, y: Iterable, other=None) -> 'Vector2iArray':
+		if not isinstance(other, Vector2iArray | Vector2i | int):
+			x, y = map(int, x), map(int, y)
+		return Vector2iArray(x, y)
+
+	def __getitem__(self, item: int | slice) -> Vector2i | Self:
+		if isinstance(item, slice):
+			return self.__class__(self.x[item], self.y[item])
+		return Vector2i(self.x[item], self.y[item])
+
+	def __iter__(self):
+		return map(Vector2i, self.x, self.y)
+	pass
@@ -0,0 +1,607 @@
+"""
+Benchmarks tracking the performance budgets of the project. A benchmark exits with status 1 when its budget is exceeded.
+
+Examples:
+	python benchmarks.py importtime
+	python benchmarks.py importtime --module interface_script --budget 100 --runs 9
+	python benchmarks.py locality --size 2048
+	python benchmarks.py instrumentation
+	python benchmarks.py corpus --count 1000000
+	python benchmarks.py heatmap --steps 100000000
+	python benchmarks.py diff --count 10000
+	python benchmarks.py gui --sizes 10 100 --baseline gui_benchmark.json --output gui_new.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# region importtime
+# modules that must only be loaded when the feature needing them is used
+LAZY_MODULES = ('PIL', 'networkx', 'numpy')
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int, int]]:
+	"""
+	Parse the report written on stderr by `python -X importtime`.
+
+	:return: (module, depth, self time, cumulative time) of every imported module, times in microseconds
+	"""
+	modules = []
+	for line in output.splitlines():
+		if not line.startswith('import time:') or 'self [us]' in line:
+			continue
+		self_time, cumulative_time, name = line[len('import time:'):].split('|')
+		stripped = name.lstrip(' ')
+		depth = (len(name) - len(stripped) - 1) // 2
+		modules.append((stripped.strip(), depth, int(self_time), int(cumulative_time)))
+	return modules
+
+
+def import_module(module: str) -> tuple[list[tuple[str, int, int, int]], list[str]]:
+	"""
+	Import the module in a new interpreter.
+
+	:return: (import time report, lazy modules that were loaded anyway)
+	"""
+	env = dict(os.environ)
+	# measure the usual startup, with the bytecode cached
+	env.pop('PYTHONDONTWRITEBYTECODE', None)
+	code = f"import sys, {module}; print(*sorted({{m.partition('.')[0] for m in sys.modules}} & {set(LAZY_MODULES)!r}))"
+	result = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+	)
+	return parse_importtime(result.stderr), result.stdout.split()
+
+
+def bench_importtime(options: argparse.Namespace) -> int:
+	# the first import compiles and caches the bytecode
+	import_module(options.module)
+	totals: list[int] = []
+	self_times: dict[str, list[int]] = {}
+	loaded_lazy_modules: list[str] = []
+	for _ in range(options.runs):
+		report, loaded_lazy_modules = import_module(options.module)
+		for name, depth, self_time, cumulative_time in report:
+			self_times.setdefault(name, []).append(self_time)
+			if depth == 0 and name == options.module:
+				totals.append(cumulative_time)
+
+	total_ms = statistics.median(totals) / 1000
+	print(f"import {options.module}: {total_ms:.1f} ms (median of {options.runs} runs, budget {options.budget:.0f} ms)")
+	print("slowest modules (self time, median):")
+	slowest = sorted(((statistics.median(times), name) for name, times in self_times.items()), reverse=True)
+	for median_time, name in slowest[:options.top]:
+		print(f"\t{median_time / 1000:7.2f} ms  {name}")
+
+	failed = False
+	if loaded_lazy_modules:
+		print("modules that should be loaded lazily:", *loaded_lazy_modules)
+		failed = True
+	if total_ms > options.budget:
+		print(f"over budget by {total_ms - options.budget:.1f} ms")
+		failed = True
+	return 1 if failed else 0
+
+
+# endregion importtime
+
+
+# region locality
+def bench_locality(options: argparse.Namespace) -> int:
+	"""
+	Compare the cell orderings of topology.py on walk-heavy workloads: origin-shift steps, then paths between random
+	nodes found with direct_pathing, which follows long chains of parents across the maze.
+	"""
+	from data_only_script import direct_pathing, origin_shift
+	from topology import Grid2D, RowMajor, Tiled, ZOrder
+
+	size = options.size
+	# 8 bytes per list entry: the number of nodes whose parent pointers fit in a memory page of 4 KiB
+	page_nodes = 4096 // 8
+	print(f"{size}x{size} maze, {options.steps} steps, {options.paths} paths")
+	print(f"{'ordering':<12}{'compile':>10}{'step':>10}{'path':>12}{'same page':>11}")
+	for ordering in (RowMajor(), ZOrder(), Tiled(options.tile_size)):
+		start_time = time.perf_counter()
+		topology = Grid2D(size, size, ordering=ordering)
+		compile_time = time.perf_counter() - start_time
+
+		random.seed(options.seed)
+		maze = topology.default_maze()
+		origin = topology.origin
+		adjacency = topology.adjacency
+		start_time = time.perf_counter()
+		for _ in range(options.steps):
+			origin = origin_shift(maze, origin, adjacency)
+		step_time = (time.perf_counter() - start_time) / options.steps
+
+		# the same pairs of positions for every ordering
+		rng = random.Random(options.seed)
+		pairs = [
+			(topology.index((rng.randrange(size), rng.randrange(size))), topology.index((rng.randrange(size), rng.randrange(size))))
+			for _ in range(options.paths)
+		]
+		start_time = time.perf_counter()
+		for _from, to in pairs:
+			direct_pathing(maze, _from, to)
+		path_time = (time.perf_counter() - start_time) / options.paths
+
+		same_page = sum(parent is not None and node // page_nodes == parent // page_nodes for node, parent in enumerate(maze))
+		print(
+			f"{ordering!r:<12}{compile_time:>9.2f}s{step_time * 1e9:>8.0f}ns{path_time * 1e6:>10.0f}us"
+			f"{same_page / topology.nb_nodes:>10.1%}"
+		)
+	return 0
+
+
+# endregion locality
+
+
+# region instrumentation
+def bench_instrumentation(options: argparse.Namespace) -> int:
+	"""
+	Time origin-shift steps with the instrumentation disabled, enabled with sampling, and enabled on every call.
+	A disabled instrumentation must leave the original functions in place.
+	"""
+	import data_only_script
+	import instrumentation
+
+	original = data_only_script.origin_shift
+
+	def run_steps() -> float:
+		random.seed(options.seed)
+		maze = data_only_script.generate_default_maze((64, 64))
+		origin = 63, 63
+		# looked up at every step, like the code calling origin_shift through the module
+		module = data_only_script
+		start_time = time.perf_counter()
+		for _ in range(options.steps):
+			origin = module.origin_shift(maze, origin)
+		return (time.perf_counter() - start_time) / options.steps
+
+	def best_of(runs: int) -> float:
+		return min(run_steps() for _ in range(runs))
+
+	disabled = best_of(options.runs)
+	instrumentation.enable(instrumentation.MemorySink(), sample_every=options.sample_every)
+	sampled = best_of(options.runs)
+	instrumentation.disable()
+	instrumentation.enable(instrumentation.MemorySink(), sample_every=1)
+	every_call = best_of(options.runs)
+	instrumentation.disable()
+
+	print(f"origin_shift, best batches of {options.runs} runs of {options.steps} steps")
+	print(f"	disabled                 {disabled * 1e9:6.0f} ns")
+	print(f"	enabled, 1 in {options.sample_every:<6} timed {sampled * 1e9:6.0f} ns")
+	print(f"	enabled, every call      {every_call * 1e9:6.0f} ns")
+	if data_only_script.origin_shift is not original:
+		print("the original function was not restored")
+		return 1
+	return 0
+
+
+# endregion instrumentation
+
+
+# region corpus
+def bench_corpus(options: argparse.Namespace) -> int:
+	"""
+	Fill a maze corpus, then run range queries on its metrics. The mazes form a chain where every maze is the previous
+	one after a few origin-shift steps, which is much faster to generate than independent mazes.
+	"""
+	import tempfile
+
+	from data_only_script import encode_maze, generate_default_maze, origin_shift
+	from maze_corpus import MazeCorpus
+
+	size = options.rows, options.cols
+	directory = options.directory or tempfile.mkdtemp(prefix='maze_corpus_')
+	random.seed(options.seed)
+
+	def mazes():
+		maze = generate_default_maze(size)
+		origin = size[0] - 1, size[1] - 1
+		for _ in range(10 * len(maze)):
+			origin = origin_shift(maze, origin)
+		for _ in range(options.count):
+			for _ in range(options.steps_between):
+				origin = origin_shift(maze, origin)
+			yield encode_maze(maze, size), size
+
+	try:
+		with MazeCorpus(directory) as corpus:
+			start_time = time.perf_counter()
+			corpus.add_many(mazes(), options.batch_size)
+			insert_time = time.perf_counter() - start_time
+			print(f"inserted {options.count} mazes of {size[0]}x{size[1]} in {insert_time:.1f}s: {options.count / insert_time:.0f} mazes/s")
+
+			lengths = [row[0] for row in corpus.connection.execute("SELECT solution_length FROM mazes WHERE solution_length IS NOT NULL ORDER BY RANDOM() LIMIT ?", (options.queries,))]
+			select_time = load_time = 0.0
+			nb_selected = 0
+			for minimum_length in lengths:
+				start_time = time.perf_counter()
+				entries = corpus.select(rows=size[0], cols=size[1], solution_length=(minimum_length, None), dead_ends=(None, options.max_dead_ends), limit=options.limit)
+				select_time += time.perf_counter() - start_time
+				start_time = time.perf_counter()
+				for _ in corpus.load(entries):
+					pass
+				load_time += time.perf_counter() - start_time
+				nb_selected += len(entries)
+			nb_queries = max(1, len(lengths))
+			print(f"{len(lengths)} queries: {select_time / nb_queries * 1000:.1f} ms to select, {load_time / nb_queries * 1000:.1f} ms to load, {nb_selected / nb_queries:.0f} mazes per query")
+	finally:
+		if options.directory is None:
+			shutil.rmtree(directory)
+	return 0
+
+
+# endregion corpus
+
+
+# region heatmap
+def best_durations(best: list[float] | None, durations: list[float]) -> list[float]:
+	return durations if best is None else list(map(min, best, durations))
+
+
+def bench_heatmap(options: argparse.Namespace) -> int:
+	"""
+	Time origin-shift steps with and without a heatmap recording them, batch by batch like generate_mazes.py: the visits
+	are counted in place, and the flips deduced from them at the end of every batch.
+	"""
+	from data_only_script import generate_default_maze, origin_shift
+	from heatmap import Heatmap
+
+	size = options.size, options.size
+	cols = options.size
+
+	def run_steps(heatmap: Heatmap | None) -> list[float]:
+		"""
+		:return: the duration of every batch
+		"""
+		random.seed(options.seed)
+		maze = generate_default_maze(size)
+		origin = size[0] - 1, size[1] - 1
+		durations = []
+		for first in range(0, options.steps, options.batch_size):
+			nb_steps = min(options.batch_size, options.steps - first)
+			start_time = time.perf_counter()
+			if heatmap is None:
+				for _ in range(nb_steps):
+					origin = origin_shift(maze, origin)
+			else:
+				visits = heatmap.start_walk(origin)
+				for _ in range(nb_steps):
+					origin = origin_shift(maze, origin)
+					row, col = origin
+					visits[row * cols + col] += 1
+				heatmap.end_walk(origin, nb_steps)
+			durations.append(time.perf_counter() - start_time)
+		return durations
+
+	# interleaved, and the best time of every batch is kept, so that a slow period of the machine neither favors one of
+	# them nor spoils a whole run
+	without = visits = flips = None
+	for _ in range(options.runs):
+		without = best_durations(without, run_steps(None))
+		visits = best_durations(visits, run_steps(Heatmap(size)))
+		flips = best_durations(flips, run_steps(Heatmap(size, track_flips=True)))
+	without, visits, flips = (sum(durations) / options.steps for durations in (without, visits, flips))
+	print(f"origin_shift on {size[0]}x{size[1]}, best batches of {options.runs} runs of {options.steps} steps")
+	print(f"	without heatmap   {without * 1e9:6.0f} ns")
+	print(f"	visits            {visits * 1e9:6.0f} ns  ({visits / without - 1:+.1%})")
+	print(f"	visits and flips  {flips * 1e9:6.0f} ns  ({flips / without - 1:+.1%})")
+	if visits / without - 1 > options.budget / 100:
+		print(f"recording the visits costs more than {options.budget:.0f}% of a step")
+		return 1
+	return 0
+
+
+# endregion heatmap
+
+
+# region diff
+def bench_diff(options: argparse.Namespace) -> int:
+	"""
+	Compare every pair of a batch of mazes with maze_diff, then find the origin-shift edits between two mazes.
+	"""
+	from data_only_script import encode_maze, generate_default_maze, origin_shift
+	from maze_diff import apply_edits, iter_pairwise_distances, origin_shift_edits
+
+	size = options.rows, options.cols
+	random.seed(options.seed)
+	maze = generate_default_maze(size)
+	origin = size[0] - 1, size[1] - 1
+	batch = []
+	for _ in range(options.count):
+		for _ in range(options.steps_between):
+			origin = origin_shift(maze, origin)
+		batch.append(encode_maze(maze, size))
+	nb_pairs = options.count * (options.count - 1) // 2
+	for edges in (False, True):
+		start_time = time.perf_counter()
+		# row by row, the distances of all the pairs would take 4 bytes each
+		total_distance = sum(sum(row) for row in iter_pairwise_distances(batch, size, edges))
+		duration = time.perf_counter() - start_time
+		kind = 'edges' if edges else 'pointers'
+		print(
+			f"{kind:<9}{nb_pairs} pairs of {size[0]}x{size[1]} mazes in {duration:.1f}s: {duration / max(1, nb_pairs) * 1e9:.0f} ns per pair, "
+			f"mean distance {total_distance / max(1, nb_pairs):.1f}"
+		)
+	start_time = time.perf_counter()
+	edits = origin_shift_edits(batch[0], batch[-1], size)
+	duration = time.perf_counter() - start_time
+	print(f"{len(edits)} origin-shift edits between the first and last mazes, found in {duration * 1000:.1f} ms")
+	return 0 if apply_edits(batch[0], size, edits) == batch[-1] else 1
+
+
+# endregion diff
+
+
+# region gui
+# operations timed by the gui benchmark, in the order they are run for every size
+GUI_OPERATIONS = ('redraw', 'resize', 'step', 'show_solution', 'hide_solution', 'save_image')
+# exit status of a gui benchmark which could not time anything, distinct from a regression
+GUI_SKIPPED = 2
+
+
+def start_virtual_display(screen: str) -> subprocess.Popen | None:
+	"""
+	Start Xvfb on a free display and point DISPLAY to it.
+
+	:param screen: WIDTHxHEIGHTxDEPTH of the virtual screen
+	:return: the Xvfb process, or None if Xvfb is not installed or failed to start
+	"""
+	xvfb = shutil.which('Xvfb')
+	if xvfb is None:
+		return None
+	# Xvfb chooses a free display and writes its number to the file descriptor given to -displayfd once it is ready
+	read_fd, write_fd = os.pipe()
+	process = subprocess.Popen(
+		[xvfb, '-displayfd', str(write_fd), '-screen', '0', screen, '-nolisten', 'tcp'],
+		pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+	)
+	os.close(write_fd)
+	with os.fdopen(read_fd) as pipe:
+		display = pipe.readline().strip()
+	if not display:
+		process.kill()
+		process.wait()
+		return None
+	os.environ['DISPLAY'] = ':' + display
+	return process
+
+
+def latency_statistics(durations: list[float]) -> dict[str, float | list[float]]:
+	"""
+	:return: distribution of durations given in seconds, in milliseconds
+	"""
+	samples = sorted(duration * 1000 for duration in durations)
+	percentile = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))]
+	return {
+		"runs": len(samples), "mean_ms": statistics.fmean(samples), "p50_ms": percentile(0.5),
+		"p90_ms": percentile(0.9), "max_ms": samples[-1], "samples_ms": samples
+	}
+
+
+def run_gui_script(app, options: argparse.Namespace) -> list[dict]:
+	"""
+	Drive the application like a user would, for every maze size: redraw, resize, step, show and hide the solution,
+	save an image. Every operation is followed by app.update(), so the time Tk takes to draw it is counted.
+
+	:return: one result per operation and size, with its latency distribution and the number of canvas items after it
+	"""
+	import contextlib
+	import tempfile
+
+	from Vectors import Vector2i
+
+	maze = app.maze
+
+	def timed(action: Callable[[], None]) -> float:
+		start_time = time.perf_counter()
+		action()
+		app.update()
+		return time.perf_counter() - start_time
+
+	def step() -> None:
+		maze.start_stepping(options.steps)
+		while maze.is_stepping:
+			app.update()
+
+	def save_image() -> None:
+		# make_maze_screenshot reports the saved file on stdout
+		with contextlib.redirect_stdout(io.StringIO()):
+			app.make_maze_screenshot()
+
+	results: list[dict] = []
+	working_directory = os.getcwd()
+	# the screenshots are written to the current directory
+	with tempfile.TemporaryDirectory(prefix='gui_benchmark_') as directory:
+		os.chdir(directory)
+		try:
+			for size in options.sizes:
+				grid_size, larger_size = Vector2i(size, size), Vector2i(size + 1, size + 1)
+				maze.resize(grid_size)
+				app.update()
+				actions: dict[str, list[Callable[[], None]]] = {
+					'redraw': [maze.redraw],
+					'resize': [lambda: maze.resize(larger_size), lambda: maze.resize(grid_size)],
+					'step': [step],
+					'show_solution': [maze.show_solution],
+					'hide_solution': [maze.hide_solution],
+					'save_image': [save_image]
+				}
+				for operation in options.operations:
+					runs = options.save_runs if operation == 'save_image' else options.runs
+					durations = [timed(action) for _ in range(runs) for action in actions[operation]]
+					results.append({
+						"operation": operation, "size": size, **latency_statistics(durations),
+						"canvas_items": len(maze.find_all())
+					})
+					print(
+						f"{operation:<14}{size:>6}{results[-1]['p50_ms']:>10.1f} ms{results[-1]['p90_ms']:>10.1f} ms"
+						f"{results[-1]['canvas_items']:>10}"
+					)
+		finally:
+			os.chdir(working_directory)
+	return results
+
+
+def compare_to_baseline(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+	"""
+	:return: a description of every operation whose median latency is more than `tolerance` slower than in the baseline,
+		or which was not timed although the baseline has it, like all of them when the run was skipped
+	"""
+	latencies = {(result["operation"], result["size"]): result["p50_ms"] for result in results}
+	regressions = []
+	for result in baseline:
+		before, after = result["p50_ms"], latencies.get((result["operation"], result["size"]))
+		if after is None:
+			regressions.append(f"{result['operation']} {result['size']}: {before:.1f} ms -> not timed")
+		elif after > before * (1 + tolerance):
+			regressions.append(f"{result['operation']} {result['size']}: {before:.1f} ms -> {after:.1f} ms")
+	return regressions
+
+
+def bench_gui(options: argparse.Namespace) -> int:
+	"""
+	Time the operations of the Tk application under a virtual X server, started with Xvfb when there is no display.
+	The results are written to a JSON file, and compared to the ones of a previous run if given.
+
+	:return: 0 if the operations were timed without regression, 1 if some are slower than in the baseline, and
+		GUI_SKIPPED if nothing could be timed for lack of a display, unless skipping is allowed
+	"""
+	xvfb = None
+	if not os.environ.get('DISPLAY'):
+		xvfb = start_virtual_display(options.screen)
+		if xvfb is None:
+			reason = "there is no X display, and Xvfb could not be started to provide one (apt install xvfb)"
+			print(f"skipped: {reason}")
+			# recorded, so that a comparison to this run fails instead of finding no regression
+			report = {"window": options.window, "steps": options.steps, "skipped": reason, "results": []}
+			with open(options.output, 'w') as file:
+				json.dump(report, file, indent='\t')
+			return 0 if options.allow_skip else GUI_SKIPPED
+	try:
+		import interface_script
+
+		app = interface_script.App()
+		app.geometry(options.window)
+		app.update()
+		try:
+			print(f"{'operation':<14}{'size':>6}{'median':>13}{'p90':>13}{'items':>10}")
+			results = run_gui_script(app, options)
+		finally:
+			app.destroy()
+	finally:
+		if xvfb is not None:
+			xvfb.terminate()
+			xvfb.wait()
+
+	report = {"window": options.window, "steps": options.steps, "results": results}
+	with open(options.output, 'w') as file:
+		json.dump(report, file, indent='\t')
+	print(f"results written to {options.output}")
+	if options.baseline is None:
+		return 0
+	with open(options.baseline) as file:
+		baseline = json.load(file)
+	if "skipped" in baseline:
+		print(f"{options.baseline} was skipped and cannot be compared to: {baseline['skipped']}")
+		return GUI_SKIPPED
+	regressions = compare_to_baseline(results, baseline["results"], options.tolerance)
+	if regressions:
+		print(f"slower than {options.baseline} by more than {options.tolerance:.0%}:", *regressions, sep='\n\t')
+		return 1
+	return 0
+
+
+# endregion gui
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+	importtime = subparsers.add_parser('importtime', help="time the import of a module with -X importtime")
+	importtime.add_argument('--module', default='interface_script')
+	importtime.add_argument('--budget', type=float, default=100.0, help="maximum import time in ms")
+	importtime.add_argument('--runs', type=int, default=5)
+	importtime.add_argument('--top', type=int, default=10, help="number of slowest modules listed")
+	importtime.set_defaults(run=bench_importtime)
+
+	locality = subparsers.add_parser('locality', help="compare the cell orderings of topology.py on long walks")
+	locality.add_argument('--size', type=int, default=1024, help="rows and columns of the maze")
+	locality.add_argument('--steps', type=int, default=1_000_000, help="origin-shift steps")
+	locality.add_argument('--paths', type=int, default=200, help="number of paths searched")
+	locality.add_argument('--tile-size', type=int, default=32)
+	locality.add_argument('--seed', type=int, default=0)
+	locality.set_defaults(run=bench_locality)
+
+	instrumentation = subparsers.add_parser('instrumentation', help="cost of the instrumentation of the hot functions")
+	instrumentation.add_argument('--steps', type=int, default=200_000)
+	instrumentation.add_argument('--runs', type=int, default=5)
+	instrumentation.add_argument('--sample-every', type=int, default=1000)
+	instrumentation.add_argument('--seed', type=int, default=0)
+	instrumentation.set_defaults(run=bench_instrumentation)
+
+	corpus = subparsers.add_parser('corpus', help="insert and query throughput of maze_corpus.py")
+	corpus.add_argument('--count', type=int, default=1_000_000, help="number of mazes inserted")
+	corpus.add_argument('--rows', type=int, default=8)
+	corpus.add_argument('--cols', type=int, default=8)
+	corpus.add_argument('--steps-between', type=int, default=4, help="origin-shift steps between two mazes")
+	corpus.add_argument('--batch-size', type=int, default=10_000)
+	corpus.add_argument('--queries', type=int, default=100)
+	corpus.add_argument('--max-dead-ends', type=int, default=20)
+	corpus.add_argument('--limit', type=int, default=1000, help="maximum number of mazes loaded per query")
+	corpus.add_argument('--directory', default=None, help="keep the corpus in this directory instead of a temporary one")
+	corpus.add_argument('--seed', type=int, default=0)
+	corpus.set_defaults(run=bench_corpus)
+
+	heatmap = subparsers.add_parser('heatmap', help="cost of recording the origins in a heatmap")
+	heatmap.add_argument('--size', type=int, default=64, help="rows and columns of the maze")
+	heatmap.add_argument('--steps', type=int, default=1_000_000)
+	heatmap.add_argument('--batch-size', type=int, default=8192, help="steps given to the heatmap at once")
+	heatmap.add_argument('--runs', type=int, default=3)
+	heatmap.add_argument('--budget', type=float, default=10.0, help="maximum cost of the visits in percents of a step")
+	heatmap.add_argument('--seed', type=int, default=0)
+	heatmap.set_defaults(run=bench_heatmap)
+
+	diff = subparsers.add_parser('diff', help="pairwise distances of a batch of mazes with maze_diff.py")
+	diff.add_argument('--count', type=int, default=10_000, help="number of mazes of the batch")
+	diff.add_argument('--rows', type=int, default=8)
+	diff.add_argument('--cols', type=int, default=8)
+	diff.add_argument('--steps-between', type=int, default=20, help="origin-shift steps between two mazes")
+	diff.add_argument('--seed', type=int, default=0)
+	diff.set_defaults(run=bench_diff)
+
+	gui = subparsers.add_parser('gui', help="latency of the operations of interface_script.py, under Xvfb if needed")
+	gui.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100, 200], help="rows and columns of the mazes")
+	gui.add_argument('--operations', nargs='+', choices=GUI_OPERATIONS, default=list(GUI_OPERATIONS))
+	gui.add_argument('--runs', type=int, default=5, help="number of times every operation is timed")
+	gui.add_argument('--save-runs', type=int, default=1, help="number of images saved, much slower than the rest")
+	gui.add_argument('--steps', type=int, default=100, help="steps per step operation")
+	gui.add_argument('--window', default='800x600', help="geometry of the window")
+	gui.add_argument('--screen', default='1280x1024x24', help="screen of the virtual X server")
+	gui.add_argument('--output', default='gui_benchmark.json')
+	gui.add_argument('--baseline', default=None, help="JSON file of a previous run to compare to")
+	gui.add_argument('--tolerance', type=float, default=0.25, help="slowdown allowed compared to the baseline")
+	gui.add_argument('--allow-skip', action='store_true', help="exit with 0 instead of failing when there is no display")
+	gui.set_defaults(run=bench_gui)
+
+	options = parser.parse_args(argv)
+	return options.run(options)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
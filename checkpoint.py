@@ -0,0 +1,90 @@
+import os
+import pickle
+import random
+import time
+from typing import Any
+
+
+class Checkpoint:
+	"""
+	Periodically saves the state of an experiment to a file, so that an interrupted experiment can be resumed.
+
+	The state of the random module is saved with the state of the experiment and restored by :meth:`load`, so a resumed
+	experiment makes exactly the same random choices as an uninterrupted one.
+	A checkpoint is written to a temporary file which then replaces the previous checkpoint, so an interruption while
+	saving never leaves a corrupted checkpoint behind.
+
+	The lists growing all along the experiment, like the measured durations, are given as `series`: every save only
+	appends their new items to a side file next to the checkpoint, so saving does not get slower as the experiment goes
+	on. The checkpoint records the length of every series, the items appended after the last checkpoint are dropped by
+	:meth:`load`.
+
+	:param path: file of the checkpoint
+	:param interval: minimum number of seconds between two saves
+	:param resume: if False, an existing checkpoint is ignored and overwritten
+	:param max_overhead: maximum fraction of the run time spent saving. The interval grows when saving gets slow
+	"""
+	def __init__(self, path: str, interval: float = 60.0, resume: bool = True, max_overhead: float = 0.01) -> None:
+		self.path: str = path
+		self.interval: float = interval
+		self.resume: bool = resume
+		self.max_overhead: float = max_overhead
+		self.nb_saves: int = 0
+		self.save_duration: float = 0.0
+		self.__next_save: float = time.perf_counter() + interval
+		# name -> number of items of every series already in its side file
+		self.__saved_lengths: dict[str, int] = {}
+
+	def due(self) -> bool:
+		return time.perf_counter() >= self.__next_save
+
+	def __series_path(self, name: str) -> str:
+		return f'{self.path}.{name}'
+
+	def load(self) -> dict[str, Any] | None:
+		"""
+		:return: the saved state of the experiment, including its series, or None if there is nothing to resume
+		"""
+		if not self.resume or not os.path.exists(self.path):
+			return None
+		with open(self.path, 'rb') as file:
+			state = pickle.load(file)
+		random.setstate(state.pop('random_state'))
+		for name, length in state.pop('series_lengths').items():
+			values: list = []
+			with open(self.__series_path(name), 'r+b') as file:
+				# one chunk per save
+				while len(values) < length:
+					values.extend(pickle.load(file))
+				file.truncate(file.tell())
+			state[name] = values
+			self.__saved_lengths[name] = length
+		return state
+
+	def save(self, series: dict[str, list] | None = None, **state: Any) -> None:
+		"""
+		:param series: name -> list of the experiment only growing by its end
+		:param state: the rest of the state of the experiment
+		"""
+		start_time = time.perf_counter()
+		state['random_state'] = random.getstate()
+		state['series_lengths'] = lengths = {}
+		for name, values in (series or {}).items():
+			saved_length = self.__saved_lengths.get(name)
+			# a series saved for the first time overwrites the one of a previous experiment
+			with open(self.__series_path(name), 'wb' if saved_length is None else 'ab') as file:
+				pickle.dump(values[saved_length or 0:], file, protocol=pickle.HIGHEST_PROTOCOL)
+				file.flush()
+				os.fsync(file.fileno())
+			self.__saved_lengths[name] = lengths[name] = len(values)
+		temporary_path = self.path + '.tmp'
+		with open(temporary_path, 'wb') as file:
+			pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+			file.flush()
+			os.fsync(file.fileno())
+		os.replace(temporary_path, self.path)
+		end_time = time.perf_counter()
+		duration = end_time - start_time
+		self.nb_saves += 1
+		self.save_duration += duration
+		self.__next_save = end_time + max(self.interval, duration / self.max_overhead)
@@ -1,12 +1,28 @@
+import os
 import random
 import time
 import timeit
 import heapq
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+# instrumentation is light to import, checkpoint (and pickle) is only loaded by the experiments saving checkpoints.
+# Without them, the script still runs alone: nothing is measured and no checkpoint can be saved
+try:
+	from instrumentation import instrumented
+except ImportError:
+	def instrumented(name: str):
+		return lambda func: func
+
+if TYPE_CHECKING:
+	from checkpoint import Checkpoint
 
 Position = tuple[int, int]
 Size = tuple[int, int]
 Maze = dict[Position, Position | None]
 Path = list[Position]
+# neighbors of every node of a compiled topology, see topology.Topology.adjacency
+Adjacency = tuple[tuple[int, ...], ...]
 
 
 def generate_default_maze(size: Size) -> Maze:
@@ -46,29 +62,54 @@ def print_stats(number_list, indents=0):
 
 
 # region origin_shift
-def origin_shift(maze: Maze, origin: Position) -> Position:
-	nodes = neighbors(maze, origin)
+@instrumented('origin_shift')
+def origin_shift(maze: Maze, origin: Position, adjacency: Adjacency | None = None) -> Position:
+	nodes = neighbors(maze, origin) if adjacency is None else adjacency[origin]
 	new_origin = random.choice(nodes)
 	maze[origin] = new_origin
 	maze[new_origin] = None
 	return new_origin
 
 
-def test_origin_shift(maze_size: Size, nb_tests: int):
-	maze = generate_default_maze(maze_size)
-	origin = maze_size[0] - 1, maze_size[1] - 1
-	durations = []
-	os_durations = []
+def test_origin_shift(maze_size: Size, nb_tests: int, checkpoint: 'Checkpoint | None' = None):
 	nb_loops = maze_size[0] * maze_size[1] * 10
-	for _ in range(nb_tests):
-		durations.append(0)
-		for _2 in range(nb_loops):
+	state = checkpoint.load() if checkpoint is not None else None
+	if state is None:
+		maze = generate_default_maze(maze_size)
+		origin = maze_size[0] - 1, maze_size[1] - 1
+		durations = []
+		os_durations = []
+		test_index = loop_index = 0
+		# duration of the current test, added to durations once it is over
+		duration = 0
+	else:
+		maze, origin = state['maze'], state['origin']
+		durations, os_durations = state['durations'], state['os_durations']
+		test_index, loop_index, duration = state['test_index'], state['loop_index'], state['duration']
+
+	def save_state():
+		checkpoint.save(
+			{'durations': durations, 'os_durations': os_durations},
+			maze=maze, origin=origin, test_index=test_index, loop_index=loop_index, duration=duration
+		)
+
+	while test_index < nb_tests:
+		while loop_index < nb_loops:
 			start_time = time.time()
 			origin = origin_shift(maze, origin)
 			end_time = time.time()
 			time_taken_ms = (end_time - start_time) * 1000
-			durations[-1] += time_taken_ms
+			duration += time_taken_ms
 			os_durations.append(time_taken_ms * 1000)
+			loop_index += 1
+			if checkpoint is not None and checkpoint.due():
+				save_state()
+		durations.append(duration)
+		test_index += 1
+		loop_index = 0
+		duration = 0
+	if checkpoint is not None:
+		save_state()
 	print("Maze of size", maze_size[0], "by", maze_size[1], "over", nb_tests, "iterations")
 	print("Nb Calls per maze generated:", nb_loops)
 	print()
@@ -83,6 +124,7 @@ def test_origin_shift(maze_size: Size, nb_tests: int):
 
 
 # region solving
+@instrumented('direct_pathing')
 def direct_pathing(maze: Maze, _from: Position, to: Position) -> Path:
 	if _from == to:
 		return []
@@ -98,10 +140,10 @@ def direct_pathing(maze: Maze, _from: Position, to: Position) -> Path:
 		path2.append(to)
 		to = maze[to]
 
+	# remove the common ancestors, except the closest one
 	intersection = path1[-1]
-	while intersection == path2[-1]:
-		intersection = path1[-1]
-		path1.pop()
+	while path1 and path2 and path1[-1] == path2[-1]:
+		intersection = path1.pop()
 		path2.pop()
 
 	path2.reverse()
@@ -110,13 +152,14 @@ def direct_pathing(maze: Maze, _from: Position, to: Position) -> Path:
 	return path1
 
 
-def dijkstra(maze: Maze, _from: Position, to: Position) -> Path:
+@instrumented('dijkstra')
+def dijkstra(maze: Maze, _from: Position, to: Position, adjacency: Adjacency | None = None) -> Path:
 	# almost entirely copied pasted from
 	# https://www.askpython.com/python/examples/dijkstras-algorithm-python
 
-	# Initialize distances dictionary
-	distances = {node: float('inf') for node in maze}
-	distances[_from] = 0
+	# Initialize distances dictionary, the nodes not in it are not reached yet
+	distances = {_from: 0}
+	infinity = float('inf')
 
 	# Initialize priority queue
 	pq = [(0, _from)]
@@ -125,18 +168,18 @@ def dijkstra(maze: Maze, _from: Position, to: Position) -> Path:
 	while pq:
 		current_distance, current_node = heapq.heappop(pq)
 		# If we already found a shorter path, skip
-		if current_distance > distances[current_node]:
+		if current_distance > distances.get(current_node, infinity):
 			continue
 		# Stop if we reached the destination
 		if current_node == to:
 			break
 		# Explore neighbors
-		for neighbor in neighbors(maze, current_node):
+		for neighbor in neighbors(maze, current_node) if adjacency is None else adjacency[current_node]:
 			# if the path between the 2 nodes doesn't exist, ignore it
 			if maze[current_node] != neighbor and maze[neighbor] != current_node:
 				continue
 			new_distance = current_distance + 1
-			if new_distance < distances[neighbor]:
+			if new_distance < distances.get(neighbor, infinity):
 				distances[neighbor] = new_distance
 				heapq.heappush(pq, (new_distance, neighbor))
 				previous[neighbor] = current_node
@@ -187,8 +230,11 @@ def test_solving(maze_size: Size, nb_tests: int):
 
 
 # region weighted_origin_shift
-def weighted_origin_shift(maze: Maze, origin: Position, visit_count: dict[Position, int]) -> Position:
-	nodes = neighbors(maze, origin)
+@instrumented('weighted_origin_shift')
+def weighted_origin_shift(
+		maze: Maze, origin: Position, visit_count: dict[Position, int], adjacency: Adjacency | None = None
+) -> Position:
+	nodes = neighbors(maze, origin) if adjacency is None else adjacency[origin]
 	weights = [1 / (visit_count[n] + 1) for n in nodes]
 	new_origin = random.choices(nodes, weights=weights, k=1)[0]
 	maze[origin] = new_origin
@@ -197,21 +243,43 @@ def weighted_origin_shift(maze: Maze, origin: Position, visit_count: dict[Positi
 	return new_origin
 
 
-def test_weighted_origin_shift(maze_size: Size, nb_tests: int):
-	maze = generate_default_maze(maze_size)
-	origin = maze_size[0] - 1, maze_size[1] - 1
-	nb_calls_list: list[int] = []
-	durations: list[float] = []
-	wos_durations: list[float] = []
-	for _ in range(nb_tests):
-		# test setup
-		nb_calls = 0
-		durations.append(0)
-
-		# setup
-		visit_count: dict[Position, int] = {k: 0 for k in maze.keys()}
-		visit_count[origin] += 1
-		remaining_unvisited = len(maze) - 1
+def test_weighted_origin_shift(maze_size: Size, nb_tests: int, checkpoint: 'Checkpoint | None' = None):
+	state = checkpoint.load() if checkpoint is not None else None
+	if state is None:
+		maze = generate_default_maze(maze_size)
+		origin = maze_size[0] - 1, maze_size[1] - 1
+		nb_calls_list: list[int] = []
+		durations: list[float] = []
+		wos_durations: list[float] = []
+		test_index = 0
+		# None between two tests
+		visit_count: dict[Position, int] | None = None
+		nb_calls = remaining_unvisited = 0
+		# duration of the current test, added to durations once it is over
+		duration = 0
+	else:
+		maze, origin = state['maze'], state['origin']
+		nb_calls_list, durations, wos_durations = state['nb_calls_list'], state['durations'], state['wos_durations']
+		test_index, visit_count = state['test_index'], state['visit_count']
+		nb_calls, remaining_unvisited, duration = state['nb_calls'], state['remaining_unvisited'], state['duration']
+
+	def save_state():
+		checkpoint.save(
+			{'nb_calls_list': nb_calls_list, 'durations': durations, 'wos_durations': wos_durations},
+			maze=maze, origin=origin, test_index=test_index, visit_count=visit_count, nb_calls=nb_calls,
+			remaining_unvisited=remaining_unvisited, duration=duration
+		)
+
+	while test_index < nb_tests:
+		if visit_count is None:
+			# test setup
+			nb_calls = 0
+			duration = 0
+
+			# setup
+			visit_count = {k: 0 for k in maze.keys()}
+			visit_count[origin] += 1
+			remaining_unvisited = len(maze) - 1
 
 		# loop
 		while remaining_unvisited > 0:
@@ -226,9 +294,16 @@ def test_weighted_origin_shift(maze_size: Size, nb_tests: int):
 			nb_calls += 1
 			time_taken_ms = (end_time - start_time) * 1000
 			wos_durations.append(time_taken_ms * 1000)
-			durations[-1] += time_taken_ms
+			duration += time_taken_ms
+			if checkpoint is not None and checkpoint.due():
+				save_state()
 
 		nb_calls_list.append(nb_calls)
+		durations.append(duration)
+		test_index += 1
+		visit_count = None
+	if checkpoint is not None:
+		save_state()
 	print("Maze of size", maze_size[0], "by", maze_size[1], "over", nb_tests, "iterations")
 	print("Nb Calls")
 	print_stats(nb_calls_list, indents=1)
@@ -244,10 +319,11 @@ def test_weighted_origin_shift(maze_size: Size, nb_tests: int):
 
 
 # region multi_origin_shift
-def multi_origins_shift(maze: Maze, origins: set[Position]) -> set[Position]:
+@instrumented('multi_origins_shift')
+def multi_origins_shift(maze: Maze, origins: set[Position], adjacency: Adjacency | None = None) -> set[Position]:
 	new_origins = set()
 	for origin in origins:
-		new_origin = random.choice(neighbors(maze, origin))
+		new_origin = random.choice(neighbors(maze, origin) if adjacency is None else adjacency[origin])
 		new_origins.add(new_origin)
 		maze[origin] = new_origin
 	# separated to avoid bugs
@@ -256,19 +332,238 @@ def multi_origins_shift(maze: Maze, origins: set[Position]) -> set[Position]:
 	return new_origins
 
 
-def test_multi_origins(maze_size: Size, origins: set[Position], nb_iter: int):
-	maze = generate_default_maze(maze_size)
-	origins_translations: list[set[Position]] = [origins]
-	for _ in range(nb_iter):
+def test_multi_origins(maze_size: Size, origins: set[Position], nb_iter: int, checkpoint: 'Checkpoint | None' = None):
+	state = checkpoint.load() if checkpoint is not None else None
+	if state is None:
+		maze = generate_default_maze(maze_size)
+		origins_translations: list[set[Position]] = [origins]
+	else:
+		maze, origins_translations = state['maze'], state['origins_translations']
+		origins = origins_translations[-1]
+	for _ in range(len(origins_translations) - 1, nb_iter):
 		origins = multi_origins_shift(maze, origins)
 		origins_translations.append(origins)
+		if checkpoint is not None and checkpoint.due():
+			checkpoint.save({'origins_translations': origins_translations}, maze=maze)
+	if checkpoint is not None:
+		checkpoint.save({'origins_translations': origins_translations}, maze=maze)
 	print(origins_translations)
 
 
 # endregion multi_origin_shift
 
 
+# region compact_representation
+# a maze can also be stored as one direction code per node, row by row
+ORIGIN, UP, DOWN, LEFT, RIGHT = range(5)
+DIRECTION_OFFSETS: tuple[Position | None, ...] = (None, (-1, 0), (1, 0), (0, -1), (0, 1))
+# code of the direction going back
+_OPPOSITE = (ORIGIN, DOWN, UP, RIGHT, LEFT)
+
+
+def direction_code(node: Position, parent: Position | None) -> int:
+	if parent is None:
+		return ORIGIN
+	return DIRECTION_OFFSETS.index((parent[0] - node[0], parent[1] - node[1]))
+
+
+def default_directions(size: Size) -> bytearray:
+	rows, cols = size
+	# same layout as generate_default_maze
+	directions = bytearray(bytes([RIGHT]) * (cols - 1) + bytes([DOWN])) * rows
+	directions[-1] = ORIGIN
+	return directions
+
+
+def encode_maze(maze: Maze, size: Size) -> bytearray:
+	rows, cols = size
+	return bytearray(direction_code((row, col), maze[row, col]) for row in range(rows) for col in range(cols))
+
+
+def decode_maze(directions: bytes | bytearray, size: Size) -> Maze:
+	rows, cols = size
+	maze: Maze = {}
+	for index, code in enumerate(directions):
+		row, col = divmod(index, cols)
+		offset = DIRECTION_OFFSETS[code]
+		maze[row, col] = None if offset is None else (row + offset[0], col + offset[1])
+	return maze
+
+
+def resize_directions(
+		directions: bytes | bytearray, size: Size, new_size: Size
+) -> tuple[bytearray, list[int], list[int]]:
+	"""
+	Change the size of a maze given by its direction codes, keeping its tree. The new nodes hang from the existing ones
+	like in the default maze, and the nodes whose parent is cut off are linked to a neighbor of another tree.
+
+	:return: (direction codes of the resized maze, nodes whose parent changed, nodes becoming origins because their tree
+		has no edge toward another one)
+	"""
+	old_rows, old_cols = size
+	rows, cols = new_size
+	kept_rows, kept_cols = min(rows, old_rows), min(cols, old_cols)
+	if cols == old_cols:
+		resized = bytearray(directions[:kept_rows * cols])
+	else:
+		# the new columns hang from the last old one
+		new_cols = bytes([LEFT]) * (cols - kept_cols)
+		resized = bytearray()
+		for row in range(kept_rows):
+			resized += directions[row * old_cols:row * old_cols + kept_cols]
+			resized += new_cols
+	# the new rows hang from the last old one
+	resized += bytes([UP]) * ((rows - kept_rows) * cols)
+
+	# the nodes of the new border pointing outside lost their parent
+	border: list[int] = []
+	if rows < old_rows:
+		border.extend(range((rows - 1) * cols, rows * cols))
+	if cols < old_cols:
+		border.extend(range(cols - 1, rows * cols, cols))
+	# the corner is in both the last row and the last column
+	border = list(dict.fromkeys(border))
+	orphans: list[int] = []
+	for index in border:
+		offset = DIRECTION_OFFSETS[resized[index]]
+		row, col = divmod(index, cols)
+		if offset is not None and (row + offset[0] >= rows or col + offset[1] >= cols):
+			orphans.append(index)
+	for index in orphans:
+		resized[index] = ORIGIN
+	relinked, origins = _reconnect(resized, new_size, orphans, border)
+	return resized, relinked, origins
+
+
+def _reconnect(
+		directions: bytearray, size: Size, orphans: list[int], border: list[int]
+) -> tuple[list[int], list[int]]:
+	"""
+	Link the trees of the orphans to other trees through the edges of the border. Every node is labelled once with the
+	root of its tree before any change, and the linked trees are merged with a union-find over these roots, so that
+	checking whether an edge leaves a tree takes a constant time.
+
+	:return: (nodes whose parent changed, orphans staying origins)
+	"""
+	rows, cols = size
+	# root of the tree of every node reached so far, remembered for every node of the walks
+	tree_roots: dict[int, int] = {}
+
+	def tree_root(index: int) -> int:
+		path = []
+		while index not in tree_roots and directions[index] != ORIGIN:
+			path.append(index)
+			row_offset, col_offset = DIRECTION_OFFSETS[directions[index]]
+			index += row_offset * cols + col_offset
+		root = tree_roots.setdefault(index, index)
+		for node in path:
+			tree_roots[node] = root
+		return root
+
+	# tree -> tree it was linked to. A tree never linked keeps its root, which names the trees merged into it
+	merged_into: dict[int, int] = {}
+
+	def tree(index: int) -> int:
+		root = tree_root(index)
+		while root in merged_into:
+			parent = merged_into[root]
+			merged_into[root] = merged_into.get(parent, parent)
+			root = parent
+		return root
+
+	relinked: list[int] = []
+	unlinked = set(orphans)
+	# an orphan is tried first, as linking it changes a single arrow, then the other nodes of its subtree
+	for index in (*orphans, *border):
+		if not unlinked:
+			break
+		own_tree = tree(index)
+		if own_tree not in unlinked:
+			continue
+		row, col = divmod(index, cols)
+		# same order as neighbors
+		for code, is_inside, neighbor in (
+				(UP, row > 0, index - cols), (DOWN, row + 1 < rows, index + cols),
+				(LEFT, col > 0, index - 1), (RIGHT, col + 1 < cols, index + 1)
+		):
+			# a link inside the tree would make a cycle
+			if not is_inside or tree(neighbor) == own_tree:
+				continue
+			# the path from the node up to the root is reversed, so that the node becomes the root of the tree, then
+			# linked to the other tree
+			unlinked.remove(own_tree)
+			merged_into[own_tree] = tree(neighbor)
+			node = index
+			while True:
+				relinked.append(node)
+				old_code = directions[node]
+				directions[node] = code
+				if old_code == ORIGIN:
+					break
+				row_offset, col_offset = DIRECTION_OFFSETS[old_code]
+				node += row_offset * cols + col_offset
+				# the parent now points back to the node
+				code = _OPPOSITE[old_code]
+			break
+	# the trees with no edge toward another one keep their origin, like the last one when every origin was cut off
+	return relinked, sorted(unlinked)
+
+
+# endregion compact_representation
+
+
+def run_experiments(
+		checkpoint_dir: str | None = None, resume: bool = False, checkpoint_interval: float = 60.0,
+		profile: str | None = None, trace_memory: str | None = None
+):
+	"""
+	:param checkpoint_dir: directory of the checkpoints of the experiments. No checkpoint if None
+	:param resume: continue the experiments from their latest checkpoint
+	:param profile: name of the experiment to run under cProfile
+	:param trace_memory: name of the experiment whose memory allocations are traced
+	"""
+	def checkpoint(name: str) -> 'Checkpoint | None':
+		if checkpoint_dir is None:
+			return None
+		from checkpoint import Checkpoint
+		return Checkpoint(os.path.join(checkpoint_dir, name + '.checkpoint'), checkpoint_interval, resume)
+
+	def observed(name: str):
+		if name not in (profile, trace_memory):
+			return nullcontext()
+		from instrumentation import experiment
+		return experiment(name, profile=name == profile, trace_memory=name == trace_memory)
+
+	for size in (16, 32, 64):
+		name = f'weighted_origin_shift_{size}x{size}'
+		with observed(name):
+			test_weighted_origin_shift((size, size), 5000, checkpoint(name))
+
+
 if __name__ == '__main__':
-	test_weighted_origin_shift((16, 16), 5000)
-	test_weighted_origin_shift((32, 32), 5000)
-	test_weighted_origin_shift((64, 64), 5000)
+	import argparse
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('--checkpoint-dir', default=None, help="save checkpoints of the experiments in this directory")
+	parser.add_argument('--checkpoint-interval', type=float, default=60.0, help="seconds between two checkpoints")
+	parser.add_argument('--resume', action='store_true', help="continue from the latest checkpoints")
+	parser.add_argument('--seed', default=None, help="seed of the random module")
+	parser.add_argument('--instrument', default=None, help="write the calls and durations of the hot functions to this JSON lines file")
+	parser.add_argument('--sample-every', type=int, default=1000, help="time one call in N of the instrumented functions")
+	parser.add_argument('--profile', default=None, help="run the experiment with this name under cProfile")
+	parser.add_argument('--trace-memory', default=None, help="trace the memory allocations of the experiment with this name")
+	args = parser.parse_args()
+	if args.seed is not None:
+		random.seed(args.seed)
+	if args.checkpoint_dir is not None:
+		os.makedirs(args.checkpoint_dir, exist_ok=True)
+	if args.instrument is None:
+		run_experiments(args.checkpoint_dir, args.resume, args.checkpoint_interval, args.profile, args.trace_memory)
+	else:
+		import instrumentation
+
+		instrumentation.enable(instrumentation.JsonLinesSink(args.instrument), args.sample_every)
+		try:
+			run_experiments(args.checkpoint_dir, args.resume, args.checkpoint_interval, args.profile, args.trace_memory)
+		finally:
+			instrumentation.disable()
@@ -0,0 +1,240 @@
+"""
+Generate many mazes with the origin-shift algorithm and stream them to disk.
+
+Examples:
+	python generate_mazes.py 1000 64 64 -o mazes.bin
+	python generate_mazes.py 100000 16 16 --mode weighted --format jsonl -o - > mazes.jsonl
+	python generate_mazes.py 50 32 32 --mode multi --origins 4 --format png -o images/
+	python generate_mazes.py 1000 64 64 -o mazes.bin --heatmap visits.png --flips-heatmap flips.png
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+import maze_io
+from data_only_script import (
+	Size, encode_maze, generate_default_maze, multi_origins_shift, origin_shift, weighted_origin_shift
+)
+from heatmap import Heatmap
+
+MODES = ('uniform', 'weighted', 'multi')
+FORMATS = ('bin', 'jsonl', 'png')
+
+
+def generate_maze(
+		size: Size, mode: str = 'uniform', nb_steps: int | None = None, nb_origins: int = 1, seed: str | int | None = None,
+		heatmap: Heatmap | None = None
+) -> bytearray:
+	"""
+	Generate a maze with the origin-shift algorithm, starting from the default maze.
+
+	:param mode: 'uniform' (origin_shift), 'weighted' (weighted_origin_shift) or 'multi' (multi_origins_shift)
+	:param nb_steps: number of steps. By default, 10 steps per node, or until every node was an origin in weighted mode
+	:param nb_origins: number of origins in multi mode
+	:param seed: seed of the random module, for reproducible mazes
+	:param heatmap: records the origins of every step
+	:return: the direction codes of the maze (see data_only_script.encode_maze)
+	"""
+	random.seed(seed)
+	maze = generate_default_maze(size)
+	origin = size[0] - 1, size[1] - 1
+	cols = size[1]
+	if mode == 'uniform':
+		nb_steps = 10 * len(maze) if nb_steps is None else nb_steps
+		if heatmap is None:
+			for _ in range(nb_steps):
+				origin = origin_shift(maze, origin)
+		else:
+			# counted in place, see Heatmap.start_walk
+			visits = heatmap.start_walk(origin)
+			for _ in range(nb_steps):
+				origin = origin_shift(maze, origin)
+				row, col = origin
+				visits[row * cols + col] += 1
+			heatmap.end_walk(origin, nb_steps)
+	elif mode == 'weighted':
+		visit_count = dict.fromkeys(maze, 0)
+		unvisited = set(maze)
+		unvisited.discard(origin)
+		visits = None if heatmap is None else heatmap.start_walk(origin)
+		step = 0
+		while unvisited if nb_steps is None else step < nb_steps:
+			origin = weighted_origin_shift(maze, origin, visit_count)
+			unvisited.discard(origin)
+			step += 1
+			if visits is not None:
+				row, col = origin
+				visits[row * cols + col] += 1
+		if heatmap is not None:
+			heatmap.end_walk(origin, step)
+	elif mode == 'multi':
+		others = [node for node in maze if node != origin]
+		origins = {origin, *random.sample(others, min(len(others), nb_origins - 1))}
+		for o in origins:
+			maze[o] = None
+		# successive origins, given to the heatmap at once
+		walk = None if heatmap is None else [origins]
+		for _ in range(10 * len(maze) if nb_steps is None else nb_steps):
+			origins = multi_origins_shift(maze, origins)
+			if walk is not None:
+				walk.append(origins)
+		if heatmap is not None:
+			heatmap.add_multi_walk(walk)
+	else:
+		raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+	return encode_maze(maze, size)
+
+
+def generate_chunk(
+		first_id: int, count: int, options: argparse.Namespace
+) -> tuple[list[bytes | str] | int, Heatmap | None]:
+	"""
+	Generate the mazes first_id to first_id + count - 1. Runs in a worker process.
+
+	:return: (the encoded mazes, or the number of images written in png format, heatmap of the chunk if asked)
+	"""
+	size = options.rows, options.cols
+	records: list[bytes | str] = []
+	heatmap = Heatmap(size, track_flips=options.flips_heatmap is not None) if wants_heatmap(options) else None
+	for maze_id in range(first_id, first_id + count):
+		seed = None if options.seed is None else f"{options.seed}:{maze_id}"
+		directions = generate_maze(size, options.mode, options.steps, options.origins, seed, heatmap)
+		if options.format == 'bin':
+			records.append(maze_io.encode_record(directions, size, maze_id))
+		elif options.format == 'jsonl':
+			records.append(maze_io.encode_json_line(directions, size, maze_id))
+		else:
+			with open(os.path.join(options.output, f"maze_{maze_id:08d}.png"), 'wb') as file:
+				maze_io.write_maze_png(file, directions, size, options.scale)
+	return (count if options.format == 'png' else records), heatmap
+
+
+def wants_heatmap(options: argparse.Namespace) -> bool:
+	return options.heatmap is not None or options.flips_heatmap is not None
+
+
+def write_heatmap(heatmap: Heatmap, options: argparse.Namespace) -> None:
+	for path, flips in ((options.heatmap, False), (options.flips_heatmap, True)):
+		if path is not None:
+			with open(path, 'wb') as file:
+				heatmap.write_png(file, flips, options.scale)
+
+
+class Progress:
+	"""
+	Report the number of generated mazes and the throughput on stderr, at most every `interval` seconds.
+	"""
+	def __init__(self, total: int, interval: float = 0.5) -> None:
+		self.total = total
+		self.done = 0
+		self.interval = interval
+		self.start_time = time.perf_counter()
+		self.last_report = 0.0
+
+	def advance(self, count: int) -> None:
+		self.done += count
+		now = time.perf_counter()
+		if now - self.last_report >= self.interval:
+			self.last_report = now
+			self.report(now)
+
+	def report(self, now: float, end: str = '') -> None:
+		elapsed = now - self.start_time
+		rate = self.done / elapsed if elapsed > 0 else 0.0
+		print(f"\r{self.done}/{self.total} mazes  {rate:.1f} mazes/s  {elapsed:.1f}s", end=end, file=sys.stderr, flush=True)
+
+	def finish(self) -> None:
+		self.report(time.perf_counter(), end='\n')
+
+
+def run(options: argparse.Namespace) -> None:
+	total = options.count
+	progress = Progress(total)
+	chunks = [(first, min(options.chunk_size, total - first)) for first in range(0, total, options.chunk_size)]
+
+	if options.format == 'png':
+		os.makedirs(options.output, exist_ok=True)
+		output = None
+	elif options.output == '-':
+		output = sys.stdout.buffer if options.format == 'bin' else sys.stdout
+	else:
+		output = open(options.output, 'wb' if options.format == 'bin' else 'w')
+
+	# sum of the heatmaps of all the chunks
+	total_heatmap = Heatmap((options.rows, options.cols), options.flips_heatmap is not None) if wants_heatmap(options) else None
+
+	def write(chunk: tuple[list[bytes | str] | int, Heatmap | None]) -> None:
+		result, heatmap = chunk
+		if heatmap is not None:
+			total_heatmap.merge(heatmap)
+		if isinstance(result, int):
+			progress.advance(result)
+			return
+		output.writelines(result)
+		progress.advance(len(result))
+
+	try:
+		if options.workers <= 0:
+			for first, count in chunks:
+				write(generate_chunk(first, count, options))
+		else:
+			with ProcessPoolExecutor(options.workers) as executor:
+				# never more than queue_size chunks generated or being generated but not written yet
+				pending: set[Future] = set()
+				for first, count in chunks:
+					if len(pending) >= options.queue_size:
+						done, pending = wait(pending, return_when=FIRST_COMPLETED)
+						for future in done:
+							write(future.result())
+					pending.add(executor.submit(generate_chunk, first, count, options))
+				for future in wait(pending).done:
+					write(future.result())
+	finally:
+		if output is not None and output not in (sys.stdout, sys.stdout.buffer):
+			output.close()
+		elif output is not None:
+			output.flush()
+	progress.finish()
+	if total_heatmap is not None:
+		write_heatmap(total_heatmap, options)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('count', type=int, help="number of mazes to generate")
+	parser.add_argument('rows', type=int)
+	parser.add_argument('cols', type=int)
+	parser.add_argument('--mode', choices=MODES, default='uniform')
+	parser.add_argument('--steps', type=int, default=None, help="number of steps per maze")
+	parser.add_argument('--origins', type=int, default=2, help="number of origins in multi mode")
+	parser.add_argument('--seed', default=None, help="base seed, every maze gets its own seed derived from it")
+	parser.add_argument('--format', choices=FORMATS, default='bin')
+	parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout, or directory in png format")
+	parser.add_argument('--scale', type=int, default=4, help="pixels per square of the png images")
+	parser.add_argument('--heatmap', default=None, help="png image of the number of times every node was an origin")
+	parser.add_argument('--flips-heatmap', default=None, help="png image of the number of parent changes of every node")
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="worker processes, 0 to run in this process")
+	parser.add_argument('--chunk-size', type=int, default=64, help="mazes generated per task")
+	parser.add_argument('--queue-size', type=int, default=None, help="maximum number of tasks not written yet")
+	options = parser.parse_args(argv)
+	if options.rows < 1 or options.cols < 1 or options.rows * options.cols < 2:
+		parser.error("the maze needs at least 2 nodes")
+	if options.format == 'png' and options.output == '-':
+		parser.error("png format needs an output directory")
+	if options.chunk_size < 1:
+		parser.error("--chunk-size must be positive")
+	if options.queue_size is None:
+		options.queue_size = 2 * max(1, options.workers)
+	return options
+
+
+def main(argv: list[str] | None = None) -> int:
+	run(parse_args(argv))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
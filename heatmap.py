@@ -0,0 +1,234 @@
+"""
+Where the origin spends its time: number of visits of every node, accumulated over many steps and many mazes.
+
+A heatmap is a preallocated array of counters, one per node of a rows by cols maze, optionally with a second array
+counting the edge flips, that is the number of times the parent of every node changed. The visits of a walk are counted
+in place, step by step, and the flips are deduced from them at the end of the walk. A heatmap can also be fed in bulk
+with the successive origins of a walk, or with the changes published by StepWorker and maze_server, and heatmaps filled
+in different processes are merged by adding their counters::
+
+	heatmap = Heatmap((64, 64), track_flips=True)
+	visits = heatmap.start_walk(origin)
+	for _ in range(100_000):
+		origin = origin_shift(maze, origin)
+		row, col = origin
+		visits[row * 64 + col] += 1
+	heatmap.end_walk(origin, 100_000)
+	with open('heatmap.png', 'wb') as file:
+		heatmap.write_png(file, scale=4)
+
+The nodes are given either by their index row * cols + col, or by their (row, col) position.
+"""
+import math
+import operator
+import sys
+from array import array
+from collections import Counter
+from itertools import chain, islice
+from typing import BinaryIO, Iterable, Sequence
+
+from data_only_script import ORIGIN, Position, Size
+from maze_io import write_png
+
+Node = int | Position
+
+
+def _heat_color(level: float) -> bytes:
+	"""
+	:param level: between 0 and 1
+	:return: RGB color going from black to red, yellow then white
+	"""
+	return bytes(round(255 * min(1.0, max(0.0, 3 * level - shift))) for shift in range(3))
+
+
+# color of every level of heat
+PALETTE: list[bytes] = [_heat_color(level / 255) for level in range(256)]
+
+
+def _as_int(counts: array) -> int:
+	"""
+	:return: the counters as a single integer of 64 bits per counter, so that adding such integers adds all the counters
+		at once, in C
+	"""
+	return int.from_bytes(counts, sys.byteorder)
+
+
+def _store(counts: array, value: int) -> None:
+	"""
+	Replace the counters in place by the ones of an integer given by :func:`_as_int`.
+	"""
+	# a counter going over 2 ** 64 would carry into the next one, which takes centuries of steps
+	counts[:] = array('Q', value.to_bytes(8 * len(counts), sys.byteorder))
+
+
+class Heatmap:
+	"""
+	:param size: (rows, cols) of the mazes
+	:param track_flips: also count the parent changes of every node
+	"""
+	def __init__(self, size: Size, track_flips: bool = False) -> None:
+		rows, cols = size
+		self.size: Size = size
+		self.visits: array = array('Q', bytes(8 * rows * cols))
+		self.flips: array | None = array('Q', bytes(8 * rows * cols)) if track_flips else None
+		# number of steps recorded
+		self.steps: int = 0
+		# origin and visits at the start of the current walk, see start_walk
+		self.__walk_origin: Node | None = None
+		self.__walk_visits: int = 0
+
+	def __accumulate(self, counts: array, occurrences: dict[Node, int]) -> None:
+		# the nodes are counted by Counter, in C, so the array is only updated once per distinct node
+		cols = self.size[1]
+		for node, count in occurrences.items():
+			counts[node if node.__class__ is int else node[0] * cols + node[1]] += count
+
+	def add_origins(self, nodes: Iterable[Node]) -> None:
+		"""
+		Count a visit of every node, once per occurrence.
+		"""
+		self.__accumulate(self.visits, Counter(nodes))
+
+	def add_flips(self, nodes: Iterable[Node]) -> None:
+		"""
+		Count a parent change of every node, once per occurrence. Ignored if the flips are not tracked.
+		"""
+		if self.flips is not None:
+			self.__accumulate(self.flips, Counter(nodes))
+
+	def start_walk(self, origin: Node) -> array:
+		"""
+		Record the steps of a single origin, counted in place: after every step, the caller adds 1 to the visits of the
+		new origin, at its index row * cols + col, then calls :meth:`end_walk`. Nothing else may be recorded in between.
+
+		:param origin: the origin before the first step
+		:return: the visit counters
+		"""
+		self.__walk_origin = origin
+		if self.flips is not None:
+			self.__walk_visits = _as_int(self.visits)
+		return self.visits
+
+	def end_walk(self, origin: Node, nb_steps: int) -> None:
+		"""
+		:param origin: the origin after the last step
+		:param nb_steps: number of steps of the walk
+		"""
+		first = self.__walk_origin
+		if first is None:
+			raise ValueError("No walk was started")
+		self.__walk_origin = None
+		self.steps += nb_steps
+		flips = self.flips
+		if flips is not None:
+			# same count as add_walk, from the visits of the whole walk at once
+			_store(flips, _as_int(flips) + 2 * (_as_int(self.visits) - self.__walk_visits))
+			cols = self.size[1]
+			flips[first if first.__class__ is int else first[0] * cols + first[1]] += 1
+			flips[origin if origin.__class__ is int else origin[0] * cols + origin[1]] -= 1
+
+	def add_walk(self, walk: Sequence[Node]) -> None:
+		"""
+		Record the steps of a single origin already listed, for instance by another process. Counting them in place with
+		:meth:`start_walk` is cheaper than listing them.
+
+		:param walk: the origin before the first step, then the origin after every step
+		"""
+		if len(walk) < 2:
+			return
+		# every step gives a parent to the old origin and takes the one of the new origin: every node of the walk
+		# flips twice per visit, except the first one which is not visited and the last one which does not leave
+		cols = self.size[1]
+		visits, flips = self.visits, self.flips
+		for node, count in Counter(islice(walk, 1, None)).items():
+			index = node if node.__class__ is int else node[0] * cols + node[1]
+			visits[index] += count
+			if flips is not None:
+				flips[index] += 2 * count
+		if flips is not None:
+			first, last = walk[0], walk[-1]
+			flips[first if first.__class__ is int else first[0] * cols + first[1]] += 1
+			flips[last if last.__class__ is int else last[0] * cols + last[1]] -= 1
+		self.steps += len(walk) - 1
+
+	def add_multi_walk(self, walk: Sequence[set[Node]]) -> None:
+		"""
+		Record the steps of several origins, see data_only_script.multi_origins_shift.
+
+		:param walk: the set of origins before the first step, then the set of origins after every step
+		"""
+		if len(walk) < 2:
+			return
+		self.add_origins(chain.from_iterable(islice(walk, 1, None)))
+		# a step changes the parent of the origins left and of the nodes becoming origins. A node staying an origin
+		# gets a parent then loses it again, its pointer is unchanged
+		self.add_flips(chain.from_iterable(map(operator.xor, walk, islice(walk, 1, None))))
+		self.steps += len(walk) - 1
+
+	def add_changes(self, changes: dict[int, int], nb_steps: int = 1) -> None:
+		"""
+		Record the net changes of several steps, as given by StepWorker.collect or the events of maze_server: the origins
+		at the end of the steps are visited, and the changed nodes flipped, once each whatever the number of steps.
+
+		:param changes: index -> new direction code of every changed node
+		:param nb_steps: number of steps of the changes
+		"""
+		self.add_origins(index for index, code in changes.items() if code == ORIGIN)
+		# the keys only: Counter would take the direction codes of a dict for counts
+		self.add_flips(changes.keys())
+		self.steps += nb_steps
+
+	def merge(self, other: 'Heatmap') -> 'Heatmap':
+		"""
+		Add the counters of another heatmap of the same size, for instance one filled in another process.
+
+		:return: this heatmap
+		"""
+		if other.size != self.size:
+			raise ValueError(f"Cannot merge a heatmap of size {other.size} into one of size {self.size}")
+		_store(self.visits, _as_int(self.visits) + _as_int(other.visits))
+		if self.flips is not None and other.flips is not None:
+			_store(self.flips, _as_int(self.flips) + _as_int(other.flips))
+		self.steps += other.steps
+		return self
+
+	def to_numpy(self, flips: bool = False):
+		"""
+		:return: a copy of the counters, as a (rows, cols) numpy array of uint64
+		"""
+		# numpy is only loaded by the features needing it
+		import numpy as np
+
+		counts = self.flips if flips else self.visits
+		if counts is None:
+			raise ValueError("The flips are not tracked by this heatmap")
+		return np.frombuffer(counts, dtype=np.uint64).reshape(self.size).copy()
+
+	def image_rows(self, flips: bool = False, scale: int = 1) -> tuple[int, int, list[bytes]]:
+		"""
+		Draw every node as a square of `scale` pixels, colored on a logarithmic scale from black (counted the least) to
+		white (counted the most).
+
+		:return: (width, height, rows of RGB pixels)
+		"""
+		counts = self.flips if flips else self.visits
+		if counts is None:
+			raise ValueError("The flips are not tracked by this heatmap")
+		rows, cols = self.size
+		low, high = math.log1p(min(counts, default=0)), math.log1p(max(counts, default=0))
+		spread = high - low or 1.0
+		# the same counts come up again and again, their colors are computed once
+		colors: dict[int, bytes] = {}
+		image: list[bytes] = []
+		for row in range(rows):
+			line = []
+			for count in counts[row * cols:(row + 1) * cols]:
+				color = colors.get(count)
+				if color is None:
+					color = colors[count] = PALETTE[round(255 * (math.log1p(count) - low) / spread)] * scale
+				line.append(color)
+			image.extend([b''.join(line)] * scale)
+		return cols * scale, rows * scale, image
+
+	def write_png(self, stream: BinaryIO, flips: bool = False, scale: int = 1) -> None:
+		write_png(stream, *self.image_rows(flips, scale))
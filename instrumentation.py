@@ -0,0 +1,271 @@
+"""
+Counters and timers around the hot functions of the project, free when disabled.
+
+The functions to measure are marked with :func:`instrumented`, which returns them unchanged: as long as the
+instrumentation is disabled, calling them costs exactly the same as before. :func:`enable` replaces every reference to
+them with a wrapper counting the calls and timing one call in `sample_every`, and :func:`disable` puts the original
+functions back::
+
+	sink = instrumentation.enable(MemorySink(), sample_every=100)
+	test_origin_shift((32, 32), 10)
+	instrumentation.disable()
+	print(sink.summary())
+
+:func:`experiment` attaches cProfile and tracemalloc to a single block of code.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, TextIO
+
+
+# region sinks
+class Sink:
+	"""
+	Receives the measures. The base class ignores them.
+	"""
+	def timing(self, name: str, seconds: float) -> None:
+		pass
+
+	def counters(self, calls: dict[str, int]) -> None:
+		"""
+		:param calls: number of calls of every instrumented function since the instrumentation was enabled
+		"""
+		pass
+
+	def close(self) -> None:
+		pass
+
+
+class MemorySink(Sink):
+	def __init__(self) -> None:
+		self.timings: dict[str, list[float]] = {}
+		self.calls: dict[str, int] = {}
+
+	def timing(self, name: str, seconds: float) -> None:
+		durations = self.timings.get(name)
+		if durations is None:
+			durations = self.timings[name] = []
+		durations.append(seconds)
+
+	def counters(self, calls: dict[str, int]) -> None:
+		self.calls.update(calls)
+
+	def summary(self) -> dict[str, dict[str, float]]:
+		"""
+		:return: name -> number of calls and statistics of the sampled durations, in seconds
+		"""
+		summary = {}
+		for name in self.calls.keys() | self.timings.keys():
+			durations = sorted(self.timings.get(name, ()))
+			summary[name] = {"calls": self.calls.get(name, 0), "samples": len(durations)}
+			if durations:
+				summary[name].update({
+					"mean": sum(durations) / len(durations),
+					"median": durations[len(durations) // 2],
+					"max": durations[-1]
+				})
+		return summary
+
+
+class JsonLinesSink(Sink):
+	"""
+	Writes one JSON object per line: {"name", "duration"} for every sample, and {"name", "calls"} for every counter.
+
+	:param output: path of the file, or an open text stream which is not closed by :meth:`close`
+	"""
+	def __init__(self, output: str | TextIO) -> None:
+		# json is only loaded when the measures are written, importing the instrumented modules stays cheap
+		import json
+
+		self.__dumps: Callable[[object], str] = json.dumps
+		self.__owns_stream: bool = isinstance(output, str)
+		self.stream: TextIO = open(output, 'a') if isinstance(output, str) else output
+
+	def timing(self, name: str, seconds: float) -> None:
+		self.stream.write(self.__dumps({"name": name, "duration": seconds}) + '\n')
+
+	def counters(self, calls: dict[str, int]) -> None:
+		self.stream.writelines(self.__dumps({"name": name, "calls": count}) + '\n' for name, count in calls.items())
+		self.stream.flush()
+
+	def close(self) -> None:
+		if self.__owns_stream:
+			self.stream.close()
+
+
+class TracingSink(Sink):
+	"""
+	Forwards every sample to a hook, for instance to emit it as a span of an external tracer.
+
+	:param hook: called with (name, start time, duration), times from time.perf_counter
+	"""
+	def __init__(self, hook: Callable[[str, float, float], None]) -> None:
+		self.hook = hook
+
+	def timing(self, name: str, seconds: float) -> None:
+		self.hook(name, time.perf_counter() - seconds, seconds)
+
+
+# endregion sinks
+
+
+# region registry
+class _Probe:
+	__slots__ = ('calls',)
+
+	def __init__(self) -> None:
+		self.calls: int = 0
+
+
+# name -> instrumented function
+_registry: dict[str, Callable] = {}
+# (namespace, attribute, original function) of every reference replaced by enable
+_patched: list[tuple[object, str, Callable]] = []
+_probes: dict[str, _Probe] = {}
+_sink: Sink | None = None
+
+
+def instrumented(name: str) -> Callable[[Callable], Callable]:
+	"""
+	Mark a function or a method to be measured under `name` when the instrumentation is enabled.
+	The function itself is returned, so a disabled instrumentation costs nothing.
+	"""
+	def register(func: Callable) -> Callable:
+		_registry[name] = func
+		return func
+	return register
+
+
+def _wrap(name: str, func: Callable, probe: _Probe, sink: Sink, sample_every: int) -> Callable:
+	perf_counter = time.perf_counter
+
+	def wrapper(*args, **kwargs):
+		probe.calls += 1
+		if probe.calls % sample_every:
+			return func(*args, **kwargs)
+		start_time = perf_counter()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			sink.timing(name, perf_counter() - start_time)
+
+	wrapper.__wrapped__ = func
+	wrapper.__name__ = func.__name__
+	wrapper.__qualname__ = func.__qualname__
+	wrapper.__doc__ = func.__doc__
+	return wrapper
+
+
+def is_enabled() -> bool:
+	return _sink is not None
+
+
+def enable(sink: Sink | None = None, sample_every: int = 1, names: Iterable[str] | None = None) -> Sink:
+	"""
+	Start measuring the instrumented functions.
+
+	:param sink: receives the measures, a MemorySink by default
+	:param sample_every: time one call in `sample_every`, every call is counted
+	:param names: names of the functions to measure, all of them by default
+	:return: the sink
+	"""
+	global _sink
+	if _sink is not None:
+		disable()
+	_sink = MemorySink() if sink is None else sink
+	# id of the original function -> (original function, wrapper)
+	replacements: dict[int, tuple[Callable, Callable]] = {}
+	for name in _registry if names is None else names:
+		func = _registry[name]
+		probe = _probes[name] = _Probe()
+		replacements[id(func)] = func, _wrap(name, func, probe, _sink, max(1, sample_every))
+	# methods are replaced in their class
+	for func, wrapper in replacements.values():
+		owner_name = func.__qualname__.rpartition('.')[0]
+		if owner_name and '<locals>' not in owner_name:
+			owner = sys.modules[func.__module__]
+			for part in owner_name.split('.'):
+				owner = getattr(owner, part)
+			if vars(owner).get(func.__name__) is func:
+				_patched.append((owner, func.__name__, func))
+				setattr(owner, func.__name__, wrapper)
+	# functions are replaced in every module referencing them, including the ones using "from module import function"
+	for module in list(sys.modules.values()):
+		namespace = getattr(module, '__dict__', None)
+		if namespace is None:
+			continue
+		for attribute, value in list(namespace.items()):
+			replacement = replacements.get(id(value))
+			if replacement is not None and replacement[0] is value:
+				_patched.append((namespace, attribute, value))
+				namespace[attribute] = replacement[1]
+	return _sink
+
+
+def disable() -> None:
+	"""
+	Put the original functions back and send the number of calls to the sink, which is then closed.
+	"""
+	global _sink
+	if _sink is None:
+		return
+	for namespace, attribute, func in reversed(_patched):
+		if isinstance(namespace, dict):
+			namespace[attribute] = func
+		else:
+			setattr(namespace, attribute, func)
+	_patched.clear()
+	sink, _sink = _sink, None
+	sink.counters({name: probe.calls for name, probe in _probes.items()})
+	_probes.clear()
+	sink.close()
+
+
+def calls() -> dict[str, int]:
+	"""
+	:return: number of calls of the measured functions since the instrumentation was enabled
+	"""
+	return {name: probe.calls for name, probe in _probes.items()}
+
+
+# endregion registry
+
+
+@contextmanager
+def experiment(
+		name: str, profile: bool = False, trace_memory: bool = False, output_dir: str = 'profiles', top: int = 15
+) -> Iterator[None]:
+	"""
+	Run a named block of code, optionally under cProfile and tracemalloc.
+
+	The profile is saved to `output_dir`/`name`.prof (readable with pstats or snakeviz) and the `top` lines allocating
+	the most memory are printed.
+	"""
+	if not profile and not trace_memory:
+		yield
+		return
+	# only loaded when an experiment is actually observed
+	import cProfile
+	import tracemalloc
+
+	profiler = cProfile.Profile() if profile else None
+	if trace_memory:
+		tracemalloc.start()
+	if profiler is not None:
+		profiler.enable()
+	try:
+		yield
+	finally:
+		if profiler is not None:
+			profiler.disable()
+			os.makedirs(output_dir, exist_ok=True)
+			profiler.dump_stats(os.path.join(output_dir, name + '.prof'))
+		if trace_memory:
+			snapshot = tracemalloc.take_snapshot()
+			current, peak = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			print(f"{name}: {current / 1024:.0f} KiB allocated, {peak / 1024:.0f} KiB at peak", file=sys.stderr)
+			for statistic in snapshot.statistics('lineno')[:top]:
+				print('\t', statistic, file=sys.stderr)
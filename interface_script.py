@@ -1,16 +1,20 @@
+import math
 import os
 import tkinter as tk
-from datetime import datetime
 from typing import Callable
 
-from PIL import Image
-
-import networkx as nx
 import random as rd
 
-from Vectors import *
+from Vectors import Vector2, Vector2i, Vector2Array
+from data_only_script import (
+	ORIGIN, UP, DOWN, LEFT, RIGHT, DIRECTION_OFFSETS, default_directions, direction_code, resize_directions
+)
+from instrumentation import instrumented
+from maze_view import is_solution_kept, node_at_pixel, solution_children, solution_path, visible_range
+from maze_worker import StepWorker
 
 BASE_MAZE_SIZE = Vector2i(7, 7)
+MAX_MAZE_SIZE = 5000
 
 
 def spinbox_vcmd(text: str) -> bool:
@@ -34,8 +38,13 @@ class App(tk.Tk):
 
 		self.control_pannel.on_path_toggled += self.on_solution_button_clicked
 		self.control_pannel.on_step_clicked += self.on_step_button_clicked
+		self.control_pannel.on_play_clicked += self.on_play_button_clicked
+		self.control_pannel.on_stop_clicked += self.on_stop_button_clicked
+		self.control_pannel.on_steps_per_frame_changed += self.on_steps_per_frame_changed
 		self.control_pannel.on_maze_size_changed += self.on_maze_size_changed
 		self.control_pannel.on_save_image_button_pressed += self.make_maze_screenshot
+		self.maze.on_stepping_started += self.control_pannel.on_stepping_started
+		self.maze.on_stepping_finished += self.control_pannel.on_stepping_finished
 
 	def focus_fix(self, _event) -> None:
 		x, y = self.winfo_pointerxy()
@@ -56,11 +65,16 @@ class App(tk.Tk):
 			self.maze.hide_solution()
 
 	def on_step_button_clicked(self, nb_steps: int) -> None:
-		for _ in range(nb_steps):
-			self.maze.step()
-		if self.maze.is_solution_showned:
-			self.maze.hide_solution()
-			self.maze.show_solution()
+		self.maze.start_stepping(nb_steps)
+
+	def on_play_button_clicked(self, steps_per_frame: int) -> None:
+		self.maze.start_stepping(None, steps_per_frame)
+
+	def on_stop_button_clicked(self) -> None:
+		self.maze.stop_stepping()
+
+	def on_steps_per_frame_changed(self, steps_per_frame: int) -> None:
+		self.maze.steps_per_frame = steps_per_frame
 
 	def on_maze_size_changed(self, size: Vector2i) -> None:
 		self.maze.resize(size)
@@ -68,17 +82,21 @@ class App(tk.Tk):
 	def get_color(self, color) -> tuple[int, ...]:
 		return tuple(c // 256 for c in self.winfo_rgb(color))
 
+	@instrumented('App.make_maze_screenshot')
 	def make_maze_screenshot(self):
-		area = self.maze.get_area()
-		w, h = area[2], area[3]
+		# only needed here, loading them at startup would slow down the launch of the app
+		from datetime import datetime
+		from PIL import Image
+
+		x0, y0, w, h = self.maze.get_area()
 		im = Image.new("RGB", (w, h))
 		colors = {}
 
 		maze_bg_color = self.get_color(self.maze.cget("bg"))
 		for x in range(w):
 			for y in range(h):
-				obj = self.maze.find_overlapping(x, y, x, y)
-				color = maze_bg_color if len(obj) == 0 else self.get_color(self.maze.itemcget(obj[0], "fill"))
+				color_name = self.maze.get_color_at(x0 + x, y0 + y)
+				color = maze_bg_color if color_name is None else self.get_color(color_name)
 				if color in colors:
 					colors[color] += 1
 				else:
@@ -104,15 +122,22 @@ class ControlPanel(tk.Frame):
 			from_=1, to=1000, width=4
 		)
 		self.__step_button = tk.Button(self, text='➤')
+		self.__speed_label = tk.Label(self, text='Steps/Frame')
+		self.__speed_spinbox = tk.Spinbox(
+			self, spinbox_cnf,
+			from_=1, to=10000, width=5
+		)
+		self.__play_button = tk.Button(self, text='▶▶')
+		self.__stop_button = tk.Button(self, text='■', state='disabled')
 		self.__size_label = tk.Label(self, text='Size')
 		self.__x_spinbox = tk.Spinbox(
 			self, spinbox_cnf,
-			from_=3, to=100,
+			from_=3, to=MAX_MAZE_SIZE, width=4,
 			textvariable=tk.IntVar(value=BASE_MAZE_SIZE.x)
 		)
 		self.__y_spinbox = tk.Spinbox(
 			self, spinbox_cnf,
-			from_=3, to=100,
+			from_=3, to=MAX_MAZE_SIZE, width=4,
 			textvariable=tk.IntVar(value=BASE_MAZE_SIZE.y)
 		)
 		self.__path_button_variable = tk.BooleanVar()
@@ -124,6 +149,10 @@ class ControlPanel(tk.Frame):
 		self.__step_label.pack(side='left', padx=(5, 0))
 		self.__step_spinbox.pack(side='left', padx=(5, 0))
 		self.__step_button.pack(side='left', padx=(5, 0))
+		self.__speed_label.pack(side='left', padx=(20, 0))
+		self.__speed_spinbox.pack(side='left', padx=(5, 0))
+		self.__play_button.pack(side='left', padx=(5, 0))
+		self.__stop_button.pack(side='left', padx=(5, 0))
 		self.__size_label.pack(side='left', padx=(20, 0))
 		self.__x_spinbox.pack(side='left', padx=(5, 0))
 		self.__y_spinbox.pack(side='left', padx=(5, 0))
@@ -131,6 +160,7 @@ class ControlPanel(tk.Frame):
 		self.__save_image_button.pack(side='left', padx=(5, 0))
 
 		self.__step_spinbox['validate'] = "all"
+		self.__speed_spinbox['validate'] = "all"
 		self.__x_spinbox['validate'] = "all"
 		self.__y_spinbox['validate'] = "all"
 
@@ -147,6 +177,7 @@ class ControlPanel(tk.Frame):
 		self.spinbox_vcmd = self.register(spinbox_vcmd)
 		vcmd = self.spinbox_vcmd, '%P'
 		self.__step_spinbox['validatecommand'] = vcmd
+		self.__speed_spinbox['validatecommand'] = vcmd
 		self.__x_spinbox['validatecommand'] = vcmd
 		self.__y_spinbox['validatecommand'] = vcmd
 
@@ -154,22 +185,50 @@ class ControlPanel(tk.Frame):
 		self.__y_spinbox["command"] = self.__on_maze_size_changed
 		self.__path_button["command"] = self.__on_path_toggled
 		self.__step_button["command"] = self.__on_step_clicked
+		self.__play_button["command"] = self.__on_play_clicked
+		self.__stop_button["command"] = self.__on_stop_clicked
+		self.__speed_spinbox["command"] = self.__on_steps_per_frame_changed
 		self.__save_image_button['command'] = self.__on_save_image_button_pressed
 
 		self.__x_spinbox.bind("<FocusOut>", lambda e: self.__on_maze_size_changed())
 		self.__y_spinbox.bind("<FocusOut>", lambda e: self.__on_maze_size_changed())
+		self.__speed_spinbox.bind("<FocusOut>", lambda e: self.__on_steps_per_frame_changed())
 
 		self.on_maze_size_changed = Signal()
 		self.on_step_clicked = Signal()
+		self.on_play_clicked = Signal()
+		self.on_stop_clicked = Signal()
+		self.on_steps_per_frame_changed = Signal()
 		self.on_path_toggled = Signal()
 		self.on_save_image_button_pressed = Signal()
 
 		self.last_maze_size: Vector2i = BASE_MAZE_SIZE
 
 	def __on_step_clicked(self) -> None:
-		nb_steps = int(self.__step_spinbox.get())
+		nb_steps = int(self.__step_spinbox.get() or 1)
 		self.on_step_clicked.emit(nb_steps)
 
+	def __get_steps_per_frame(self) -> int:
+		return max(1, int(self.__speed_spinbox.get() or 1))
+
+	def __on_play_clicked(self) -> None:
+		self.on_play_clicked.emit(self.__get_steps_per_frame())
+
+	def __on_stop_clicked(self) -> None:
+		self.on_stop_clicked.emit()
+
+	def __on_steps_per_frame_changed(self) -> None:
+		self.on_steps_per_frame_changed.emit(self.__get_steps_per_frame())
+
+	def on_stepping_started(self, is_auto_playing: bool) -> None:
+		if is_auto_playing:
+			self.__play_button['state'] = 'disabled'
+		self.__stop_button['state'] = 'normal'
+
+	def on_stepping_finished(self) -> None:
+		self.__play_button['state'] = 'normal'
+		self.__stop_button['state'] = 'disabled'
+
 	def __on_maze_size_changed(self) -> None:
 		x, y = self.last_maze_size
 		new_x, new_y = self.__x_spinbox.get(), self.__y_spinbox.get()
@@ -199,16 +258,54 @@ class Maze(tk.Canvas):
 	def __init__(self, master, size: Vector2i):
 		size = Vector2i.max(Vector2i(3, 3), size)
 		super(Maze, self).__init__(master)
-		self.__graph: nx.DiGraph = nx.DiGraph()
-		self.__origins: set[Vector2i] = set()
 		self.__size: Vector2i = size
+		# direction code of every node, row by row (see data_only_script.default_directions)
+		self.__directions: bytearray = bytearray()
+		self.__origins: set[Vector2i] = set()
 		self.__solution_extremities: tuple[Vector2i, Vector2i] = Vector2i(0, 0), Vector2i(0, 0)
-		self.__solution: tuple[list[Vector2i], int] | None = [], 0
-		self.__last_created_arrows: list[int] = []
+		self.__solution: tuple[list[Vector2i], int] = [], 0
+		# nodes whose outgoing arrow is part of the shown solution
+		self.__solution_children: set[Vector2i] = set()
+		# nodes whose outgoing arrow was created since the last step
+		self.__last_created_arrows: set[Vector2i] = set()
 		self.__is_solution_showned: bool = False
 		self.settings: MazeSettings = MazeSettings()
-		self.unvisited_nodes: set[Vector2i] = set()
+		# number of visits of every visited node, the nodes that were never visited are missing
 		self.visit_count: dict[Vector2i, int] = {}
+		# networkx view given by the graph property, kept in sync with the directions and the size
+		self.__graph = None
+		# viewport: world position shown at the top left corner of the canvas, and pixels per world unit
+		self.__view: Vector2 = Vector2(0, 0)
+		self.__zoom: float = 1.0
+		# (first row, last row + 1, first col, last col + 1) of the nodes having canvas items
+		self.__visible: tuple[int, int, int, int] = 0, 0, 0, 0
+		self.__node_items: dict[Vector2i, int] = {}
+		self.__arrow_items: dict[Vector2i, int] = {}
+		# single item outlining the node under the pointer, moved from node to node
+		self.__hover_item: int | None = None
+		# level of detail: when zoomed out, the whole viewport is a single image
+		self.__raster: tk.PhotoImage | None = None
+		self.__raster_item: int | None = None
+		self.__raster_dirty: bool = False
+		self.__viewport_update_id: str | None = None
+		self.__viewport_force_update: bool = False
+		self.__pan_anchor: tuple[int, int] | None = None
+		self.__worker: StepWorker | None = None
+		self.__poll_id: str | None = None
+		self.on_stepping_started = Signal()
+		self.on_stepping_finished = Signal()
+
+		# the node under the pointer is computed from the viewport, the items of the nodes have no bindings
+		self.bind('<Button-1>', self.__on_left_click)
+		self.bind('<Button-3>', self.__on_right_click)
+		self.bind('<Motion>', lambda e: self.__hover(self.node_at(e.x, e.y)))
+		self.bind('<Leave>', lambda e: self.__hover(None))
+		self.bind('<Configure>', lambda e: self.__schedule_viewport_update())
+		self.bind('<ButtonPress-2>', self.__on_pan_start)
+		self.bind('<B2-Motion>', self.__on_pan_motion)
+		self.bind('<MouseWheel>', lambda e: self.zoom_at(e.x, e.y, self.settings.zoom_step if e.delta > 0 else 1 / self.settings.zoom_step))
+		self.bind('<Button-4>', lambda e: self.zoom_at(e.x, e.y, self.settings.zoom_step))
+		self.bind('<Button-5>', lambda e: self.zoom_at(e.x, e.y, 1 / self.settings.zoom_step))
 		self.redraw()
 
 	def __is_solution_showned_getter(self) -> bool:
@@ -217,149 +314,206 @@ class Maze(tk.Canvas):
 	# noinspection PyTypeChecker
 	is_solution_showned = property(__is_solution_showned_getter)
 
+	@property
+	def unvisited_nodes(self) -> set[Vector2i]:
+		"""
+		:return: the nodes that were never visited. They are missing from :attr:`visit_count`, the set is built on each call
+		"""
+		visited = {node for node, count in self.visit_count.items() if count}
+		return {Vector2i.of(row, col) for row in range(self.__size.x) for col in range(self.__size.y)} - visited
+
+	@instrumented('Maze.redraw')
 	def redraw(self) -> None:
-		self.delete('all')
-		self.__graph.clear()
+		self.stop_stepping()
+		self.__clear_items()
+		Vector2i.clear_interned()
+		self.__intern_positions()
+		self.__directions = default_directions((self.__size.x, self.__size.y))
+		self.__sync_graph()
 		self.__origins.clear()
-		self.unvisited_nodes.clear()
-		last_col = self.__size.y - 1
-		for row in range(self.__size.x):
-			for col in range(self.__size.y):
-				position = Vector2i(row, col)
-				self.unvisited_nodes.add(position)
-				self.add_node(position)
-				if col > 0:
-					self.add_edge(position - Vector2i(0, 1), position)
-					if col == last_col and row > 0:
-						self.add_edge(position - Vector2i(1, 0), position)
-		origin = Vector2i(self.__size.x - 1, self.__size.y - 1)
-		self.add_origin(origin)
-		self.visit_count = {n: 0 for n in self.unvisited_nodes}
-		self.visit_count[origin] += 1
-		self.unvisited_nodes.discard(origin)
-		self.change_solution_node(Vector2i(self.__size.x - 1, 0))
-		self.change_solution_node(Vector2i(0, self.__size.y - 1))
-
-	def __get_solution_arrows(self) -> list[int]:
-		solution, sep = self.__solution
-		arrows: list[int] = []
-		for i in range(1, len(solution)):
-			node1, node2 = solution[i - 1], solution[i]
-			if i >= sep:
-				node1, node2 = node2, node1
-			if self.__graph.has_edge(node1, node2):
-				arrows.append(self.__get_graphical_arrow(node1, node2))
-		return arrows
-
-	def show_solution(self):
-		self.__solution = self.recalculate_solution()
+		self.__last_created_arrows.clear()
+		self.__solution = [], 0
+		self.__solution_children = set()
+		origin = Vector2i.of(self.__size.x - 1, self.__size.y - 1)
+		self.__origins.add(origin)
+		self.visit_count = {origin: 1}
+		self.__solution_extremities = Vector2i.of(self.__size.x - 1, 0), Vector2i.of(0, self.__size.y - 1)
+		self.__update_viewport(force=True)
+		self.__refresh_solution(None)
+
+	def show_solution(self) -> None:
 		self.__is_solution_showned = True
-		color = self.settings.path_arrow_color
-		for arrow in self.__get_solution_arrows():
-			self.__recolor_arrow(arrow, color)
+		self.__refresh_solution(None)
 
-	def hide_solution(self):
-		color = self.settings.arrow_color
+	def hide_solution(self) -> None:
 		self.__is_solution_showned = False
-		for arrow in self.__get_solution_arrows():
-			self.__recolor_arrow(arrow, color)
+		children = self.__solution_children
+		self.__solution = [], 0
+		self.__solution_children = set()
+		for child in children:
+			self.__recolor_arrow(child)
+
+	def __refresh_solution(self, changed: set[Vector2i] | None) -> None:
+		"""
+		Keep the shown solution up to date, recoloring only the arrows entering or leaving it.
+
+		:param changed: the nodes whose outgoing arrow was replaced since the last refresh, or None to recalculate
+		"""
+		if not self.__is_solution_showned:
+			return
+		old_children = self.__solution_children
+		if changed is None:
+			changed = set()
+		elif is_solution_kept(self.__solution[0], old_children, changed):
+			return
+		self.__solution = self.recalculate_solution()
+		new_children = solution_children(*self.__solution)
+		self.__solution_children = new_children
+		# the arrows of the changed nodes were drawn before the solution was updated
+		for child in (old_children ^ new_children) | (new_children & changed) | (old_children & changed):
+			self.__recolor_arrow(child)
 
 	def recalculate_solution(self) -> tuple[list[Vector2i], int]:
+		"""
+		:return: (path, separation) where path[:separation] goes from start to the intersection following the arrows,
+			and path[separation:] goes from the intersection to end against the arrows. ([], 0) if there is no path.
+		"""
 		start, end = self.__solution_extremities
-		path1: list[Vector2i] = [start]
-		path2: list[Vector2i] = [end]
-		# calc path from start to origin
-		while start not in self.__origins:
-			start = self.__graph.neighbors(start).__next__()
-			path1.append(start)
-		# calc path (end -> origin) until intersection of path (start -> origin) found
-		while end not in path1:
-			end = self.__graph.neighbors(end).__next__()
-			path2.append(end)
-		# cut excess nodes visited on path (start -> origin)
-		while path1[-1] != end:
-			path1.pop()
-		# remove duplicate intersection point
-		path2.pop()
-		# the solution is the (start -> intersection) + (end -> intersection) reversed
-		return path1 + path2[::-1], len(path1)
+		return solution_path(start, end, self.__get_parent)
 
 	def add_origin(self, position: Vector2i) -> None:
 		self.__origins.add(position)
-		self.__recolor_node(self.__get_graphical_node(position), self.settings.origin_color)
-		for connexion in list(self.__graph.neighbors(position)):
-			self.remove_edge(position, connexion)
+		parent = self.__get_parent(position)
+		if parent is not None:
+			self.remove_edge(position, parent)
+		self.__recolor_node(position)
 
 	def remove_origin(self, position: Vector2i) -> None:
-		color = self.settings.path_nodes_color if position in self.__solution_extremities else self.settings.node_color
-		self.__recolor_node(self.__get_graphical_node(position), color)
 		self.__origins.discard(position)
+		self.__recolor_node(position)
 
 	def toggle_origin(self, o: Vector2i) -> None:
+		# the worker owns a copy of the tree: synchronize before editing it, then resume
+		worker = self.__worker
+		self.stop_stepping(notify=False)
 		if o in self.__origins:
 			self.remove_origin(o)
 			self.add_edge(o, rd.choice(self.adjacent_nodes(o)))
 		else:
 			self.add_origin(o)
+		self.__refresh_solution({o})
+		if worker is not None and worker.is_auto_playing:
+			self.start_stepping(None, worker.steps_per_frame)
+		elif worker is not None:
+			self.on_stepping_finished.emit()
 
 	def change_solution_node(self, position: Vector2i) -> None:
-		# recolor old start
 		old_start = self.__solution_extremities[0]
-		if self.__graph.has_node(old_start):
-			self.__recolor_node(self.__get_graphical_node(old_start), self.settings.node_color)
-		# recolor new end
-		if self.__graph.has_node(position):
-			self.__recolor_node(self.__get_graphical_node(position), self.settings.path_nodes_color)
 		# update solution start/end
 		self.__solution_extremities = self.__solution_extremities[1], position
+		# recolor old start and new end
+		self.__recolor_node(old_start)
+		self.__recolor_node(position)
+		self.__refresh_solution(None)
 
 	def add_edge(self, p1: Vector2i, p2: Vector2i) -> None:
-		start: Vector2 = self.settings.start_point + p1.swap() * self.settings.node_spacing
-		end: Vector2 = self.settings.start_point + p2.swap() * self.settings.node_spacing
-		direction: Vector2 = (end - start).normalized
-		offset: Vector2 = direction * self.settings.node_radius
-		start += offset
-		end -= offset
-
-		arrow = self.create_line(*start, *end, arrow=tk.LAST, fill=self.settings.arrow_just_created_color)
-		self.__graph.add_edge(p1, p2, gfarrow=arrow)
-		self.__last_created_arrows.append(arrow)
+		self.__set_parent(p1, p2)
+		self.__last_created_arrows.add(p1)
+		self.__draw_arrow(p1)
 
 	def remove_edge(self, p1: Vector2i, p2: Vector2i) -> None:
-		if not self.__graph.has_edge(p1, p2):
+		if self.__get_parent(p1) != p2:
 			return
-		self.delete(self.__get_graphical_arrow(p1, p2))
-		self.__graph.remove_edge(p1, p2)
+		self.__set_parent(p1, None)
+		self.__last_created_arrows.discard(p1)
+		self.__draw_arrow(p1)
 
 	def add_node(self, position: Vector2i) -> None:
-		middle = self.settings.node_spacing * Vector2i(position.y, position.x) + self.settings.start_point
-		radius_vector = self.settings.node_radius * Vector2(1, 1)
-		start = middle - radius_vector
-		end = middle + radius_vector
-		color = self.settings.path_nodes_color if position in self.__solution_extremities else self.settings.node_color
+		"""
+		Create the canvas items of a node and of its outgoing arrow.
+		"""
+		self.add_nodes([position])
 
-		node = self.create_oval(*start, *end, fill=color, outline='')
-		self.tag_bind(node, '<Button-3>', lambda e, p=position: self.toggle_origin(p))
-		self.tag_bind(node, '<Button-1>', lambda e, p=position: self.change_solution_node(p))
-		self.__graph.add_node(position, gfnode=node)
+	def add_nodes(self, positions: list[Vector2i]) -> None:
+		"""
+		Create the canvas items of several nodes and of their outgoing arrows, computing all their coordinates at once.
+		"""
+		positions = [p for p in positions if p not in self.__node_items]
+		middles = self.__to_screen(positions)
+		radius = self.settings.node_radius * self.__zoom
+		for position, x, y in zip(positions, middles.x, middles.y):
+			node = self.create_oval(
+				x - radius, y - radius, x + radius, y + radius,
+				fill=self.__node_color(position), outline='', tags=('maze', 'node')
+			)
+			self.__node_items[position] = node
+		self.__draw_arrows(positions)
 
 	def remove_node(self, position: Vector2i) -> None:
-		if not self.__graph.has_node(position):
+		"""
+		Delete the canvas items of a node and of its outgoing arrow.
+		"""
+		node = self.__node_items.pop(position, None)
+		if node is None:
 			return
-		successors = list(self.__graph.neighbors(position))
-		for connexion in successors:
-			self.remove_edge(position, connexion)
-		predecessors = list(self.__graph.predecessors(position))
-		for connexion in predecessors:
-			self.remove_edge(connexion, position)
-		self.delete(self.__get_graphical_node(position))
-		self.__graph.remove_node(position)
-		self.__origins.discard(position)
+		self.delete(node)
+		arrow = self.__arrow_items.pop(position, None)
+		if arrow is not None:
+			self.delete(arrow)
 
 	def resize(self, size: Vector2i) -> None:
+		"""
+		Change the size of the maze, keeping its current tree. The new nodes hang from the existing ones like in the
+		default maze, and the nodes whose parent is cut off are linked to a neighbor of another subtree. Only the canvas
+		items of the added or removed border are created or deleted.
+		"""
+		size = Vector2i.max(Vector2i(3, 3), size)
+		if size == self.__size:
+			return
+		# the worker owns a copy of the tree: synchronize before editing it, then resume
+		worker = self.__worker
+		self.stop_stepping(notify=False)
+		old_rows, old_cols = self.__size.x, self.__size.y
+		rows, cols = size.x, size.y
+		directions, relinked, origins = resize_directions(self.__directions, (old_rows, old_cols), (rows, cols))
+
 		self.__size = size
-		self.redraw()
+		self.__directions = directions
+		self.__sync_graph()
+		self.__intern_positions()
+		is_kept = lambda node: node.x < rows and node.y < cols
+		self.__origins = set(filter(is_kept, self.__origins))
+		self.__last_created_arrows = set(filter(is_kept, self.__last_created_arrows))
+		self.__solution_children = set(filter(is_kept, self.__solution_children))
+		self.visit_count = {node: count for node, count in self.visit_count.items() if is_kept(node)}
+		self.__solution_extremities = tuple(
+			Vector2i.of(min(node.x, rows - 1), min(node.y, cols - 1)) for node in self.__solution_extremities
+		)
 
+		relinked = [Vector2i.of(*divmod(index, cols)) for index in relinked]
+		new_origins = [Vector2i.of(*divmod(index, cols)) for index in origins]
+		self.__origins.update(new_origins)
+
+		# the items of the cut nodes are deleted and the ones of the new nodes created, like when panning
+		self.__update_viewport()
+		# the arrows of the new origins pointed to a deleted node
+		self.__draw_arrows([*relinked, *new_origins])
+		for node in (*new_origins, *self.__solution_extremities):
+			self.__recolor_node(node)
+		self.__refresh_solution(None)
+		if worker is not None and worker.is_auto_playing:
+			self.start_stepping(None, worker.steps_per_frame)
+		elif worker is not None:
+			self.on_stepping_finished.emit()
+
+	def __intern_positions(self) -> None:
+		"""
+		Let Vector2i.of share the positions of the whole grid. The spare room is for the positions of the previous size
+		while resizing, and for the neighbors computed outside the grid.
+		"""
+		Vector2i.set_interned_limit(max(Vector2i.DEFAULT_INTERNED_LIMIT, 2 * self.__size.x * self.__size.y))
+
+	@instrumented('Maze.step')
 	def step(self) -> None:
 		# self.unvisited_nodes = set(self.__graph.nodes)
 		# self.visit_count = {node: 0 for node in self.__graph.nodes}
@@ -367,10 +521,9 @@ class Maze(tk.Canvas):
 		# 	self.unvisited_nodes.discard(origin)
 		# 	self.visit_count[origin] += 1
 		# while self.unvisited_nodes:
-		while self.__last_created_arrows:
-			arrow = self.__last_created_arrows.pop()
-			self.__recolor_arrow(arrow, self.settings.arrow_color)
+		self.__fade_created_arrows()
 		new_origins: set[Vector2i] = set()
+		changed: set[Vector2i] = set(self.__origins)
 		while self.__origins:
 			origin = self.__origins.pop()
 			directions, weigths = self.get_weigthed_directions(origin)
@@ -382,42 +535,470 @@ class Maze(tk.Canvas):
 			new_origins.add(new_origin)
 		for new_origin in new_origins:
 			self.add_origin(new_origin)
+		changed.update(new_origins)
+		self.__refresh_solution(changed)
+
+	# region graph
+	@property
+	def graph(self):
+		"""
+		:return: read-only networkx view of the maze, where every node has an edge toward its parent. The nodes are the
+			indexes row * cols + col. The view always shows the current state of the maze, nothing is copied, and stays
+			valid when the maze is redrawn or resized
+		"""
+		if self.__graph is None:
+			# networkx is only loaded by the features needing it
+			from maze_graph import DirectionsMaze, GridAdjacency, MazeDiGraph
+
+			self.__graph = MazeDiGraph(
+				DirectionsMaze(self.__directions, self.__size.y), GridAdjacency(self.__size.x, self.__size.y)
+			)
+		return self.__graph
+
+	def __sync_graph(self) -> None:
+		"""
+		Point the graph view to the new directions and size, after redraw or resize replaced them.
+		"""
+		if self.__graph is None:
+			return
+		maze, adjacency = self.__graph.maze, self.__graph.maze_adjacency
+		maze.directions, maze.cols = self.__directions, self.__size.y
+		adjacency.rows, adjacency.cols = self.__size.x, self.__size.y
+
+	# endregion graph
+
+	# region background_stepping
+	@property
+	def is_stepping(self) -> bool:
+		return self.__worker is not None
+
+	@property
+	def steps_per_frame(self) -> int:
+		return 0 if self.__worker is None else self.__worker.steps_per_frame
+
+	@steps_per_frame.setter
+	def steps_per_frame(self, value: int) -> None:
+		if self.__worker is not None:
+			self.__worker.steps_per_frame = value
+
+	def start_stepping(self, nb_steps: int | None, steps_per_frame: int = 1) -> None:
+		"""
+		Run steps in a background worker and draw their net changes at most :attr:`MazeSettings.max_fps` times per second.
+
+		:param nb_steps: number of steps to do, or None to run until :meth:`stop_stepping` is called
+		:param steps_per_frame: number of steps drawn per frame when running without limit
+		"""
+		self.stop_stepping(notify=False)
+		cols = self.__size.y
+		self.__worker = StepWorker(
+			(self.__size.x, cols), bytearray(self.__directions),
+			{o.x * cols + o.y for o in self.__origins},
+			{n.x * cols + n.y: count for n, count in self.visit_count.items()},
+			nb_steps, steps_per_frame
+		)
+		self.__worker.start()
+		self.__poll_id = self.after(self.__frame_delay(), self.__poll_worker)
+		self.on_stepping_started.emit(nb_steps is None)
+
+	def stop_stepping(self, notify: bool = True) -> None:
+		"""
+		Stop the background worker, if any, and draw the steps it already did.
+
+		:param notify: emit :attr:`on_stepping_finished` if a worker was stopped
+		"""
+		if self.__worker is None:
+			return
+		worker, self.__worker = self.__worker, None
+		worker.stop()
+		worker.join()
+		if self.__poll_id is not None:
+			self.after_cancel(self.__poll_id)
+			self.__poll_id = None
+		self.__apply_changes(worker.collect()[0])
+		if notify:
+			self.on_stepping_finished.emit()
+
+	def __frame_delay(self) -> int:
+		return max(1, 1000 // self.settings.max_fps)
+
+	def __poll_worker(self) -> None:
+		self.__poll_id = None
+		worker = self.__worker
+		if worker is None:
+			return
+		is_finished = not worker.is_alive()
+		changes, _ = worker.collect()
+		self.__apply_changes(changes)
+		if is_finished:
+			self.__worker = None
+			self.on_stepping_finished.emit()
+		else:
+			self.__poll_id = self.after(self.__frame_delay(), self.__poll_worker)
+
+	def __apply_changes(self, changes: dict[int, int]) -> None:
+		if not changes:
+			return
+		if self.__raster is not None and len(changes) > self.settings.raster_rebuild_threshold:
+			self.__raster_dirty = True
+		self.__fade_created_arrows()
+		cols = self.__size.y
+		changed: set[Vector2i] = set()
+		for index, code in changes.items():
+			node = Vector2i.of(*divmod(index, cols))
+			changed.add(node)
+			self.__directions[index] = code
+			if code == ORIGIN:
+				self.__origins.add(node)
+			else:
+				self.__origins.discard(node)
+				self.__last_created_arrows.add(node)
+			self.__recolor_node(node)
+		self.__draw_arrows(list(changed))
+		self.__refresh_solution(changed)
+		if self.__raster_dirty:
+			self.__draw_raster()
+	# endregion background_stepping
 
 	def get_weigthed_directions(self, position: Vector2i):
 		directions: list[Vector2i] = self.adjacent_nodes(position)
-		weigths = [1 / (self.visit_count[n] + 1) for n in directions]
+		weigths = [1 / (self.visit_count.get(n, 0) + 1) for n in directions]
 		return directions, weigths
 
 	def adjacent_nodes(self, node: Vector2i) -> list[Vector2i]:
 		res: list[Vector2i] = []
 		if 0 <= node.x - 1 < self.__size.x:
-			res.append(Vector2i(node.x - 1, node.y))
+			res.append(Vector2i.of(node.x - 1, node.y))
 		if 0 <= node.x + 1 < self.__size.x:
-			res.append(Vector2i(node.x + 1, node.y))
+			res.append(Vector2i.of(node.x + 1, node.y))
 		if 0 <= node.y - 1 < self.__size.y:
-			res.append(Vector2i(node.x, node.y - 1))
+			res.append(Vector2i.of(node.x, node.y - 1))
 		if 0 <= node.y + 1 < self.__size.y:
-			res.append(Vector2i(node.x, node.y + 1))
+			res.append(Vector2i.of(node.x, node.y + 1))
 		return res
 
-	def __get_graphical_node(self, position: Vector2i) -> int:
-		return self.__graph.nodes[position]['gfnode']
+	def __get_parent(self, node: Vector2i) -> Vector2i | None:
+		offset = DIRECTION_OFFSETS[self.__directions[node.x * self.__size.y + node.y]]
+		if offset is None:
+			return None
+		return Vector2i.of(node.x + offset[0], node.y + offset[1])
+
+	def __set_parent(self, node: Vector2i, parent: Vector2i | None) -> None:
+		code = direction_code((node.x, node.y), None if parent is None else (parent.x, parent.y))
+		self.__directions[node.x * self.__size.y + node.y] = code
+
+	# region drawing
+	def __node_color(self, node: Vector2i) -> str:
+		if node in self.__origins:
+			return self.settings.origin_color
+		if node in self.__solution_extremities:
+			return self.settings.path_nodes_color
+		return self.settings.node_color
+
+	def __arrow_color(self, child: Vector2i) -> str:
+		if child in self.__solution_children:
+			return self.settings.path_arrow_color
+		if child in self.__last_created_arrows:
+			return self.settings.arrow_just_created_color
+		return self.settings.arrow_color
+
+	def __fade_created_arrows(self) -> None:
+		created, self.__last_created_arrows = self.__last_created_arrows, set()
+		for child in created:
+			self.__recolor_arrow(child)
+
+	def __recolor_arrow(self, child: Vector2i) -> None:
+		if self.__raster is not None:
+			self.__draw_raster_node(child)
+			return
+		arrow = self.__arrow_items.get(child)
+		if arrow is not None:
+			self.itemconfigure(arrow, fill=self.__arrow_color(child))
+
+	def __recolor_node(self, node: Vector2i) -> None:
+		if self.__raster is not None:
+			self.__draw_raster_node(node)
+			return
+		item = self.__node_items.get(node)
+		if item is not None:
+			self.itemconfigure(item, fill=self.__node_color(node))
+
+	def __draw_arrow(self, child: Vector2i) -> None:
+		self.__draw_arrows([child])
+
+	def __draw_arrows(self, children: list[Vector2i]) -> None:
+		"""
+		Replace the arrow items of the visible `children` by arrows to their current parent.
+		"""
+		if self.__raster is not None:
+			for child in children:
+				self.__draw_raster_node(child)
+			return
+		for child in children:
+			arrow = self.__arrow_items.pop(child, None)
+			if arrow is not None:
+				self.delete(arrow)
+		children = [c for c in children if c in self.__node_items]
+		parents = [self.__get_parent(c) for c in children]
+		children = [c for c, p in zip(children, parents) if p is not None]
+		parents = [p for p in parents if p is not None]
+		starts = self.__world_positions(children)
+		ends = self.__world_positions(parents)
+		offsets = (ends - starts).normalized() * self.settings.node_radius
+		starts = (starts + offsets - self.__view) * self.__zoom
+		ends = (ends - offsets - self.__view) * self.__zoom
+		for child, x0, y0, x1, y1 in zip(children, starts.x, starts.y, ends.x, ends.y):
+			self.__arrow_items[child] = self.create_line(
+				x0, y0, x1, y1, arrow=tk.LAST, fill=self.__arrow_color(child), tags=('maze', 'arrow')
+			)
+
+	def __world_positions(self, nodes: list[Vector2i]) -> Vector2Array:
+		return Vector2Array([n.y for n in nodes], [n.x for n in nodes]) * self.settings.node_spacing + self.settings.start_point
+
+	def __to_screen(self, nodes: list[Vector2i]) -> Vector2Array:
+		return (self.__world_positions(nodes) - self.__view) * self.__zoom
+
+	def __clear_items(self) -> None:
+		self.delete('maze')
+		self.__node_items.clear()
+		self.__arrow_items.clear()
+		self.__hover_item = None
+		self.__visible = 0, 0, 0, 0
+		self.__raster = None
+		self.__raster_item = None
+	# endregion drawing
+
+	# region viewport
+	def zoom_at(self, x: int, y: int, factor: float) -> None:
+		"""
+		Zoom by `factor` keeping the point under the canvas pixel (x, y) in place.
+		"""
+		zoom = min(max(self.__zoom * factor, self.settings.min_zoom), self.settings.max_zoom)
+		pointer = Vector2(x, y)
+		self.__view = self.__view + pointer / self.__zoom - pointer / zoom
+		self.__zoom = zoom
+		self.__schedule_viewport_update(force=True)
+
+	def pan(self, dx: int, dy: int) -> None:
+		"""
+		Move the content of the canvas by (dx, dy) pixels.
+		"""
+		self.__view = self.__view - Vector2(dx, dy) / self.__zoom
+		self.move('maze', dx, dy)
+		self.__schedule_viewport_update()
+
+	def __on_pan_start(self, event: tk.Event) -> None:
+		self.__pan_anchor = event.x, event.y
 
-	def __get_graphical_arrow(self, p1: Vector2i, p2: Vector2i) -> int:
-		return self.__graph.edges[p1, p2]['gfarrow']
+	def __on_pan_motion(self, event: tk.Event) -> None:
+		if self.__pan_anchor is None:
+			return
+		x, y = self.__pan_anchor
+		self.__pan_anchor = event.x, event.y
+		self.pan(event.x - x, event.y - y)
+
+	def __on_left_click(self, event: tk.Event) -> None:
+		node = self.node_at(event.x, event.y)
+		if node is not None:
+			self.change_solution_node(node)
 
-	def __recolor_arrow(self, arrow: int, color: str) -> None:
-		self.itemconfigure(arrow, fill=color)
+	def __on_right_click(self, event: tk.Event) -> None:
+		node = self.node_at(event.x, event.y)
+		if node is not None:
+			self.toggle_origin(node)
 
-	def __recolor_node(self, node: int, color: str) -> None:
-		self.itemconfigure(node, fill=color)
+	def node_at(self, x: int, y: int) -> Vector2i | None:
+		"""
+		:return: the node drawn at the canvas pixel (x, y), or None if there is none
+		"""
+		start = self.settings.start_point
+		node = node_at_pixel(
+			x, y, (self.__size.x, self.__size.y), (self.__view.x, self.__view.y), self.__zoom, self.settings.node_spacing,
+			(start.x, start.y), self.settings.node_radius, is_rasterized=self.__raster is not None
+		)
+		return None if node is None else Vector2i.of(*node)
+
+	def __hover(self, node: Vector2i | None) -> None:
+		if node is None:
+			if self.__hover_item is not None:
+				self.itemconfigure(self.__hover_item, state='hidden')
+			return
+		radius = self.settings.node_radius * self.__zoom + 2
+		middle = self.__to_screen([node])
+		x, y = middle.x[0], middle.y[0]
+		if self.__hover_item is None:
+			self.__hover_item = self.create_oval(
+				x - radius, y - radius, x + radius, y + radius,
+				outline=self.settings.hover_color, width=2, tags=('maze', 'hover')
+			)
+		else:
+			self.coords(self.__hover_item, x - radius, y - radius, x + radius, y + radius)
+			self.itemconfigure(self.__hover_item, state='normal')
+			self.tag_raise(self.__hover_item)
+
+	def __viewport_size(self) -> tuple[int, int]:
+		width, height = self.winfo_width(), self.winfo_height()
+		# the canvas is not mapped yet
+		if width <= 1 or height <= 1:
+			width, height = int(self.cget('width')), int(self.cget('height'))
+		return width, height
+
+	def __is_rasterized(self) -> bool:
+		return self.settings.node_spacing * self.__zoom < self.settings.lod_cell_size
+
+	def __schedule_viewport_update(self, force: bool = False) -> None:
+		self.__viewport_force_update |= force
+		if self.__viewport_update_id is None:
+			self.__viewport_update_id = self.after_idle(self.__update_viewport)
+
+	def __update_viewport(self, force: bool = False) -> None:
+		"""
+		Create the canvas items of the nodes entering the viewport and delete the ones leaving it.
+
+		:param force: recreate every item, needed when the zoom changed
+		"""
+		if self.__viewport_update_id is not None:
+			self.after_cancel(self.__viewport_update_id)
+			self.__viewport_update_id = None
+		force |= self.__viewport_force_update
+		self.__viewport_force_update = False
+		if self.__is_rasterized():
+			if self.__raster is None:
+				self.__clear_items()
+			self.__draw_raster()
+			return
+		if force or self.__raster is not None:
+			self.__clear_items()
+		old_row0, old_row1, old_col0, old_col1 = self.__visible
+		row0, row1, col0, col1 = self.__visible = self.__compute_visible_range()
+		for row in range(old_row0, old_row1):
+			is_row_visible = row0 <= row < row1
+			for col in range(old_col0, old_col1):
+				if not (is_row_visible and col0 <= col < col1):
+					self.remove_node(Vector2i.of(row, col))
+		added: list[Vector2i] = []
+		for row in range(row0, row1):
+			was_row_visible = old_row0 <= row < old_row1
+			for col in range(col0, col1):
+				if not (was_row_visible and old_col0 <= col < old_col1):
+					added.append(Vector2i.of(row, col))
+		self.add_nodes(added)
+
+	def __compute_visible_range(self) -> tuple[int, int, int, int]:
+		start = self.settings.start_point
+		return visible_range(
+			(self.__size.x, self.__size.y), self.__viewport_size(), (self.__view.x, self.__view.y), self.__zoom,
+			self.settings.node_spacing, (start.x, start.y)
+		)
+	# endregion viewport
+
+	# region raster
+	# the raster is a grid of (2 * rows - 1) by (2 * cols - 1) squares: the nodes are at even coordinates,
+	# the connexions between 2 nodes at odd ones. Each pixel of the viewport shows the square under its center.
+	def __pixels_to_grid(self, nb_pixels: int, view: float, start: float) -> list[int]:
+		half_spacing = self.settings.node_spacing / 2
+		zoom = self.__zoom
+		return [math.floor((view + (p + 0.5) / zoom - start) / half_spacing + 0.5) for p in range(nb_pixels)]
+
+	def __grid_to_pixels(self, g: int, view: float, start: float, nb_pixels: int) -> tuple[int, int]:
+		half_spacing = self.settings.node_spacing / 2
+		low = (start + (g - 0.5) * half_spacing - view) * self.__zoom
+		high = (start + (g + 0.5) * half_spacing - view) * self.__zoom
+		return max(0, math.ceil(low - 0.5)), min(nb_pixels, math.ceil(high - 0.5))
+
+	def __grid_color(self, gy: int, gx: int, node_color: Callable[[int], str], arrow_color: Callable[[int], str]) -> str:
+		rows, cols = self.__size.x, self.__size.y
+		if not (0 <= gy <= 2 * rows - 2 and 0 <= gx <= 2 * cols - 2):
+			return self.cget('bg')
+		row, is_odd_row = divmod(gy, 2)
+		col, is_odd_col = divmod(gx, 2)
+		index = row * cols + col
+		if not (is_odd_row or is_odd_col):
+			return node_color(index)
+		if is_odd_row and is_odd_col:
+			return self.cget('bg')
+		if is_odd_col:
+			neighbor, toward, backward = index + 1, RIGHT, LEFT
+		else:
+			neighbor, toward, backward = index + cols, DOWN, UP
+		if self.__directions[index] == toward:
+			return arrow_color(index)
+		if self.__directions[neighbor] == backward:
+			return arrow_color(neighbor)
+		return self.cget('bg')
+
+	def __draw_raster(self) -> None:
+		self.__raster_dirty = False
+		width, height = self.__viewport_size()
+		if self.__raster is None or self.__raster.width() != width or self.__raster.height() != height:
+			if self.__raster_item is not None:
+				self.delete(self.__raster_item)
+			self.__raster = tk.PhotoImage(master=self, width=width, height=height)
+			self.__raster_item = self.create_image(0, 0, anchor='nw', image=self.__raster, tags=('maze', 'raster'))
+		else:
+			self.coords(self.__raster_item, 0, 0)
+		# the colors that are not the default ones, by node index
+		cols = self.__size.y
+		node_colors = {o.x * cols + o.y: self.settings.path_nodes_color for o in self.__solution_extremities}
+		node_colors.update({o.x * cols + o.y: self.settings.origin_color for o in self.__origins})
+		arrow_colors = {n.x * cols + n.y: self.settings.arrow_just_created_color for n in self.__last_created_arrows}
+		arrow_colors.update({n.x * cols + n.y: self.settings.path_arrow_color for n in self.__solution_children})
+		node_color = lambda i, get=node_colors.get, default=self.settings.node_color: get(i, default)
+		arrow_color = lambda i, get=arrow_colors.get, default=self.settings.arrow_color: get(i, default)
+
+		gxs = self.__pixels_to_grid(width, self.__view.x, self.settings.start_point.x)
+		gys = self.__pixels_to_grid(height, self.__view.y, self.settings.start_point.y)
+		lines: dict[int, str] = {}
+		for gy in set(gys):
+			colors: dict[int, str] = {}
+			for gx in gxs:
+				if gx not in colors:
+					colors[gx] = self.__grid_color(gy, gx, node_color, arrow_color)
+			lines[gy] = '{' + ' '.join([colors[gx] for gx in gxs]) + '}'
+		self.__raster.put(' '.join([lines[gy] for gy in gys]), to=(0, 0))
+
+	def __draw_raster_node(self, node: Vector2i) -> None:
+		"""
+		Redraw the square of a node and of its 4 connexions.
+		"""
+		if self.__raster_dirty:
+			return
+		cols = self.__size.y
+		node_color = lambda i: self.__node_color(Vector2i.of(*divmod(i, cols)))
+		arrow_color = lambda i: self.__arrow_color(Vector2i.of(*divmod(i, cols)))
+		width, height = self.__raster.width(), self.__raster.height()
+		start = self.settings.start_point
+		gy, gx = 2 * node.x, 2 * node.y
+		for y, x in ((gy, gx), (gy - 1, gx), (gy + 1, gx), (gy, gx - 1), (gy, gx + 1)):
+			x0, x1 = self.__grid_to_pixels(x, self.__view.x, start.x, width)
+			y0, y1 = self.__grid_to_pixels(y, self.__view.y, start.y, height)
+			if x0 < x1 and y0 < y1:
+				color = self.__grid_color(y, x, node_color, arrow_color)
+				self.__raster.put('{' + color + '}', to=(x0, y0, x1, y1))
+	# endregion raster
+
+	def get_color_at(self, x: int, y: int) -> str | None:
+		"""
+		:return: the color drawn at the canvas pixel (x, y), or None if the background is visible there
+		"""
+		if self.__raster is not None:
+			rgb = self.__raster.get(x, y)
+			if isinstance(rgb, str):
+				rgb = rgb.split()
+			return '#%02x%02x%02x' % tuple(int(c) for c in rgb)
+		obj = self.find_overlapping(x, y, x, y)
+		return None if len(obj) == 0 else self.itemcget(obj[0], "fill")
 
 	def get_area(self) -> tuple[int, int, int, int]:
 		"""
-		:return: [x, y, width, height]
+		:return: [x, y, width, height] of the part of the maze visible on the canvas
 		"""
-		width, height = self.settings.node_spacing * (self.__size - Vector2i(1, 1)) + self.settings.start_point * 2
-		return 0, 0, math.ceil(width), math.ceil(height)
+		size = Vector2(self.__size.y - 1, self.__size.x - 1) * self.settings.node_spacing + self.settings.start_point * 2
+		top_left: Vector2 = -self.__view * self.__zoom
+		bottom_right: Vector2 = (size - self.__view) * self.__zoom
+		width, height = self.__viewport_size()
+		x0, y0 = max(0, math.floor(top_left.x)), max(0, math.floor(top_left.y))
+		x1, y1 = min(width, math.ceil(bottom_right.x)), min(height, math.ceil(bottom_right.y))
+		return x0, y0, max(0, x1 - x0), max(0, y1 - y0)
 
 
 class MazeSettings:
@@ -428,9 +1009,18 @@ class MazeSettings:
 		self.arrow_just_created_color = "orange"
 		self.path_arrow_color = "cadetblue3"
 		self.path_nodes_color = "blue"
+		self.hover_color = "gold"
 		self.node_spacing = 50
 		self.node_radius = 5
 		self.start_point = Vector2(20, 20)
+		self.max_fps = 30
+		# below this many pixels between 2 nodes, the maze is drawn as a single image
+		self.lod_cell_size = 12
+		self.min_zoom = 0.001
+		self.max_zoom = 8.0
+		self.zoom_step = 1.25
+		# above this many changes in a frame, the image is redrawn at once instead of node by node
+		self.raster_rebuild_threshold = 2000
 
 
 class Signal:
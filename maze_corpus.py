@@ -0,0 +1,209 @@
+"""
+Store of many mazes on disk, indexed by size and metrics to find them without reading them all.
+
+A corpus is a directory with a SQLite index and a blob file, where the mazes are appended as binary records of maze_io.
+The metrics of every maze are computed when it is added:
+	- solution_length: number of nodes of the path between the bottom left and top right nodes, found with
+	  direct_pathing like the solution shown by the GUI. NULL when both nodes are not in the same tree
+	- depth: largest distance between a node and its origin
+	- dead_ends: number of nodes linked to a single other node
+
+Example:
+	with MazeCorpus('corpus') as corpus:
+		corpus.add_many(maze_io.iter_records(open('mazes.bin', 'rb')))
+		for directions, size, maze_id in corpus.query(rows=64, cols=64, solution_length=(501, None), dead_ends=(None, 99)):
+			...
+"""
+import io
+import os
+import sqlite3
+from typing import Iterable, Iterator, NamedTuple
+
+import maze_io
+from data_only_script import ORIGIN, DIRECTION_OFFSETS, Size, direct_pathing
+
+METRICS = ('solution_length', 'depth', 'dead_ends')
+# a criterion is either an exact value, or an inclusive (minimum, maximum) range where None is unbounded
+Criterion = int | tuple[int | None, int | None]
+
+
+class CorpusEntry(NamedTuple):
+	id: int
+	rows: int
+	cols: int
+	solution_length: int | None
+	depth: int
+	dead_ends: int
+	offset: int
+	length: int
+
+
+def maze_metrics(directions: bytes | bytearray, size: Size) -> tuple[int | None, int, int]:
+	"""
+	:return: (solution length, depth, number of dead ends) of a maze given by its direction codes
+	"""
+	rows, cols = size
+	nb_nodes = rows * cols
+	parents: list[int | None] = [None] * nb_nodes
+	children: list[list[int]] = [[] for _ in range(nb_nodes)]
+	origins: list[int] = []
+	for index, code in enumerate(directions):
+		if code == ORIGIN:
+			origins.append(index)
+			continue
+		row_offset, col_offset = DIRECTION_OFFSETS[code]
+		parent = parents[index] = index + row_offset * cols + col_offset
+		children[parent].append(index)
+
+	# breadth first from the origins: distance and origin of every node
+	depths = [0] * nb_nodes
+	roots = [0] * nb_nodes
+	for origin in origins:
+		roots[origin] = origin
+		layer = [origin]
+		while layer:
+			next_layer = []
+			for node in layer:
+				depth, root = depths[node] + 1, roots[node]
+				for child in children[node]:
+					depths[child] = depth
+					roots[child] = root
+				next_layer.extend(children[node])
+			layer = next_layer
+
+	start, end = (rows - 1) * cols, cols - 1
+	solution_length = None
+	if roots[start] == roots[end]:
+		solution_length = max(1, len(direct_pathing(parents, start, end)))
+	dead_ends = sum(len(node_children) + (parent is not None) == 1 for node_children, parent in zip(children, parents))
+	return solution_length, max(depths), dead_ends
+
+
+class MazeCorpus:
+	"""
+	:param directory: directory of the corpus, created if needed
+	"""
+	def __init__(self, directory: str) -> None:
+		os.makedirs(directory, exist_ok=True)
+		self.directory: str = directory
+		self.connection: sqlite3.Connection = sqlite3.connect(os.path.join(directory, 'index.sqlite'))
+		self.connection.execute("PRAGMA journal_mode = WAL")
+		self.connection.execute("PRAGMA synchronous = NORMAL")
+		self.connection.execute("""
+			CREATE TABLE IF NOT EXISTS mazes (
+				id INTEGER PRIMARY KEY,
+				rows INTEGER NOT NULL,
+				cols INTEGER NOT NULL,
+				solution_length INTEGER,
+				depth INTEGER NOT NULL,
+				dead_ends INTEGER NOT NULL,
+				offset INTEGER NOT NULL,
+				length INTEGER NOT NULL
+			)
+		""")
+		# the queries always select a size first
+		for metric in METRICS:
+			self.connection.execute(f"CREATE INDEX IF NOT EXISTS mazes_{metric} ON mazes (rows, cols, {metric})")
+		self.connection.commit()
+		self.__blobs = open(os.path.join(directory, 'mazes.bin'), 'a+b')
+
+	def __enter__(self) -> 'MazeCorpus':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def close(self) -> None:
+		self.connection.close()
+		self.__blobs.close()
+
+	def __len__(self) -> int:
+		return self.connection.execute("SELECT COUNT(*) FROM mazes").fetchone()[0]
+
+	def add(self, directions: bytes | bytearray, size: Size) -> int:
+		"""
+		:return: id of the maze in the corpus
+		"""
+		return self.add_many([(directions, size)])[0]
+
+	def add_many(self, mazes: Iterable[tuple[bytes | bytearray, Size] | tuple[bytes | bytearray, Size, int]], batch_size: int = 10_000) -> list[int]:
+		"""
+		Add mazes, one transaction per batch of `batch_size` mazes. The ids given with the mazes, like the ones of
+		maze_io.iter_records, are ignored: the corpus gives its own ids.
+
+		:return: ids of the added mazes
+		"""
+		next_id = (self.connection.execute("SELECT MAX(id) FROM mazes").fetchone()[0] or 0) + 1
+		ids: list[int] = []
+		batch: list[tuple] = []
+		blobs: list[bytes] = []
+		self.__blobs.seek(0, io.SEEK_END)
+		offset = self.__blobs.tell()
+		for directions, size, *_ in mazes:
+			record = maze_io.encode_record(directions, size, next_id)
+			batch.append((next_id, *size, *maze_metrics(directions, size), offset, len(record)))
+			blobs.append(record)
+			ids.append(next_id)
+			offset += len(record)
+			next_id += 1
+			if len(batch) >= batch_size:
+				self.__write_batch(batch, blobs)
+				batch, blobs = [], []
+		if batch:
+			self.__write_batch(batch, blobs)
+		return ids
+
+	def __write_batch(self, batch: list[tuple], blobs: list[bytes]) -> None:
+		# the blobs are written first: an interrupted batch leaves unreferenced bytes, never a dangling index entry
+		self.__blobs.writelines(blobs)
+		self.__blobs.flush()
+		with self.connection:
+			self.connection.executemany("INSERT INTO mazes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+	def select(self, limit: int | None = None, **criteria: Criterion) -> list[CorpusEntry]:
+		"""
+		Find mazes by size and metrics without reading them, for instance
+		select(rows=64, cols=64, solution_length=(501, None), dead_ends=(None, 99)). The entries are in no particular
+		order, so that a limited query stops as soon as it has found enough mazes in an index.
+
+		:param criteria: exact value or inclusive range of rows, cols, solution_length, depth or dead_ends
+		"""
+		conditions: list[str] = []
+		parameters: list[int] = []
+		for column, criterion in criteria.items():
+			if column not in ('rows', 'cols', *METRICS):
+				raise ValueError(f"Unknown criterion {column!r}")
+			if isinstance(criterion, tuple):
+				minimum, maximum = criterion
+				if minimum is not None:
+					conditions.append(f"{column} >= ?")
+					parameters.append(minimum)
+				if maximum is not None:
+					conditions.append(f"{column} <= ?")
+					parameters.append(maximum)
+			else:
+				conditions.append(f"{column} = ?")
+				parameters.append(criterion)
+		query = "SELECT * FROM mazes"
+		if conditions:
+			query += " WHERE " + " AND ".join(conditions)
+		if limit is not None:
+			query += " LIMIT ?"
+			parameters.append(limit)
+		return [CorpusEntry(*row) for row in self.connection.execute(query, parameters)]
+
+	def load(self, entries: Iterable[CorpusEntry]) -> Iterator[tuple[bytearray, Size, int]]:
+		"""
+		Read the mazes of the entries, in the order of the blob file.
+
+		:return: (directions, size, id) of every maze, like maze_io.iter_records
+		"""
+		for entry in sorted(entries, key=lambda e: e.offset):
+			self.__blobs.seek(entry.offset)
+			yield maze_io.read_record(io.BytesIO(self.__blobs.read(entry.length)))
+
+	def query(self, limit: int | None = None, **criteria: Criterion) -> Iterator[tuple[bytearray, Size, int]]:
+		"""
+		Read only the mazes matching the criteria, see :meth:`select`.
+		"""
+		return self.load(self.select(limit, **criteria))
@@ -0,0 +1,300 @@
+"""
+Differences between mazes given by their direction codes (see data_only_script.encode_maze and maze_io).
+
+A maze is turned into big integers holding one byte per node, so that comparing two mazes is a few integer operations
+done in C over all their nodes at once, whatever their size:
+	- the pointer diff lists the nodes whose parent differs
+	- the edge diff lists the passages that exist in only one of the mazes, whatever the direction of their arrow
+	- the solutions between the bottom left and top right nodes, like the one shown by the GUI, are compared too
+
+:func:`pairwise_distances` compares every pair of mazes of a batch, or :func:`iter_pairwise_distances` row by row,
+and :func:`origin_shift_edits` finds origin-shift steps turning a maze into another one::
+
+	difference = diff(first, second, (64, 64))
+	print(difference.changed_pointers, len(difference.removed_edges), difference.diverging_at)
+	edits = origin_shift_edits(first, second, (64, 64))
+	assert apply_edits(first, (64, 64), edits) == second
+"""
+from array import array
+from itertools import islice
+from typing import Iterator, NamedTuple, Sequence
+
+from data_only_script import ORIGIN, UP, DOWN, LEFT, RIGHT, DIRECTION_OFFSETS, Size, direct_pathing, direction_code
+
+Directions = bytes | bytearray
+# (node, neighbor) indexes of a passage, the neighbor being the node on the right or below
+Edge = tuple[int, int]
+
+
+def _code_table(*codes: int) -> bytes:
+	"""
+	:return: translation table giving 1 for the codes, 0 otherwise
+	"""
+	return bytes(int(code in codes) for code in range(256))
+
+
+_IS_RIGHT, _IS_LEFT, _IS_DOWN, _IS_UP = _code_table(RIGHT), _code_table(LEFT), _code_table(DOWN), _code_table(UP)
+# every direction code gets its own bit, so that the bytes of two mazes have a common bit only if their codes are equal
+_ONE_HOT = bytes(1 << code if code < 8 else 0 for code in range(256))
+
+
+def _as_int(directions: Directions) -> int:
+	return int.from_bytes(directions, 'big')
+
+
+def _low_bits(nb_nodes: int) -> int:
+	"""
+	:return: an integer whose bytes are all 1
+	"""
+	return _as_int(b'\x01' * nb_nodes)
+
+
+def pointer_mask(first: Directions, second: Directions) -> int:
+	"""
+	:return: an integer whose byte of every node is 1 if its parent differs in both mazes, 0 otherwise
+	"""
+	different = _as_int(first) ^ _as_int(second)
+	# the codes are below 8: a byte is not null if one of its 3 lowest bits is set
+	return (different | different >> 1 | different >> 2) & _low_bits(len(first))
+
+
+def edge_masks(directions: Directions, size: Size) -> tuple[int, int]:
+	"""
+	:return: (horizontal, vertical) integers whose byte of every node is 1 if there is a passage toward the node on its
+		right, respectively below it
+	"""
+	cols = size[1]
+	# the arrow of a passage leaves from either of its nodes. Shifting by a byte aligns a node with the one after it
+	horizontal = _as_int(directions.translate(_IS_RIGHT)) | _as_int(directions.translate(_IS_LEFT)) << 8
+	vertical = _as_int(directions.translate(_IS_DOWN)) | _as_int(directions.translate(_IS_UP)) << 8 * cols
+	# the shifts push the first nodes out of the maze
+	nodes = (1 << 8 * len(directions)) - 1
+	return horizontal & nodes, vertical & nodes
+
+
+def _indexes(mask: int, nb_nodes: int) -> list[int]:
+	"""
+	:return: indexes of the nodes whose byte is not null
+	"""
+	data = mask.to_bytes(nb_nodes, 'big')
+	indexes = []
+	index = data.find(1)
+	while index != -1:
+		indexes.append(index)
+		index = data.find(1, index + 1)
+	return indexes
+
+
+def _parents(directions: Directions, cols: int) -> list[int | None]:
+	parents: list[int | None] = []
+	for index, code in enumerate(directions):
+		offset = DIRECTION_OFFSETS[code]
+		parents.append(None if offset is None else index + offset[0] * cols + offset[1])
+	return parents
+
+
+def _root(parents: Sequence[int | None], node: int) -> int:
+	while (parent := parents[node]) is not None:
+		node = parent
+	return node
+
+
+def solution(directions: Directions, size: Size) -> list[int]:
+	"""
+	:return: indexes of the nodes of the path from the bottom left node to the top right node, empty if they are not in
+		the same tree
+	"""
+	rows, cols = size
+	parents = _parents(directions, cols)
+	start, end = (rows - 1) * cols, cols - 1
+	if _root(parents, start) != _root(parents, end):
+		return []
+	return direct_pathing(parents, start, end) or [start]
+
+
+class MazeDiff(NamedTuple):
+	# number of nodes whose parent differs
+	changed_pointers: int
+	# one byte per node, 1 if its parent differs
+	pointer_mask: bytes
+	# passages only in the first maze
+	removed_edges: list[Edge]
+	# passages only in the second maze
+	added_edges: list[Edge]
+	# solutions of both mazes, see :func:`solution`
+	solutions: tuple[list[int], list[int]]
+	# number of nodes at the start of both solutions before they take different paths
+	diverging_at: int
+
+	@property
+	def changed_edges(self) -> int:
+		return len(self.removed_edges) + len(self.added_edges)
+
+
+def diff(first: Directions, second: Directions, size: Size) -> MazeDiff:
+	"""
+	Compare two mazes of the same size.
+	"""
+	nb_nodes = size[0] * size[1]
+	if len(first) != nb_nodes or len(second) != nb_nodes:
+		raise ValueError(f"Both mazes must have {nb_nodes} nodes, not {len(first)} and {len(second)}")
+	cols = size[1]
+	mask = pointer_mask(first, second)
+	removed_edges: list[Edge] = []
+	added_edges: list[Edge] = []
+	for first_edges, second_edges, offset in zip(edge_masks(first, size), edge_masks(second, size), (1, cols)):
+		removed_edges.extend((node, node + offset) for node in _indexes(first_edges & ~second_edges, nb_nodes))
+		added_edges.extend((node, node + offset) for node in _indexes(second_edges & ~first_edges, nb_nodes))
+	solutions = solution(first, size), solution(second, size)
+	diverging_at = 0
+	for first_node, second_node in zip(*solutions):
+		if first_node != second_node:
+			break
+		diverging_at += 1
+	return MazeDiff(
+		mask.bit_count(), mask.to_bytes(nb_nodes, 'big'), sorted(removed_edges), sorted(added_edges), solutions,
+		diverging_at
+	)
+
+
+# region batches
+def pack_pointers(directions: Directions) -> int:
+	"""
+	:return: an integer where two mazes have as many common bits as nodes with the same parent
+	"""
+	return _as_int(directions.translate(_ONE_HOT))
+
+
+def pack_edges(directions: Directions, size: Size) -> int:
+	"""
+	:return: an integer where two mazes have as many different bits as passages in only one of them
+	"""
+	horizontal, vertical = edge_masks(directions, size)
+	return horizontal << 1 | vertical
+
+
+def iter_pairwise_distances(batch: Sequence[Directions], size: Size, edges: bool = False) -> Iterator[array]:
+	"""
+	Compare every pair of mazes of a batch, row by row, with one integer operation and one bit count per pair.
+
+	:param edges: count the passages in only one maze of the pair instead of the nodes whose parent differs
+	:return: for every maze i, the distances to the mazes i + 1, i + 2... n - 1
+	"""
+	nb_nodes = size[0] * size[1]
+	if edges:
+		packed = [pack_edges(directions, size) for directions in batch]
+		for i, first in enumerate(packed):
+			yield array('I', [(first ^ second).bit_count() for second in islice(packed, i + 1, None)])
+	else:
+		packed = [pack_pointers(directions) for directions in batch]
+		for i, first in enumerate(packed):
+			yield array('I', [nb_nodes - (first & second).bit_count() for second in islice(packed, i + 1, None)])
+
+
+def pairwise_distances(batch: Sequence[Directions], size: Size, edges: bool = False) -> array:
+	"""
+	Compare every pair of mazes of a batch, see :func:`iter_pairwise_distances`. 10 000 mazes of 8x8 nodes, about 50
+	million pairs, take 10 to 20 seconds depending on the machine, and their distances 200 MB: iterate over the rows
+	with :func:`iter_pairwise_distances` to process them without keeping them all.
+
+	:return: distance of every pair (i, j) with i < j, in the order (0, 1), (0, 2)... (0, n - 1), (1, 2)... The distance
+		of the pair (i, j) is at index n * i - i * (i + 1) // 2 + j - i - 1
+	"""
+	distances = array('I')
+	for row in iter_pairwise_distances(batch, size, edges):
+		distances.extend(row)
+	return distances
+
+
+# endregion batches
+
+
+# region edits
+def _origin(directions: Directions) -> int:
+	origin = directions.find(ORIGIN)
+	if origin == -1 or directions.find(ORIGIN, origin + 1) != -1:
+		raise ValueError("Only mazes with a single origin can be edited with origin-shift steps")
+	return origin
+
+
+def origin_shift_edits(first: Directions, second: Directions, size: Size) -> list[int]:
+	"""
+	Find origin-shift steps turning the first maze into the second one. Every step moves the origin to a neighbor, like
+	data_only_script.origin_shift. Both mazes must have a single origin.
+
+	The origin first walks to the origin of the second maze along the first maze. After that, only the nodes whose
+	parent is still wrong need to be visited: the origin goes through the second maze, depth first, entering only the
+	subtrees containing such a node. A node reached that way is left for the last time toward its parent in the second
+	maze, and the others are never visited again.
+
+	:return: the node the origin moves to at every step
+	"""
+	if len(first) != len(second):
+		raise ValueError("Both mazes must have the same size")
+	cols = size[1]
+	first_parents = _parents(first, cols)
+	second_parents = _parents(second, cols)
+	first_origin, second_origin = _origin(first), _origin(second)
+
+	# walking the origin back along the path of the first maze reverses the arrows of that path
+	path: list[int] = []
+	node = second_origin
+	while node != first_origin:
+		path.append(node)
+		node = first_parents[node]
+	edits = path[::-1]
+	parents = list(first_parents)
+	previous = first_origin
+	for node in edits:
+		parents[previous] = node
+		previous = node
+	parents[second_origin] = None
+
+	# the nodes to visit are the wrong ones and their ancestors in the second maze
+	to_visit = bytearray(len(parents))
+	for node, parent in enumerate(parents):
+		if parent != second_parents[node]:
+			while node is not None and not to_visit[node]:
+				to_visit[node] = 1
+				node = second_parents[node]
+	children: dict[int, list[int]] = {}
+	for node in _indexes(_as_int(to_visit), len(to_visit)):
+		parent = second_parents[node]
+		if parent is not None:
+			children.setdefault(parent, []).append(node)
+
+	# depth first tour of the second maze from its origin, going back to the parent after every subtree
+	stack: list[tuple[int, Iterator[int]]] = [(second_origin, iter(children.get(second_origin, ())))]
+	while stack:
+		node, remaining = stack[-1]
+		child = next(remaining, None)
+		if child is None:
+			stack.pop()
+			if stack:
+				edits.append(stack[-1][0])
+		else:
+			edits.append(child)
+			stack.append((child, iter(children.get(child, ()))))
+	return edits
+
+
+def apply_edits(directions: Directions, size: Size, edits: Sequence[int]) -> bytearray:
+	"""
+	Do the origin-shift steps given by :func:`origin_shift_edits` on a copy of a maze with a single origin.
+
+	:return: the direction codes of the maze after the steps
+	"""
+	rows, cols = size
+	directions = bytearray(directions)
+	origin = _origin(directions)
+	for node in edits:
+		(origin_row, origin_col), (row, col) = divmod(origin, cols), divmod(node, cols)
+		if abs(origin_row - row) + abs(origin_col - col) != 1 or not 0 <= node < rows * cols:
+			raise ValueError(f"The origin cannot move from {origin} to {node}, which is not a neighbor")
+		directions[origin] = direction_code((origin_row, origin_col), (row, col))
+		directions[node] = ORIGIN
+		origin = node
+	return directions
+
+
+# endregion edits
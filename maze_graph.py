@@ -0,0 +1,214 @@
+"""
+Read-only networkx views of a maze, computed on demand from its parent pointers.
+
+The views never copy the maze: they always show its current state, so networkx algorithms can run on a live maze
+without rebuilding a graph after every step::
+
+	maze = generate_default_maze((1000, 1000))
+	graph = MazeGraph(maze)
+	networkx.shortest_path(graph, (999, 0), (0, 999))
+
+A maze is either a dict (see data_only_script.Maze), whose nodes are its positions and whose neighbors are found with
+data_only_script.neighbors, or a list of parent indexes (see topology.py), given with the adjacency of its topology.
+In the directed view, every node has an edge toward its parent, like in the GUI. The undirected view links every node
+to its parent and its children.
+"""
+from collections.abc import Mapping
+from typing import Hashable, Iterator, Sequence
+
+import networkx as nx
+
+from data_only_script import ORIGIN, DIRECTION_OFFSETS, neighbors
+
+# edges and nodes have no attributes. Shared by all the views, and never modified since the graphs are frozen
+_NO_DATA: dict = {}
+
+
+class _Nodes(Mapping):
+	def __init__(self, maze) -> None:
+		self._maze = maze
+
+	def __getitem__(self, node: Hashable) -> dict:
+		if node not in self:
+			raise KeyError(node)
+		return _NO_DATA
+
+	def __contains__(self, node: object) -> bool:
+		if isinstance(self._maze, dict):
+			return node in self._maze
+		return isinstance(node, int) and 0 <= node < len(self._maze)
+
+	def __iter__(self) -> Iterator[Hashable]:
+		return iter(self._maze) if isinstance(self._maze, dict) else iter(range(len(self._maze)))
+
+	def __len__(self) -> int:
+		return len(self._maze)
+
+
+class _NodeAdjacency(Mapping):
+	"""
+	Neighbors of one node in a view, mapped to their (empty) edge data.
+	"""
+	def __init__(self, graph: '_MazeView', node: Hashable, parent: bool, children: bool) -> None:
+		self._graph = graph
+		self._node = node
+		self._parent = parent
+		self._children = children
+
+	def _neighbors(self) -> list[Hashable]:
+		graph, node = self._graph, self._node
+		maze = graph.maze
+		nodes = []
+		if self._parent and (parent := maze[node]) is not None:
+			nodes.append(parent)
+		if self._children:
+			nodes.extend(n for n in graph.candidates(node) if maze[n] == node)
+		return nodes
+
+	def __getitem__(self, neighbor: Hashable) -> dict:
+		if neighbor not in self:
+			raise KeyError(neighbor)
+		return _NO_DATA
+
+	def __contains__(self, neighbor: object) -> bool:
+		maze, node = self._graph.maze, self._node
+		if neighbor not in self._graph._node:
+			return False
+		return (self._parent and maze[node] == neighbor) or (self._children and maze[neighbor] == node)
+
+	def __iter__(self) -> Iterator[Hashable]:
+		return iter(self._neighbors())
+
+	def __len__(self) -> int:
+		return len(self._neighbors())
+
+
+class _Adjacency(Mapping):
+	def __init__(self, graph: '_MazeView', parent: bool, children: bool) -> None:
+		self._graph = graph
+		self._parent = parent
+		self._children = children
+
+	def __getitem__(self, node: Hashable) -> _NodeAdjacency:
+		if node not in self._graph._node:
+			raise KeyError(node)
+		return _NodeAdjacency(self._graph, node, self._parent, self._children)
+
+	def __contains__(self, node: object) -> bool:
+		return node in self._graph._node
+
+	def __iter__(self) -> Iterator[Hashable]:
+		return iter(self._graph._node)
+
+	def __len__(self) -> int:
+		return len(self._graph._node)
+
+
+class _MazeView:
+	"""
+	Shared part of the directed and undirected views.
+
+	:param maze: a dict maze, or a list of parent indexes. Without a maze, an ordinary empty graph is created, as networkx
+		expects when it builds a new graph of the same class, for instance with copy() or reverse()
+	:param adjacency: neighbors of every node of a list maze. Not needed by dict mazes
+	"""
+	def _init_view(self, maze, adjacency: Sequence[Sequence[int]] | None) -> None:
+		if adjacency is None and not isinstance(maze, dict):
+			raise ValueError("A maze stored as a list needs the adjacency of its topology")
+		self.maze = maze
+		self.maze_adjacency = adjacency
+		self._node = _Nodes(maze)
+		nx.freeze(self)
+
+	def candidates(self, node: Hashable) -> Sequence[Hashable]:
+		"""
+		:return: the nodes that can be linked to the node, whether they are or not
+		"""
+		if self.maze_adjacency is None:
+			return neighbors(self.maze, node)
+		return self.maze_adjacency[node]
+
+	def directed_view(self) -> 'MazeDiGraph':
+		"""
+		:return: directed view of the same maze. Unlike to_directed, nothing is copied
+		"""
+		return MazeDiGraph(self.maze, self.maze_adjacency)
+
+	def undirected_view(self) -> 'MazeGraph':
+		"""
+		:return: undirected view of the same maze. Unlike to_undirected, nothing is copied
+		"""
+		return MazeGraph(self.maze, self.maze_adjacency)
+
+
+class MazeGraph(_MazeView, nx.Graph):
+	"""
+	Undirected read-only view of a maze: every node is linked to its parent and to its children.
+	"""
+	def __init__(self, maze=None, adjacency: Sequence[Sequence[int]] | None = None) -> None:
+		nx.Graph.__init__(self)
+		if maze is None:
+			return
+		self._adj = _Adjacency(self, parent=True, children=True)
+		self._init_view(maze, adjacency)
+
+
+class MazeDiGraph(_MazeView, nx.DiGraph):
+	"""
+	Directed read-only view of a maze: every node has an edge toward its parent.
+	"""
+	def __init__(self, maze=None, adjacency: Sequence[Sequence[int]] | None = None) -> None:
+		nx.DiGraph.__init__(self)
+		if maze is None:
+			return
+		self._adj = _Adjacency(self, parent=True, children=False)
+		self._pred = _Adjacency(self, parent=False, children=True)
+		self._init_view(maze, adjacency)
+
+
+class DirectionsMaze(Sequence):
+	"""
+	Read-only list of parent indexes over the direction codes of a rectangular maze (see
+	data_only_script.default_directions), as stored by the GUI. Changes of the directions are seen immediately.
+	"""
+	def __init__(self, directions: bytes | bytearray, cols: int) -> None:
+		self.directions = directions
+		self.cols = cols
+
+	def __getitem__(self, index: int) -> int | None:
+		code = self.directions[index]
+		if code == ORIGIN:
+			return None
+		row_offset, col_offset = DIRECTION_OFFSETS[code]
+		return index + row_offset * self.cols + col_offset
+
+	def __len__(self) -> int:
+		return len(self.directions)
+
+
+class GridAdjacency(Sequence):
+	"""
+	Neighbors of the nodes of a rectangular maze stored row by row, computed when asked.
+	"""
+	def __init__(self, rows: int, cols: int) -> None:
+		self.rows = rows
+		self.cols = cols
+
+	def __getitem__(self, index: int) -> tuple[int, ...]:
+		if not 0 <= index < len(self):
+			raise IndexError(index)
+		cols = self.cols
+		row, col = divmod(index, cols)
+		nodes = []
+		if row > 0:
+			nodes.append(index - cols)
+		if row + 1 < self.rows:
+			nodes.append(index + cols)
+		if col > 0:
+			nodes.append(index - 1)
+		if col + 1 < cols:
+			nodes.append(index + 1)
+		return tuple(nodes)
+
+	def __len__(self) -> int:
+		return self.rows * self.cols
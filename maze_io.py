@@ -0,0 +1,174 @@
+import json
+import struct
+import zlib
+from typing import BinaryIO, Iterator
+
+from data_only_script import ORIGIN, UP, DOWN, LEFT, RIGHT, Size
+
+# region binary
+# A binary maze record is a header, the index of every origin, then the direction of every node packed on 2 bits,
+# 4 nodes per byte, row by row. The direction of an origin is stored as UP and restored from the origin list.
+MAGIC = b'OSMZ'
+VERSION = 1
+HEADER = struct.Struct('<4sBQIII')  # magic, version, id, rows, cols, number of origins
+ORIGIN_INDEX = struct.Struct('<I')
+
+# direction code (see data_only_script.ORIGIN) <-> 2 bits value
+_TO_BITS = bytes([0, 0, 1, 2, 3]) + bytes(251)
+_FROM_BITS = bytes([UP, DOWN, LEFT, RIGHT]) + bytes(252)
+
+
+def pack_directions(directions: bytes | bytearray) -> bytes:
+	bits = bytes(directions).translate(_TO_BITS)
+	# pad to a multiple of 4 nodes
+	bits += bytes(-len(bits) % 4)
+	nb_bytes = len(bits) // 4
+	if nb_bytes == 0:
+		return b''
+	# every value is below 4, so shifting whole rows of values never spills into the neighbouring byte
+	packed = 0
+	for shift in range(4):
+		packed |= int.from_bytes(bits[shift::4], 'big') << (2 * shift)
+	return packed.to_bytes(nb_bytes, 'big')
+
+
+def unpack_directions(packed: bytes, nb_nodes: int) -> bytearray:
+	nb_bytes = len(packed)
+	value = int.from_bytes(packed, 'big')
+	mask = int.from_bytes(b'\x03' * nb_bytes, 'big')
+	bits = bytearray(nb_bytes * 4)
+	for shift in range(4):
+		bits[shift::4] = ((value >> (2 * shift)) & mask).to_bytes(nb_bytes, 'big')
+	del bits[nb_nodes:]
+	return bits.translate(_FROM_BITS)
+
+
+def encode_record(directions: bytes | bytearray, size: Size, maze_id: int = 0) -> bytes:
+	rows, cols = size
+	origins = [i for i, code in enumerate(directions) if code == ORIGIN]
+	return b''.join((
+		HEADER.pack(MAGIC, VERSION, maze_id, rows, cols, len(origins)),
+		*(ORIGIN_INDEX.pack(i) for i in origins),
+		pack_directions(directions)
+	))
+
+
+def read_record(stream: BinaryIO) -> tuple[bytearray, Size, int] | None:
+	"""
+	:return: (directions, size, id) of the next maze of the stream, or None at the end of the stream
+	"""
+	header = stream.read(HEADER.size)
+	if not header:
+		return None
+	if len(header) < HEADER.size:
+		raise ValueError("Truncated maze record header")
+	magic, version, maze_id, rows, cols, nb_origins = HEADER.unpack(header)
+	if magic != MAGIC:
+		raise ValueError("Not a maze record: bad magic " + repr(magic))
+	if version != VERSION:
+		raise ValueError(f"Unsupported maze record version {version}")
+	origins = [ORIGIN_INDEX.unpack(stream.read(ORIGIN_INDEX.size))[0] for _ in range(nb_origins)]
+	nb_nodes = rows * cols
+	packed = stream.read((nb_nodes + 3) // 4)
+	if len(packed) < (nb_nodes + 3) // 4:
+		raise ValueError("Truncated maze record")
+	directions = unpack_directions(packed, nb_nodes)
+	for origin in origins:
+		directions[origin] = ORIGIN
+	return directions, (rows, cols), maze_id
+
+
+def iter_records(stream: BinaryIO) -> Iterator[tuple[bytearray, Size, int]]:
+	while (record := read_record(stream)) is not None:
+		yield record
+
+
+# endregion binary
+
+
+# region json_lines
+def encode_json_line(directions: bytes | bytearray, size: Size, maze_id: int = 0) -> str:
+	rows, cols = size
+	return json.dumps({
+		"id": maze_id,
+		"rows": rows,
+		"cols": cols,
+		# one digit per node, see data_only_script.ORIGIN
+		"directions": bytes(directions).translate(b'0123456789' + bytes(246)).decode('ascii')
+	}, separators=(',', ':')) + '\n'
+
+
+def decode_json_line(line: str) -> tuple[bytearray, Size, int]:
+	record = json.loads(line)
+	directions = bytearray(record["directions"].encode('ascii')).translate(bytes(48) + bytes(range(10)) + bytes(198))
+	return directions, (record["rows"], record["cols"]), record["id"]
+
+
+# endregion json_lines
+
+
+# region png
+Color = tuple[int, int, int]
+WALL_COLOR: Color = (0, 0, 0)
+PASSAGE_COLOR: Color = (255, 255, 255)
+ORIGIN_COLOR: Color = (255, 0, 0)
+
+
+def write_png(stream: BinaryIO, width: int, height: int, rows: list[bytes]) -> None:
+	"""
+	Write an 8 bits RGB PNG image without any dependency.
+
+	:param rows: `height` rows of `width` * 3 bytes
+	"""
+	def chunk(kind: bytes, data: bytes) -> bytes:
+		return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+	raw = b''.join(b'\x00' + row for row in rows)
+	stream.write(b'\x89PNG\r\n\x1a\n')
+	stream.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+	stream.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+	stream.write(chunk(b'IEND', b''))
+
+
+def maze_image_rows(directions: bytes | bytearray, size: Size, scale: int = 1) -> tuple[int, int, list[bytes]]:
+	"""
+	Draw the maze as (2 * rows + 1) by (2 * cols + 1) squares of `scale` pixels: walls, nodes and passages.
+
+	:return: (width, height, rows of RGB pixels)
+	"""
+	rows, cols = size
+	wall, passage, origin = bytes(WALL_COLOR), bytes(PASSAGE_COLOR), bytes(ORIGIN_COLOR)
+	image: list[bytes] = []
+	wall_row = wall * (2 * cols + 1)
+	image.append(wall_row)
+	for row in range(rows):
+		node_row = [wall]
+		below_row = [wall]
+		for col in range(cols):
+			index = row * cols + col
+			code = directions[index]
+			node_row.append(origin if code == ORIGIN else passage)
+			if col + 1 < cols:
+				connected = code == RIGHT or directions[index + 1] == LEFT
+				node_row.append(passage if connected else wall)
+			else:
+				node_row.append(wall)
+			if row + 1 < rows:
+				connected = code == DOWN or directions[index + cols] == UP
+				below_row.append(passage if connected else wall)
+			else:
+				below_row.append(wall)
+			below_row.append(wall)
+		image.append(b''.join(node_row))
+		image.append(b''.join(below_row))
+	if scale > 1:
+		image = [bytes(b for pixel in zip(*[iter(line)] * 3) for b in pixel * scale) for line in image]
+		image = [line for line in image for _ in range(scale)]
+	return (2 * cols + 1) * scale, (2 * rows + 1) * scale, image
+
+
+def write_maze_png(stream: BinaryIO, directions: bytes | bytearray, size: Size, scale: int = 1) -> None:
+	write_png(stream, *maze_image_rows(directions, size, scale))
+
+
+# endregion png
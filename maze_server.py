@@ -0,0 +1,305 @@
+"""
+Serve live origin-shift mazes to many viewers over HTTP on localhost.
+
+Every hosted maze is advanced by a single scheduler, and its changes are pushed to the viewers with server-sent
+events. All the viewers of a maze share its state and its recent history: a viewer only remembers the last step it
+received, so a slow viewer gets the changes of several steps merged in a single event, or a new snapshot when it is
+too far behind.
+
+Routes:
+	GET    /mazes                    list of the hosted mazes
+	POST   /mazes/<name>?rows=&cols=&mode=&origins=&steps=
+	                                 host a new maze, mode is 'uniform' or 'multi', steps are done per tick
+	GET    /mazes/<name>             snapshot of the maze
+	DELETE /mazes/<name>             stop hosting the maze
+	GET    /mazes/<name>/events      event stream: a 'snapshot' event, then a 'delta' event per update
+
+Example:
+	python maze_server.py --maze demo:32:32 --maze crowd:64:64:multi:8
+	curl -N http://127.0.0.1:8765/mazes/demo/events
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import deque
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from data_only_script import (
+	Maze, Position, Size, direction_code, encode_maze, generate_default_maze, multi_origins_shift, origin_shift
+)
+
+# number of ticks kept in the history of a maze. Viewers further behind receive a new snapshot
+HISTORY_SIZE = 256
+MAX_SIZE = 2048
+
+
+class HostedMaze:
+	def __init__(self, name: str, size: Size, mode: str = 'uniform', nb_origins: int = 1, steps_per_tick: int = 1) -> None:
+		if mode not in ('uniform', 'multi'):
+			raise ValueError(f"Unknown mode {mode!r}")
+		rows, cols = size
+		if not (1 <= rows <= MAX_SIZE and 1 <= cols <= MAX_SIZE and rows * cols >= 2):
+			raise ValueError(f"Invalid maze size {rows}x{cols}")
+		self.name: str = name
+		self.size: Size = size
+		self.mode: str = mode
+		self.steps_per_tick: int = max(1, steps_per_tick)
+		self.maze: Maze = generate_default_maze(size)
+		origin = rows - 1, cols - 1
+		self.origins: set[Position] = {origin}
+		if mode == 'multi':
+			others = [node for node in self.maze if node != origin]
+			self.origins.update(random.sample(others, min(len(others), nb_origins - 1)))
+			for o in self.origins:
+				self.maze[o] = None
+		self.directions: bytearray = encode_maze(self.maze, size)
+		self.step: int = 0
+		# (step reached, index -> direction code of the nodes changed by the tick)
+		self.history: deque[tuple[int, dict[int, int]]] = deque(maxlen=HISTORY_SIZE)
+		self.updated: asyncio.Event = asyncio.Event()
+		self.closed: bool = False
+		self.nb_subscribers: int = 0
+		# encoded delta events by starting step, valid for the current step only
+		self.__encoded_deltas: dict[int, bytes] = {}
+
+	def advance(self) -> None:
+		"""
+		Do the steps of one tick and wake up the viewers.
+		"""
+		maze = self.maze
+		cols = self.size[1]
+		changed: set[Position] = set()
+		for _ in range(self.steps_per_tick):
+			if self.mode == 'uniform':
+				(origin,) = self.origins
+				new_origin = origin_shift(maze, origin)
+				changed.add(origin)
+				self.origins = {new_origin}
+			else:
+				changed.update(self.origins)
+				self.origins = multi_origins_shift(maze, self.origins)
+			changed.update(self.origins)
+		changes: dict[int, int] = {}
+		for node in changed:
+			index = node[0] * cols + node[1]
+			code = direction_code(node, maze[node])
+			if self.directions[index] != code:
+				self.directions[index] = code
+				changes[index] = code
+		self.step += self.steps_per_tick
+		self.history.append((self.step, changes))
+		self.__encoded_deltas.clear()
+		self.notify()
+
+	def notify(self) -> None:
+		updated, self.updated = self.updated, asyncio.Event()
+		updated.set()
+
+	def changes_since(self, step: int) -> dict[int, int] | None:
+		"""
+		:return: the net changes between `step` and the current step, or None if they are not in the history anymore
+		"""
+		if step == self.step:
+			return {}
+		# every tick of the history does steps_per_tick steps
+		if not self.history or self.history[0][0] - self.steps_per_tick > step:
+			return None
+		changes: dict[int, int] = {}
+		for reached, tick_changes in self.history:
+			if reached > step:
+				changes.update(tick_changes)
+		return changes
+
+	def info(self) -> dict:
+		rows, cols = self.size
+		return {
+			"name": self.name, "rows": rows, "cols": cols, "mode": self.mode, "step": self.step,
+			"origins": len(self.origins), "steps_per_tick": self.steps_per_tick, "subscribers": self.nb_subscribers
+		}
+
+	def snapshot_event(self) -> bytes:
+		snapshot = self.info()
+		snapshot["directions"] = bytes(self.directions).translate(b'0123456789' + bytes(246)).decode('ascii')
+		return sse_event('snapshot', snapshot)
+
+	def delta_event(self, step: int) -> bytes | None:
+		"""
+		:return: the event bringing a viewer from `step` to the current step, or None if a snapshot is needed
+		"""
+		event = self.__encoded_deltas.get(step)
+		if event is None:
+			changes = self.changes_since(step)
+			if changes is None:
+				return None
+			event = self.__encoded_deltas[step] = sse_event('delta', {
+				"from": step, "step": self.step, "indexes": list(changes), "codes": list(changes.values())
+			})
+		return event
+
+
+def sse_event(name: str, data: dict) -> bytes:
+	return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class MazeServer:
+	def __init__(self, tick: float = 0.05) -> None:
+		self.tick: float = tick
+		self.mazes: dict[str, HostedMaze] = {}
+
+	async def scheduler(self) -> None:
+		loop = asyncio.get_running_loop()
+		next_tick = loop.time()
+		while True:
+			for maze in list(self.mazes.values()):
+				maze.advance()
+			next_tick += self.tick
+			# skip the ticks that could not be done in time instead of trying to catch up
+			next_tick = max(next_tick, loop.time())
+			await asyncio.sleep(next_tick - loop.time())
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		try:
+			request = await reader.readline()
+			parts = request.decode('latin-1').split()
+			if len(parts) != 3:
+				return await self.respond(writer, 400, {"error": "bad request"})
+			method, target, _ = parts
+			content_length = 0
+			while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+				key, _, value = line.decode('latin-1').partition(':')
+				if key.strip().lower() == 'content-length':
+					try:
+						content_length = int(value.strip() or 0)
+					except ValueError:
+						content_length = -1
+			if content_length < 0:
+				return await self.respond(writer, 400, {"error": "invalid Content-Length"})
+			if content_length:
+				await reader.readexactly(content_length)
+			url = urlsplit(target)
+			path = [unquote(p) for p in url.path.strip('/').split('/') if p]
+			query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+			await self.route(writer, method, path, query)
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			writer.close()
+
+	async def route(self, writer: asyncio.StreamWriter, method: str, path: list[str], query: dict[str, str]) -> None:
+		if path == ['mazes'] and method == 'GET':
+			return await self.respond(writer, 200, [maze.info() for maze in self.mazes.values()])
+		if len(path) < 2 or path[0] != 'mazes':
+			return await self.respond(writer, 404, {"error": "not found"})
+		name = path[1]
+		if len(path) == 2 and method == 'POST':
+			if name in self.mazes:
+				return await self.respond(writer, 409, {"error": f"maze {name!r} already exists"})
+			try:
+				maze = self.add_maze(
+					name, (int(query.get('rows', 16)), int(query.get('cols', 16))), query.get('mode', 'uniform'),
+					int(query.get('origins', 1)), int(query.get('steps', 1))
+				)
+			except ValueError as error:
+				return await self.respond(writer, 400, {"error": str(error)})
+			return await self.respond(writer, 201, maze.info())
+		maze = self.mazes.get(name)
+		if maze is None:
+			return await self.respond(writer, 404, {"error": f"no maze named {name!r}"})
+		if len(path) == 2 and method == 'GET':
+			writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n\r\n")
+			writer.write(maze.snapshot_event().split(b'data: ', 1)[1].strip() + b'\n')
+			return await writer.drain()
+		if len(path) == 2 and method == 'DELETE':
+			self.remove_maze(name)
+			return await self.respond(writer, 200, {"deleted": name})
+		if path[2:] == ['events'] and method == 'GET':
+			return await self.stream(writer, maze)
+		return await self.respond(writer, 404, {"error": "not found"})
+
+	async def stream(self, writer: asyncio.StreamWriter, maze: HostedMaze) -> None:
+		writer.write(
+			b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n"
+		)
+		maze.nb_subscribers += 1
+		try:
+			step = maze.step
+			writer.write(maze.snapshot_event())
+			await writer.drain()
+			while not maze.closed:
+				if maze.step == step:
+					await maze.updated.wait()
+					continue
+				event = maze.delta_event(step)
+				if event is None:
+					event = maze.snapshot_event()
+				step = maze.step
+				writer.write(event)
+				# a slow viewer waits here while the maze keeps advancing: its next event merges the missed steps
+				await writer.drain()
+			writer.write(sse_event('closed', {"name": maze.name}))
+			await writer.drain()
+		finally:
+			maze.nb_subscribers -= 1
+
+	@staticmethod
+	async def respond(writer: asyncio.StreamWriter, status: int, body) -> None:
+		reasons = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict'}
+		data = json.dumps(body).encode()
+		writer.write(
+			f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n"
+			f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+		)
+		await writer.drain()
+
+	def add_maze(self, name: str, size: Size, mode: str = 'uniform', nb_origins: int = 1, steps_per_tick: int = 1) -> HostedMaze:
+		maze = HostedMaze(name, size, mode, nb_origins, steps_per_tick)
+		self.mazes[name] = maze
+		return maze
+
+	def remove_maze(self, name: str) -> None:
+		maze = self.mazes.pop(name)
+		maze.closed = True
+		maze.notify()
+
+	async def serve(self, host: str, port: int) -> None:
+		server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+		print(f"serving {len(self.mazes)} mazes on http://{host}:{port}/mazes", file=sys.stderr)
+		async with server:
+			await asyncio.gather(server.serve_forever(), self.scheduler())
+
+
+def parse_maze_option(text: str) -> tuple[str, Size, str, int]:
+	"""
+	:param text: name:rows:cols[:mode[:origins]]
+	"""
+	name, rows, cols, *rest = text.split(':')
+	mode = rest[0] if rest else 'uniform'
+	nb_origins = int(rest[1]) if len(rest) > 1 else 1
+	return name, (int(rows), int(cols)), mode, nb_origins
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=8765)
+	parser.add_argument('--tick', type=float, default=0.05, help="seconds between 2 updates of the mazes")
+	parser.add_argument('--maze', action='append', default=[], help="name:rows:cols[:mode[:origins]] hosted at start")
+	options = parser.parse_args(argv)
+
+	async def run() -> None:
+		server = MazeServer(options.tick)
+		for text in options.maze:
+			server.add_maze(*parse_maze_option(text))
+		await server.serve(options.host, options.port)
+
+	try:
+		asyncio.run(run())
+	except KeyboardInterrupt:
+		pass
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Copy-on-write mazes, to fork a maze into many branches evolving separately.
+
+A PagedMaze stores the parents of a list maze (see topology.py) in pages of a fixed number of nodes, found through a
+tree of page tables of 32 entries. A fork shares the whole tree of the maze it comes from, and a branch only copies a
+page, and the tables leading to it, the first time it writes in it: forking costs the same whatever the size of the
+maze, and a branch only uses memory for the pages it changed. An origin shift writes two nodes, so it copies at most
+two pages. The functions of data_only_script work on a PagedMaze like on a list::
+
+	topology = Grid2D(1000, 1000)
+	trunk = PagedMaze(topology.default_maze())
+	branches = [trunk.fork() for _ in range(1000)]
+	for seed, branch in enumerate(branches):
+		random.seed(seed)
+		origin = topology.origin
+		for _ in range(100):
+			origin = origin_shift(branch, origin, topology.adjacency)
+	changes = branches[0].diff(branches[1])
+"""
+from typing import Iterator, Sequence
+
+DEFAULT_PAGE_SIZE = 1024
+# number of entries of a page table, a power of 2
+TABLE_SIZE = 32
+_TABLE_SHIFT = TABLE_SIZE.bit_length() - 1
+_TABLE_MASK = TABLE_SIZE - 1
+
+
+class PagedMaze:
+	"""
+	:param parents: index of the parent of every node, None for the origins
+	:param page_size: number of nodes per page, a power of 2
+	"""
+	__slots__ = ('__shift', '__mask', '__length', '__shifts', '__root', '__owned', '__nb_private_pages')
+
+	def __init__(self, parents: Sequence[int | None] = (), page_size: int = DEFAULT_PAGE_SIZE) -> None:
+		if page_size < 1 or page_size & (page_size - 1):
+			raise ValueError(f"The page size must be a power of 2, not {page_size}")
+		self.__shift: int = page_size.bit_length() - 1
+		self.__mask: int = page_size - 1
+		self.__length: int = len(parents)
+		parents = list(parents)
+		nodes: list = [parents[i:i + page_size] for i in range(0, len(parents), page_size)]
+		self.__nb_private_pages: int = len(nodes)
+		# the tables are grouped until the root table is small enough, every level of tables adds a shift
+		shifts = [self.__shift]
+		while len(nodes) > TABLE_SIZE:
+			nodes = [nodes[i:i + TABLE_SIZE] for i in range(0, len(nodes), TABLE_SIZE)]
+			shifts.append(shifts[-1] + _TABLE_SHIFT)
+		# shifts of the index of the child of a table, from the root table down to the tables of pages
+		self.__shifts: tuple[int, ...] = tuple(reversed(shifts))
+		self.__root: list = nodes
+		# ids of the tables and pages that this maze is the only one to use, and can write without copying them
+		self.__owned: set[int] = set()
+		pending = [(self.__root, 0)]
+		while pending:
+			node, level = pending.pop()
+			self.__owned.add(id(node))
+			if level < len(self.__shifts):
+				pending.extend((child, level + 1) for child in node)
+
+	@property
+	def page_size(self) -> int:
+		return self.__mask + 1
+
+	def fork(self) -> 'PagedMaze':
+		"""
+		:return: a maze equal to this one, sharing all its tables and pages. Both mazes copy a page, and the tables
+		leading to it, before writing in it
+		"""
+		fork = PagedMaze.__new__(PagedMaze)
+		fork.__shift = self.__shift
+		fork.__mask = self.__mask
+		fork.__length = self.__length
+		fork.__shifts = self.__shifts
+		fork.__root = self.__root
+		fork.__owned = set()
+		fork.__nb_private_pages = self.__nb_private_pages = 0
+		self.__owned = set()
+		return fork
+
+	def __getitem__(self, index: int) -> int | None:
+		node = self.__root
+		for shift in self.__shifts:
+			node = node[(index >> shift) & _TABLE_MASK]
+		return node[index & self.__mask]
+
+	def __setitem__(self, index: int, parent: int | None) -> None:
+		owned = self.__owned
+		node = self.__root
+		if id(node) not in owned:
+			node = self.__root = list(node)
+			owned.add(id(node))
+		for shift in self.__shifts:
+			slot = (index >> shift) & _TABLE_MASK
+			child = node[slot]
+			if id(child) not in owned:
+				child = node[slot] = list(child)
+				owned.add(id(child))
+				if shift == self.__shift:
+					self.__nb_private_pages += 1
+			node = child
+		node[index & self.__mask] = parent
+
+	def __len__(self) -> int:
+		return self.__length
+
+	def __iter__(self) -> Iterator[int | None]:
+		for page in self.__pages():
+			yield from page
+
+	def __eq__(self, other: object) -> bool:
+		if isinstance(other, PagedMaze):
+			return len(self) == len(other) and not self.diff(other)
+		return NotImplemented
+
+	def __pages(self) -> list[list[int | None]]:
+		nodes = self.__root
+		for _ in self.__shifts[1:]:
+			nodes = [child for node in nodes for child in node]
+		return nodes
+
+	def __find_page(self, index: int) -> list[int | None]:
+		node = self.__root
+		for shift in self.__shifts:
+			node = node[(index >> shift) & _TABLE_MASK]
+		return node
+
+	def to_list(self) -> list[int | None]:
+		return [parent for page in self.__pages() for parent in page]
+
+	def nb_private_pages(self) -> int:
+		"""
+		:return: number of pages copied by this maze since it was created or forked
+		"""
+		return self.__nb_private_pages
+
+	def changed_pages(self, other: 'PagedMaze') -> list[int]:
+		"""
+		:return: numbers of the pages that are not shared by both mazes, only the tables that are not shared are read.
+		Both mazes must have the same length and page size
+		"""
+		if len(self) != len(other) or self.page_size != other.page_size:
+			raise ValueError("Only mazes of the same length and page size can be compared")
+		changed = []
+		# (table or page of this maze, same one of the other maze, its level, number of its first page)
+		pending = [(self.__root, other.__root, 0, 0)]
+		while pending:
+			node, other_node, level, first_page = pending.pop()
+			if node is other_node:
+				continue
+			if level == len(self.__shifts):
+				changed.append(first_page)
+				continue
+			nb_pages = 1 << (self.__shifts[level] - self.__shift)
+			pending.extend(
+				(child, other_child, level + 1, first_page + number * nb_pages)
+				for number, (child, other_child) in enumerate(zip(node, other_node))
+			)
+		return sorted(changed)
+
+	def diff(self, other: 'PagedMaze') -> dict[int, tuple[int | None, int | None]]:
+		"""
+		Compare two mazes forked from the same maze. Only the tables and pages that are not shared are read.
+
+		:return: index -> (parent in this maze, parent in the other maze) of every node whose parent differs
+		"""
+		changes: dict[int, tuple[int | None, int | None]] = {}
+		page_size = self.page_size
+		for number in self.changed_pages(other):
+			first_index = number * page_size
+			page, other_page = self.__find_page(first_index), other.__find_page(first_index)
+			for offset, (parent, other_parent) in enumerate(zip(page, other_page)):
+				if parent != other_parent:
+					changes[first_index + offset] = parent, other_parent
+		return changes
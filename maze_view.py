@@ -0,0 +1,114 @@
+"""
+Arithmetic of the maze drawn by interface_script.py that doesn't need tkinter: the nodes shown by the viewport, the node
+under a pixel, and the solution between two nodes.
+
+The node (row, col) is drawn at the world position ``start + (col, row) * spacing``, and the canvas pixel (x, y) shows
+the world position ``view + (x, y) / zoom``.
+"""
+import math
+from typing import Callable, Hashable, TypeVar
+
+from data_only_script import Size
+
+Node = TypeVar('Node', bound=Hashable)
+
+
+# region viewport
+def visible_range(
+		size: Size, viewport: tuple[int, int], view: tuple[float, float], zoom: float, spacing: float,
+		start: tuple[float, float]
+) -> tuple[int, int, int, int]:
+	"""
+	:param size: (rows, cols) of the maze
+	:param viewport: (width, height) of the canvas in pixels
+	:param view: world position shown at the top left corner of the canvas
+	:param zoom: pixels per world unit
+	:param spacing: world distance between 2 adjacent nodes
+	:param start: world position of the node (0, 0)
+	:return: (first row, last row + 1, first col, last col + 1) of the nodes to draw, with the nodes just outside the
+		viewport so their arrows can be seen
+	"""
+	rows, cols = size
+	width, height = viewport
+	col0 = math.floor((view[0] - start[0]) / spacing)
+	col1 = math.ceil((view[0] + width / zoom - start[0]) / spacing) + 1
+	row0 = math.floor((view[1] - start[1]) / spacing)
+	row1 = math.ceil((view[1] + height / zoom - start[1]) / spacing) + 1
+	return max(0, row0), min(rows, row1), max(0, col0), min(cols, col1)
+
+
+def node_at_pixel(
+		x: float, y: float, size: Size, view: tuple[float, float], zoom: float, spacing: float,
+		start: tuple[float, float], radius: float, is_rasterized: bool = False
+) -> tuple[int, int] | None:
+	"""
+	:param radius: world radius of the circle of a node
+	:param is_rasterized: the maze is drawn as an image, where a node is a square of half the spacing
+	:return: (row, col) of the node drawn at the canvas pixel (x, y), or None if there is none. See :func:`visible_range`
+		for the other parameters
+	"""
+	rows, cols = size
+	world_x = view[0] + x / zoom - start[0]
+	world_y = view[1] + y / zoom - start[1]
+	row, col = round(world_y / spacing), round(world_x / spacing)
+	if not (0 <= row < rows and 0 <= col < cols):
+		return None
+	dx, dy = world_x - col * spacing, world_y - row * spacing
+	if is_rasterized:
+		is_inside = max(abs(dx), abs(dy)) <= spacing / 4
+	else:
+		is_inside = dx * dx + dy * dy <= radius ** 2
+	return (row, col) if is_inside else None
+# endregion viewport
+
+
+# region solution
+def solution_path(start: Node, end: Node, get_parent: Callable[[Node], Node | None]) -> tuple[list[Node], int]:
+	"""
+	:param get_parent: parent of a node, None for the origins
+	:return: (path, separation) where path[:separation] goes from start to the intersection following the arrows,
+		and path[separation:] goes from the intersection to end against the arrows. ([], 0) if there is no path.
+	"""
+	# calc path from start to origin
+	path1: list[Node] = [start]
+	indexes: dict[Node, int] = {start: 0}
+	node = get_parent(start)
+	while node is not None:
+		indexes[node] = len(path1)
+		path1.append(node)
+		node = get_parent(node)
+	# calc path (end -> origin) until intersection of path (start -> origin) found
+	path2: list[Node] = [end]
+	node = end
+	while node not in indexes:
+		node = get_parent(node)
+		# start and end are in 2 different trees
+		if node is None:
+			return [], 0
+		path2.append(node)
+	# cut excess nodes visited on path (start -> origin)
+	del path1[indexes[node] + 1:]
+	# remove duplicate intersection point
+	path2.pop()
+	# the solution is the (start -> intersection) + (end -> intersection) reversed
+	return path1 + path2[::-1], len(path1)
+
+
+def solution_children(path: list[Node], separation: int) -> set[Node]:
+	"""
+	:return: the nodes of the solution whose outgoing arrow is part of it, every node but the intersection
+	"""
+	children = set(path[:separation - 1])
+	children.update(path[separation:])
+	return children
+
+
+def is_solution_kept(path: list[Node], children: set[Node], changed: set[Node]) -> bool:
+	"""
+	:param children: :func:`solution_children` of the path
+	:param changed: the nodes whose outgoing arrow was replaced since the path was found
+	:return: whether the path is still the solution. Every arrow of the path still exists, and the path between 2 nodes
+		of a tree is unique. A missing path is never kept, the changes may have joined the trees of start and end
+	"""
+	return bool(path) and children.isdisjoint(changed)
+# endregion solution
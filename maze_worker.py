@@ -0,0 +1,118 @@
+import random
+import threading
+
+from data_only_script import ORIGIN, UP, DOWN, LEFT, RIGHT, Size
+
+# number of steps done between two publications when the worker is not paced by the GUI
+BATCH_SIZE = 64
+
+
+class StepWorker(threading.Thread):
+	"""
+	Runs the weighted origin-shift steps of the GUI on a copy of the maze data, away from the Tk main thread.
+
+	The maze is stored as one direction code per node (see ``data_only_script.default_directions``) and nodes are
+	identified by their index ``row * cols + col``. The worker never touches tkinter. Every modified node is recorded in
+	a pending changes dictionary that only keeps the latest direction of each node, so the GUI can apply the net
+	changes of many steps in a single frame with :meth:`collect`.
+
+	:param size: (rows, cols) of the maze
+	:param directions: direction code of every node. Owned by the worker once started
+	:param origins: indexes of the current origins. Owned by the worker once started
+	:param visit_count: index -> number of visits, used to weight the directions. Missing nodes were never visited
+	:param nb_steps: number of steps to do, or None to run until :meth:`stop` is called (auto-play)
+	:param steps_per_frame: when running in auto-play, number of steps done between two :meth:`collect`
+	"""
+	def __init__(
+			self, size: Size, directions: bytearray, origins: set[int], visit_count: dict[int, int],
+			nb_steps: int | None = None, steps_per_frame: int = 1
+	) -> None:
+		super(StepWorker, self).__init__(daemon=True)
+		self.__rows, self.__cols = size
+		self.__directions: bytearray = directions
+		self.__origins: set[int] = origins
+		self.__visit_count: dict[int, int] = visit_count
+		self.__remaining: int | None = nb_steps
+		self.steps_per_frame: int = steps_per_frame
+		self.__rng: random.Random = random.Random()
+		self.__lock: threading.Lock = threading.Lock()
+		self.__changes: dict[int, int] = {}
+		self.__steps_done: int = 0
+		self.__frame_collected: threading.Event = threading.Event()
+		self.__stop_requested: threading.Event = threading.Event()
+
+	@property
+	def is_auto_playing(self) -> bool:
+		return self.__remaining is None
+
+	def run(self) -> None:
+		while not self.__stop_requested.is_set():
+			if self.__remaining is None:
+				budget = max(1, self.steps_per_frame)
+			elif self.__remaining > 0:
+				budget = min(self.__remaining, BATCH_SIZE)
+				self.__remaining -= budget
+			else:
+				break
+			changes: dict[int, int] = {}
+			for _ in range(budget):
+				self.__step(changes)
+			with self.__lock:
+				self.__changes.update(changes)
+				self.__steps_done += budget
+			if self.__remaining is None:
+				# paced by the GUI: wait until this frame has been drawn
+				self.__frame_collected.wait()
+				self.__frame_collected.clear()
+
+	def stop(self) -> None:
+		self.__stop_requested.set()
+		self.__frame_collected.set()
+
+	def collect(self) -> tuple[dict[int, int], int]:
+		"""
+		Take the changes made since the last call.
+
+		:return: (index -> new direction code for every modified node, number of steps done)
+		"""
+		with self.__lock:
+			changes, self.__changes = self.__changes, {}
+			steps_done, self.__steps_done = self.__steps_done, 0
+		self.__frame_collected.set()
+		return changes, steps_done
+
+	def __step(self, changes: dict[int, int]) -> None:
+		directions = self.__directions
+		visit_count = self.__visit_count
+		new_origins: set[int] = set()
+		for origin in self.__origins:
+			nodes, codes = self.__adjacent_nodes(origin)
+			weights = [1 / (visit_count.get(n, 0) + 1) for n in nodes]
+			choice = self.__rng.choices(range(len(nodes)), weights=weights, k=1)[0]
+			directions[origin] = codes[choice]
+			changes[origin] = codes[choice]
+			new_origins.add(nodes[choice])
+		# separated so that origins moving onto each other keep the same behaviour as Maze.step
+		for new_origin in new_origins:
+			directions[new_origin] = ORIGIN
+			changes[new_origin] = ORIGIN
+		self.__origins = new_origins
+
+	def __adjacent_nodes(self, index: int) -> tuple[list[int], list[int]]:
+		cols = self.__cols
+		row, col = divmod(index, cols)
+		nodes: list[int] = []
+		codes: list[int] = []
+		if row > 0:
+			nodes.append(index - cols)
+			codes.append(UP)
+		if row + 1 < self.__rows:
+			nodes.append(index + cols)
+			codes.append(DOWN)
+		if col > 0:
+			nodes.append(index - 1)
+			codes.append(LEFT)
+		if col + 1 < cols:
+			nodes.append(index + 1)
+			codes.append(RIGHT)
+		return nodes, codes
@@ -0,0 +1,179 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+from array import array
+from unittest import mock
+
+import Vectors
+from Vectors import Vector2, Vector2Array, Vector2i, Vector2iArray
+
+
+class TestVector2i(unittest.TestCase):
+	def setUp(self):
+		limit = Vector2i.interned_limit()
+		self.addCleanup(Vector2i.set_interned_limit, limit)
+		self.addCleanup(Vector2i.clear_interned)
+		Vector2i.clear_interned()
+
+	def test_interned(self):
+		vector = Vector2i.of(3, 4)
+		self.assertIs(Vector2i.of(3, 4), vector)
+		self.assertIsNot(Vector2i(3, 4), vector)
+		self.assertEqual(Vector2i(3, 4), vector)
+		self.assertEqual(hash(Vector2i(3, 4)), hash(vector))
+		self.assertIsNot(Vector2i.of(4, 3), vector)
+		Vector2i.clear_interned()
+		self.assertIsNot(Vector2i.of(3, 4), vector)
+		self.assertEqual(Vector2i.of(3, 4), vector)
+
+	def test_interned_limit(self):
+		self.assertEqual(Vector2i.interned_limit(), Vector2i.DEFAULT_INTERNED_LIMIT)
+		Vector2i.set_interned_limit(3)
+		self.assertEqual(Vector2i.interned_limit(), 3)
+		kept = [Vector2i.of(0, y) for y in range(3)]
+		self.assertEqual([Vector2i.of(0, y) for y in range(3)], kept)
+		self.assertTrue(all(Vector2i.of(0, y) is vector for y, vector in enumerate(kept)))
+		# the 4th position clears the shared instances, the former ones are still equal to the new ones
+		Vector2i.of(0, 3)
+		self.assertIsNot(Vector2i.of(0, 0), kept[0])
+		self.assertEqual(Vector2i.of(0, 0), kept[0])
+		self.assertEqual({Vector2i.of(0, y) for y in range(3)}, set(kept))
+		# lowering the limit under the number of shared instances clears them
+		first = Vector2i.of(0, 1)
+		Vector2i.set_interned_limit(1)
+		self.assertIsNot(Vector2i.of(0, 1), first)
+		Vector2i.set_interned_limit(0)
+		self.assertEqual(Vector2i.interned_limit(), 1)
+
+	def test_immutable(self):
+		vector = Vector2i(1, 2)
+		with self.assertRaises(TypeError):
+			vector.set(3, 4)
+		with self.assertRaises(TypeError):
+			vector.normalize()
+		with self.assertRaises(AttributeError):
+			vector.x = 3
+		with self.assertRaises(AttributeError):
+			vector.z = 3
+		self.assertEqual(vector, Vector2i(1, 2))
+		# the in-place operators create new vectors
+		alias = vector
+		vector += Vector2i(1, 1)
+		vector *= 2
+		vector -= 1
+		vector //= 3
+		self.assertEqual((vector, alias), (Vector2i(1, 1), Vector2i(1, 2)))
+		self.assertEqual(Vector2i(3, 4).normalized(), Vector2i(0, 0))
+		self.assertEqual(Vector2i(0, 5).normalized(), Vector2i(0, 1))
+
+	def test_type_checked(self):
+		self.assertEqual(Vector2i(2.7, -1.5), Vector2i(2, -1))
+		with mock.patch.object(Vectors, 'TYPE_CHECKED', False):
+			# without checks, anything int() accepts is accepted
+			self.assertEqual(Vector2i("3", 4), Vector2i(3, 4))
+		with mock.patch.object(Vectors, 'TYPE_CHECKED', True):
+			self.assertEqual(Vector2i(3.0, 4), Vector2i(3, 4))
+			for x, y in (("3", 4), (3, None), (Vector2(1, 2), 0)):
+				with self.assertRaises(TypeError):
+					Vector2i(x, y)
+
+	def test_type_checked_environment(self):
+		code = "from Vectors import TYPE_CHECKED; print(TYPE_CHECKED)"
+		for value, expected in (("1", "True"), ("", "False")):
+			environment = dict(os.environ, VECTORS_TYPE_CHECKED=value)
+			output = subprocess.run(
+				[sys.executable, "-c", code], env=environment, cwd=os.path.dirname(os.path.abspath(__file__)),
+				capture_output=True, text=True, check=True
+			).stdout
+			self.assertEqual(output.strip(), expected)
+
+
+class TestVectorArrays(unittest.TestCase):
+	def setUp(self):
+		random.seed(0)
+		self.floats = Vector2Array.from_vectors(
+			Vector2(random.uniform(-10, 10), random.uniform(-10, 10)) for _ in range(20)
+		)
+		self.ints = Vector2iArray.from_vectors(
+			Vector2i(random.randint(-50, 50), random.randint(-50, 50)) for _ in range(20)
+		)
+		self.floats.x[3] = self.floats.y[3] = 0.0
+		self.ints.x[4] = self.ints.y[4] = 0
+
+	def assertVectorsEqual(self, result, expected):
+		self.assertEqual(len(result), len(expected))
+		for vector, expected_vector in zip(result, expected):
+			self.assertEqual(vector.__class__, expected_vector.__class__)
+			self.assertAlmostEqual(vector.x, expected_vector.x)
+			self.assertAlmostEqual(vector.y, expected_vector.y)
+
+	def test_arithmetic(self):
+		for array_ in (self.floats, self.ints):
+			vectors = list(array_)
+			others = array_[::-1]
+			for operand in (others, Vector2i(3, -2), Vector2(1.5, 2.0), 3):
+				with self.subTest(array=array_.__class__.__name__, operand=operand.__class__.__name__):
+					operands = list(operand) if isinstance(operand, Vector2Array) else [operand] * len(vectors)
+					self.assertVectorsEqual(array_ + operand, [v + o for v, o in zip(vectors, operands)])
+					self.assertVectorsEqual(array_ - operand, [v - o for v, o in zip(vectors, operands)])
+					self.assertVectorsEqual(array_ * operand, [v * o for v, o in zip(vectors, operands)])
+					if isinstance(operand, Vector2Array):
+						continue
+					self.assertVectorsEqual(array_ / operand, [v / o for v, o in zip(vectors, operands)])
+					self.assertVectorsEqual(array_ // operand, [v // o for v, o in zip(vectors, operands)])
+					if isinstance(operand, int):
+						self.assertVectorsEqual(operand + array_, [v + o for v, o in zip(vectors, operands)])
+						self.assertVectorsEqual(operand * array_, [v * o for v, o in zip(vectors, operands)])
+						continue
+					pairs = list(zip(vectors, operands))
+					self.assertVectorsEqual(Vector2Array.max(array_, operand), [v.max(v, o) for v, o in pairs])
+					self.assertVectorsEqual(Vector2Array.min(array_, operand), [v.min(v, o) for v, o in pairs])
+			self.assertVectorsEqual(-array_, [-v for v in vectors])
+			self.assertVectorsEqual(array_.swap(), [v.swap() for v in vectors])
+			self.assertEqual(list(array_.dot(others)), [v.dot(o) for v, o in zip(vectors, others)])
+			self.assertEqual(list(array_.sqr_magnitude()), [v.sqr_magnitude() for v in vectors])
+			for magnitude, vector in zip(array_.magnitude(), vectors):
+				self.assertAlmostEqual(magnitude, vector.magnitude())
+
+	def test_normalized(self):
+		normalized = self.floats.normalized()
+		self.assertVectorsEqual(normalized, [v.normalized() for v in self.floats])
+		# null vectors stay null
+		self.assertEqual(normalized[3], Vector2(0, 0))
+		for magnitude, vector in zip(normalized.magnitude(), self.floats):
+			self.assertAlmostEqual(magnitude, 0.0 if vector == Vector2(0, 0) else 1.0)
+		self.assertVectorsEqual(self.ints.normalized(), [v.normalized() for v in self.ints])
+		self.assertEqual(self.ints.normalized()[4], Vector2i(0, 0))
+		self.assertEqual(Vector2iArray([3, 0, -4], [4, -7, 0]).normalized(), Vector2iArray([0, 0, -1], [0, -1, 0]))
+
+	def test_integer_truncation(self):
+		ints = Vector2iArray([7, -7, 3], [-3, 5, 0])
+		self.assertEqual((ints.x.typecode, ints.y.typecode), ('q', 'q'))
+		# like Vector2i, float results are truncated towards 0, and divisions are floor divisions
+		self.assertEqual(ints * 0.5, Vector2iArray([3, -3, 1], [-1, 2, 0]))
+		self.assertEqual(ints / 2, Vector2iArray([3, -4, 1], [-2, 2, 0]))
+		self.assertEqual(ints / 2.5, Vector2iArray([2, -3, 1], [-2, 2, 0]))
+		self.assertEqual(ints + Vector2(0.5, 0.5), Vector2iArray([7, -6, 3], [-2, 5, 0]))
+		self.assertIsInstance(ints + 1, Vector2iArray)
+		self.assertIsInstance(ints[0], Vector2i)
+		with self.assertRaises(OverflowError):
+			Vector2iArray([2 ** 63], [0])
+
+	def test_operands(self):
+		self.assertEqual(self.floats[2:5], Vector2Array(self.floats.x[2:5], self.floats.y[2:5]))
+		self.assertEqual(self.floats[1], Vector2(self.floats.x[1], self.floats.y[1]))
+		self.assertEqual(self.floats.x, array('d', self.floats.x))
+		with self.assertRaises(ValueError):
+			self.floats + self.floats[1:]
+		with self.assertRaises(ValueError):
+			Vector2Array([1, 2], [3])
+		with self.assertRaises(TypeError):
+			self.floats + "1"
+		with self.assertRaises(TypeError):
+			self.floats.dot(1)
+
+
+if __name__ == '__main__':
+	unittest.main()
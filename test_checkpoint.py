@@ -0,0 +1,131 @@
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import data_only_script
+from checkpoint import Checkpoint
+
+
+class Interrupted(Exception):
+	pass
+
+
+class InterruptedCheckpoint(Checkpoint):
+	"""
+	Saves after every step, and interrupts the experiment after a number of saves.
+	"""
+	def __init__(self, path: str, interrupt_after: int | None) -> None:
+		super().__init__(path, interval=0)
+		self.interrupt_after = interrupt_after
+
+	def due(self) -> bool:
+		return True
+
+	def save(self, series=None, **state) -> None:
+		super().save(series, **state)
+		if self.nb_saves == self.interrupt_after:
+			raise Interrupted
+
+
+class TestCheckpoint(unittest.TestCase):
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.directory = directory.name
+
+	def path(self, name: str) -> str:
+		return os.path.join(self.directory, name)
+
+	def final_state(self, path: str) -> dict:
+		state = Checkpoint(path).load()
+		state['random_state'] = random.getstate()
+		return state
+
+	def check_resume(self, experiment, *args) -> None:
+		"""
+		Run the experiment without interruption, then interrupted several times and resumed, and compare their final
+		states. The durations are measured, they only have the same length.
+		"""
+		with contextlib.redirect_stdout(io.StringIO()):
+			random.seed(1)
+			experiment(*args, Checkpoint(self.path('uninterrupted'), interval=float('inf')))
+			random.seed(1)
+			for interrupt_after in (37, 5, 60, None):
+				try:
+					experiment(*args, InterruptedCheckpoint(self.path('interrupted'), interrupt_after))
+					break
+				except Interrupted:
+					pass
+		expected, state = self.final_state(self.path('uninterrupted')), self.final_state(self.path('interrupted'))
+		self.assertEqual(expected.keys(), state.keys())
+		for key, value in expected.items():
+			if key.endswith('durations'):
+				self.assertEqual(len(state[key]), len(value), key)
+			elif key != 'duration':
+				self.assertEqual(state[key], value, key)
+
+	def test_resume_origin_shift(self):
+		self.check_resume(data_only_script.test_origin_shift, (4, 4), 3)
+
+	def test_resume_weighted_origin_shift(self):
+		self.check_resume(data_only_script.test_weighted_origin_shift, (5, 5), 4)
+
+	def test_resume_multi_origins(self):
+		self.check_resume(data_only_script.test_multi_origins, (5, 5), {(0, 0), (4, 4)}, 300)
+
+	def test_series_are_appended(self):
+		path = self.path('series')
+		checkpoint = Checkpoint(path)
+		values = []
+		sizes = []
+		for step in range(3):
+			values.extend(range(step * 1000, (step + 1) * 1000))
+			checkpoint.save({'values': values}, step=step)
+			sizes.append(os.path.getsize(path + '.values'))
+		# every save writes the new items only
+		self.assertAlmostEqual(sizes[2] - sizes[1], sizes[1] - sizes[0], delta=sizes[0] / 10)
+		self.assertEqual(Checkpoint(path).load(), {'values': values, 'step': 2})
+
+	def test_items_after_the_last_checkpoint_are_dropped(self):
+		path = self.path('series')
+		Checkpoint(path).save({'values': [1, 2]}, step=1)
+		# interrupted after appending to the series, before replacing the checkpoint
+		with open(path + '.values', 'ab') as file:
+			file.write(b'partial chunk')
+		checkpoint = Checkpoint(path)
+		self.assertEqual(checkpoint.load(), {'values': [1, 2], 'step': 1})
+		checkpoint.save({'values': [1, 2, 3]}, step=2)
+		self.assertEqual(Checkpoint(path).load(), {'values': [1, 2, 3], 'step': 2})
+
+	def test_no_resume(self):
+		path = self.path('state')
+		Checkpoint(path).save({'values': [1, 2]}, step=1)
+		checkpoint = Checkpoint(path, resume=False)
+		self.assertIsNone(checkpoint.load())
+		checkpoint.save({'values': [3]}, step=1)
+		self.assertEqual(Checkpoint(path).load(), {'values': [3], 'step': 1})
+
+	def test_random_state_is_restored(self):
+		path = self.path('state')
+		random.seed(3)
+		Checkpoint(path).save()
+		expected = [random.random() for _ in range(5)]
+		Checkpoint(path).load()
+		self.assertEqual([random.random() for _ in range(5)], expected)
+
+	def test_lazy_import(self):
+		code = "import sys, data_only_script; print(*sorted({'checkpoint', 'pickle', 'json'} & set(sys.modules)))"
+		result = subprocess.run(
+			[sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True,
+			text=True, check=True
+		)
+		self.assertEqual(result.stdout.strip(), '')
+
+
+if __name__ == '__main__':
+	unittest.main()
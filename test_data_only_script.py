@@ -0,0 +1,125 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+
+from data_only_script import DIRECTION_OFFSETS, ORIGIN, default_directions, resize_directions
+from test_utils import random_directions
+
+
+def roots(directions, size) -> dict[int, int]:
+	"""
+	:return: origin reached from every node, after checking that every parent is inside the maze and there is no cycle
+	"""
+	rows, cols = size
+	found = {}
+	for index in range(rows * cols):
+		node = index
+		for _ in range(rows * cols):
+			if directions[node] == ORIGIN:
+				break
+			row, col = divmod(node, cols)
+			row_offset, col_offset = DIRECTION_OFFSETS[directions[node]]
+			assert 0 <= row + row_offset < rows and 0 <= col + col_offset < cols, (node, directions[node])
+			node += row_offset * cols + col_offset
+		else:
+			raise AssertionError("cycle")
+		found[index] = node
+	return found
+
+
+class TestResizeDirections(unittest.TestCase):
+	def check_resize(self, directions, size, new_size) -> bytearray:
+		"""
+		Resize a maze and check the result: a forest with at most as many trees as before, where the kept nodes still
+		point to their kept parent.
+		"""
+		(rows, cols), (new_rows, new_cols) = size, new_size
+		resized, relinked, origins = resize_directions(directions, size, new_size)
+		self.assertEqual(len(resized), new_rows * new_cols)
+		new_roots = roots(resized, new_size)
+		nb_trees = len(set(roots(directions, size).values()))
+		self.assertLessEqual(len(set(new_roots.values())), nb_trees)
+		self.assertTrue(set(origins) <= set(new_roots.values()))
+		relinked = set(relinked)
+		for index, code in enumerate(resized):
+			row, col = divmod(index, new_cols)
+			if row < rows and col < cols and index not in relinked and index not in origins:
+				self.assertEqual(code, directions[row * cols + col], index)
+		return resized
+
+	def test_shrink_rows(self):
+		random.seed(0)
+		directions = random_directions((7, 6), 300)
+		resized = self.check_resize(directions, (7, 6), (4, 6))
+		self.assertEqual(len(set(roots(resized, (4, 6)).values())), 1)
+
+	def test_shrink_cols(self):
+		random.seed(1)
+		directions = random_directions((6, 8), 300)
+		resized = self.check_resize(directions, (6, 8), (6, 3))
+		self.assertEqual(len(set(roots(resized, (6, 3)).values())), 1)
+
+	def test_shrink_both(self):
+		random.seed(2)
+		directions = random_directions((9, 9), 500)
+		resized = self.check_resize(directions, (9, 9), (4, 5))
+		self.assertEqual(len(set(roots(resized, (4, 5)).values())), 1)
+
+	def test_cut_origin(self):
+		# the origin of the default maze is in the removed corner, one of the cut trees becomes the new origin
+		resized, relinked, origins = resize_directions(default_directions((5, 5)), (5, 5), (5, 4))
+		self.assertEqual(len(origins), 1)
+		self.assertEqual(set(roots(resized, (5, 4)).values()), set(origins))
+		self.assertEqual(resized.count(ORIGIN), 1)
+		# shrinking the default maze by one column cuts the arrow of every row
+		self.assertTrue({3, 7, 11, 15, 19} <= set(relinked) | set(origins))
+
+	def test_grow(self):
+		random.seed(3)
+		directions = random_directions((4, 5), 200)
+		resized, relinked, origins = resize_directions(directions, (4, 5), (6, 8))
+		self.assertEqual((relinked, origins), ([], []))
+		row, col = divmod(directions.index(ORIGIN), 5)
+		self.assertEqual(set(roots(resized, (6, 8)).values()), {row * 8 + col})
+
+	def test_random_resizes(self):
+		random.seed(4)
+		size = 8, 8
+		directions = random_directions(size, 400)
+		for _ in range(60):
+			new_size = random.randint(1, 10), random.randint(2, 10)
+			directions = self.check_resize(directions, size, new_size)
+			self.assertEqual(directions.count(ORIGIN), 1)
+			size = new_size
+
+	def test_several_origins(self):
+		random.seed(5)
+		size = 7, 7
+		directions = random_directions(size, 300, nb_origins=4)
+		for new_size in ((5, 6), (3, 3), (6, 4), (2, 2)):
+			directions = self.check_resize(directions, size, new_size)
+			self.assertEqual(len(set(roots(directions, new_size).values())), directions.count(ORIGIN))
+			size = new_size
+
+
+class TestStandalone(unittest.TestCase):
+	def test_without_project_modules(self):
+		# None in sys.modules makes the import fail like a missing module
+		code = (
+			"import sys; sys.modules['instrumentation'] = sys.modules['checkpoint'] = None\n"
+			"import random, data_only_script as d\n"
+			"random.seed(0); maze = d.generate_default_maze((4, 4)); origin = (3, 3)\n"
+			"for _ in range(50): origin = d.origin_shift(maze, origin)\n"
+			"print(sum(parent is None for parent in maze.values()), d.instrumented('x')(len) is len)"
+		)
+		output = subprocess.run(
+			[sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+			capture_output=True, text=True, check=True
+		).stdout
+		self.assertEqual(output.split(), ['1', 'True'])
+
+
+if __name__ == '__main__':
+	unittest.main()
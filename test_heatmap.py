@@ -0,0 +1,142 @@
+import io
+import random
+import struct
+import unittest
+
+from data_only_script import ORIGIN, encode_maze, generate_default_maze, multi_origins_shift, origin_shift
+from heatmap import Heatmap
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+def walk_counts(size, walk_step, origins, nb_steps) -> tuple[list, list[int], list[int]]:
+	"""
+	:return: (origins after every step, visits and flips counted from the directions after every step)
+	"""
+	rows, cols = size
+	maze = generate_default_maze(size)
+	for origin in (origins if isinstance(origins, set) else [origins]):
+		maze[origin] = None
+	walk = [origins]
+	visits, flips = [0] * (rows * cols), [0] * (rows * cols)
+	directions = encode_maze(maze, size)
+	for _ in range(nb_steps):
+		origins = walk_step(maze, origins)
+		walk.append(origins)
+		new_directions = encode_maze(maze, size)
+		for index, (code, new_code) in enumerate(zip(directions, new_directions)):
+			flips[index] += code != new_code
+			visits[index] += new_code == ORIGIN
+		directions = new_directions
+	return walk, visits, flips
+
+
+class TestHeatmap(unittest.TestCase):
+	def test_add_walk(self):
+		random.seed(0)
+		size = 5, 7
+		walk, visits, flips = walk_counts(size, origin_shift, (4, 6), 300)
+		heatmap = Heatmap(size, track_flips=True)
+		heatmap.add_walk(walk)
+		self.assertEqual((list(heatmap.visits), list(heatmap.flips), heatmap.steps), (visits, flips, 300))
+		# the nodes can be given by their index as well
+		indices = Heatmap(size, track_flips=True)
+		indices.add_walk([row * size[1] + col for row, col in walk])
+		self.assertEqual((indices.visits, indices.flips), (heatmap.visits, heatmap.flips))
+		heatmap.add_walk(walk[:1])
+		self.assertEqual(heatmap.steps, 300)
+
+	def test_walk_counted_in_place(self):
+		random.seed(2)
+		size = 4, 6
+		walk, visits, flips = walk_counts(size, origin_shift, (3, 5), 200)
+		heatmap = Heatmap(size, track_flips=True)
+		for first, last in ((0, 120), (120, 120), (120, 200)):
+			counts = heatmap.start_walk(walk[first])
+			self.assertIs(counts, heatmap.visits)
+			for row, col in walk[first + 1:last + 1]:
+				counts[row * size[1] + col] += 1
+			heatmap.end_walk(walk[last], last - first)
+		self.assertEqual((list(heatmap.visits), list(heatmap.flips), heatmap.steps), (visits, flips, 200))
+		untracked = Heatmap(size)
+		counts = untracked.start_walk(0)
+		counts[1] += 1
+		untracked.end_walk(1, 1)
+		self.assertEqual((untracked.visits[1], untracked.steps), (1, 1))
+		with self.assertRaises(ValueError):
+			untracked.end_walk(1, 1)
+
+	def test_add_multi_walk(self):
+		random.seed(1)
+		size = 6, 6
+		walk, visits, flips = walk_counts(size, multi_origins_shift, {(0, 0), (2, 3), (5, 5)}, 200)
+		heatmap = Heatmap(size, track_flips=True)
+		heatmap.add_multi_walk(walk)
+		self.assertEqual((list(heatmap.visits), list(heatmap.flips), heatmap.steps), (visits, flips, 200))
+
+	def test_add_changes(self):
+		heatmap = Heatmap((2, 3), track_flips=True)
+		heatmap.add_changes({1: ORIGIN, 4: 1, 5: 3}, nb_steps=3)
+		self.assertEqual(list(heatmap.visits), [0, 1, 0, 0, 0, 0])
+		self.assertEqual(list(heatmap.flips), [0, 1, 0, 0, 1, 1])
+		self.assertEqual(heatmap.steps, 3)
+		untracked = Heatmap((2, 3))
+		untracked.add_changes({2: ORIGIN, 3: 1})
+		self.assertIsNone(untracked.flips)
+		self.assertEqual(list(untracked.visits), [0, 0, 1, 0, 0, 0])
+
+	def test_merge(self):
+		first, second = Heatmap((2, 2), track_flips=True), Heatmap((2, 2), track_flips=True)
+		first.add_walk([0, 1, 3])
+		second.add_walk([3, 2, 3])
+		visits = first.visits
+		self.assertIs(first.merge(second), first)
+		# the counters are added in place
+		self.assertIs(first.visits, visits)
+		self.assertEqual((list(first.visits), list(first.flips), first.steps), ([0, 1, 1, 2], [1, 2, 2, 3], 4))
+		self.assertEqual(list(second.visits), [0, 0, 1, 1])
+		untracked = Heatmap((2, 2)).merge(first)
+		self.assertIsNone(untracked.flips)
+		self.assertEqual(untracked.visits, first.visits)
+		with self.assertRaises(ValueError):
+			first.merge(Heatmap((4, 1)))
+		# the counters are added all at once, each one keeps its 64 bits
+		big, other = Heatmap((1, 3)), Heatmap((1, 3))
+		big.visits[0], big.visits[1] = 2 ** 63, 2 ** 63 - 1
+		other.visits[0], other.visits[1], other.visits[2] = 2 ** 62, 1, 5
+		self.assertEqual(list(big.merge(other).visits), [3 * 2 ** 62, 2 ** 63, 5])
+
+	def test_image(self):
+		heatmap = Heatmap((3, 4))
+		heatmap.add_origins([0, 0, 0, (2, 3)])
+		width, height, rows = heatmap.image_rows(scale=2)
+		self.assertEqual((width, height, len(rows)), (8, 6, 6))
+		self.assertTrue(all(len(row) == 3 * width for row in rows))
+		# the most visited node is white, the never visited ones black
+		self.assertEqual((rows[0][:3], rows[0][3:6], rows[0][6:9]), (b'\xff\xff\xff', b'\xff\xff\xff', b'\0\0\0'))
+		with self.assertRaises(ValueError):
+			heatmap.image_rows(flips=True)
+		stream = io.BytesIO()
+		heatmap.write_png(stream, scale=3)
+		self.assertEqual(stream.getvalue()[:8], b'\x89PNG\r\n\x1a\n')
+		self.assertEqual(struct.unpack('>II', stream.getvalue()[16:24]), (12, 9))
+
+	@unittest.skipIf(np is None, "numpy is not installed")
+	def test_to_numpy(self):
+		heatmap = Heatmap((2, 3), track_flips=True)
+		heatmap.add_walk([(0, 0), (0, 1), (1, 1)])
+		visits = heatmap.to_numpy()
+		self.assertEqual(visits.shape, (2, 3))
+		self.assertEqual(visits.tolist(), [[0, 1, 0], [0, 1, 0]])
+		self.assertEqual(heatmap.to_numpy(flips=True).tolist(), [[1, 2, 0], [0, 1, 0]])
+		visits[0, 0] = 5
+		self.assertEqual(heatmap.visits[0], 0)
+		with self.assertRaises(ValueError):
+			Heatmap((2, 3)).to_numpy(flips=True)
+
+
+if __name__ == '__main__':
+	unittest.main()
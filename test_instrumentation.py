@@ -0,0 +1,112 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import data_only_script
+import instrumentation
+import maze_server
+from instrumentation import JsonLinesSink, MemorySink, TracingSink, experiment, instrumented
+
+
+class Walker:
+	def __init__(self) -> None:
+		self.steps = 0
+
+	@instrumented('test_instrumentation.Walker.step')
+	def step(self) -> int:
+		self.steps += 1
+		return self.steps
+
+
+# in a dict, since enable replaces every module attribute referencing an instrumented function
+ORIGINALS = {'step': Walker.step, 'origin_shift': data_only_script.origin_shift}
+
+
+def walk(nb_steps: int) -> None:
+	random.seed(0)
+	maze = data_only_script.generate_default_maze((4, 4))
+	origin = 3, 3
+	for _ in range(nb_steps):
+		origin = data_only_script.origin_shift(maze, origin)
+
+
+class TestInstrumentation(unittest.TestCase):
+	def tearDown(self):
+		instrumentation.disable()
+
+	def test_disabled_functions_are_unchanged(self):
+		self.assertFalse(instrumentation.is_enabled())
+		self.assertIs(data_only_script.origin_shift, ORIGINALS['origin_shift'])
+		self.assertIs(Walker.step, ORIGINALS['step'])
+		self.assertIs(instrumented('unused')(walk), walk)
+
+	def test_calls_and_samples(self):
+		sink = instrumentation.enable(MemorySink(), sample_every=10)
+		self.assertTrue(instrumentation.is_enabled())
+		# the functions imported by name are replaced too
+		self.assertIsNot(maze_server.origin_shift, ORIGINALS['origin_shift'])
+		walk(95)
+		walker = Walker()
+		for _ in range(7):
+			walker.step()
+		self.assertEqual(walker.steps, 7)
+		self.assertEqual(instrumentation.calls()['origin_shift'], 95)
+		instrumentation.disable()
+		self.assertIs(data_only_script.origin_shift, ORIGINALS['origin_shift'])
+		self.assertIs(maze_server.origin_shift, ORIGINALS['origin_shift'])
+		self.assertIs(Walker.step, ORIGINALS['step'])
+		summary = sink.summary()
+		self.assertEqual((summary['origin_shift']['calls'], summary['origin_shift']['samples']), (95, 9))
+		self.assertEqual(summary['test_instrumentation.Walker.step']['calls'], 7)
+		self.assertGreaterEqual(summary['origin_shift']['max'], summary['origin_shift']['median'])
+
+	def test_same_results(self):
+		def shift_default_mazes() -> list:
+			random.seed(1)
+			return [data_only_script.origin_shift(data_only_script.generate_default_maze((3, 3)), (2, 2)) for _ in range(20)]
+
+		expected = shift_default_mazes()
+		instrumentation.enable(sample_every=1)
+		self.assertEqual(shift_default_mazes(), expected)
+
+	def test_selected_names(self):
+		instrumentation.enable(names=['test_instrumentation.Walker.step'])
+		self.assertIs(data_only_script.origin_shift, ORIGINALS['origin_shift'])
+		self.assertIsNot(Walker.step, ORIGINALS['step'])
+		self.assertEqual(Walker.step.__wrapped__, ORIGINALS['step'])
+
+	def test_json_lines_sink(self):
+		stream = io.StringIO()
+		instrumentation.enable(JsonLinesSink(stream), sample_every=5)
+		walk(10)
+		instrumentation.disable()
+		records = [json.loads(line) for line in stream.getvalue().splitlines()]
+		self.assertEqual(sum(record.get('name') == 'origin_shift' and 'duration' in record for record in records), 2)
+		self.assertIn({'name': 'origin_shift', 'calls': 10}, records)
+
+	def test_tracing_sink(self):
+		spans = []
+		sink = TracingSink(lambda name, start, duration: spans.append((name, duration)))
+		instrumentation.enable(sink, sample_every=2)
+		walk(6)
+		self.assertEqual([name for name, _ in spans], ['origin_shift'] * 3)
+		self.assertTrue(all(duration >= 0 for _, duration in spans))
+
+	def test_experiment(self):
+		with tempfile.TemporaryDirectory() as directory:
+			with experiment('nothing', output_dir=directory):
+				walk(10)
+			self.assertEqual(os.listdir(directory), [])
+			with contextlib.redirect_stderr(io.StringIO()) as stderr:
+				with experiment('walk', profile=True, trace_memory=True, output_dir=directory, top=3):
+					walk(10)
+			self.assertEqual(os.listdir(directory), ['walk.prof'])
+			self.assertIn('walk:', stderr.getvalue())
+
+
+if __name__ == '__main__':
+	unittest.main()
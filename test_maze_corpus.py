@@ -0,0 +1,91 @@
+import random
+import tempfile
+import unittest
+
+from data_only_script import decode_maze, direct_pathing, encode_maze, generate_default_maze
+from maze_corpus import MazeCorpus, maze_metrics
+from test_utils import random_directions
+
+
+def brute_force_metrics(directions, size) -> tuple[int | None, int, int]:
+	rows, cols = size
+	maze = decode_maze(directions, size)
+	roots, depths = {}, {}
+	for node in maze:
+		root, depth = node, 0
+		while maze[root] is not None:
+			root, depth = maze[root], depth + 1
+		roots[node], depths[node] = root, depth
+	degrees = dict.fromkeys(maze, 0)
+	for node, parent in maze.items():
+		if parent is not None:
+			degrees[node] += 1
+			degrees[parent] += 1
+	start, end = (rows - 1, 0), (0, cols - 1)
+	solution_length = None
+	if roots[start] == roots[end]:
+		solution_length = max(1, len(direct_pathing(maze, start, end)))
+	return solution_length, max(depths.values()), sum(degree == 1 for degree in degrees.values())
+
+
+class TestMetrics(unittest.TestCase):
+	def test_default_maze(self):
+		# every row goes right to the last column, which goes down to the origin
+		self.assertEqual(maze_metrics(encode_maze(generate_default_maze((5, 8)), (5, 8)), (5, 8)), (12, 11, 5))
+
+	def test_random_mazes(self):
+		random.seed(0)
+		for nb_origins in (1, 1, 2, 4):
+			size = random.randint(1, 9), random.randint(2, 9)
+			directions = random_directions(size, 200, nb_origins)
+			self.assertEqual(maze_metrics(directions, size), brute_force_metrics(directions, size))
+
+
+class TestMazeCorpus(unittest.TestCase):
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.directory = directory.name
+		random.seed(1)
+		self.mazes = [random_directions(size, 150, random.choice((1, 1, 3))) for size in [(6, 6)] * 30 + [(4, 9)] * 20]
+		self.sizes = [(6, 6)] * 30 + [(4, 9)] * 20
+
+	def test_add_and_query(self):
+		with MazeCorpus(self.directory) as corpus:
+			ids = corpus.add_many(zip(self.mazes, self.sizes), batch_size=7)
+			self.assertEqual(ids, list(range(1, 51)))
+			self.assertEqual(len(corpus), 50)
+			loaded = {maze_id: (directions, size) for directions, size, maze_id in corpus.query()}
+		self.assertEqual(loaded, {maze_id: maze for maze_id, maze in zip(ids, zip(self.mazes, self.sizes))})
+
+	def test_select(self):
+		with MazeCorpus(self.directory) as corpus:
+			ids = corpus.add_many(zip(self.mazes, self.sizes))
+			metrics = {maze_id: maze_metrics(*maze) for maze_id, maze in zip(ids, zip(self.mazes, self.sizes))}
+			depths = sorted(depth for _, depth, _ in metrics.values())
+			low, high = depths[10], depths[40]
+			entries = corpus.select(rows=6, cols=6, depth=(low, high))
+			expected = {
+				maze_id for maze_id, (_, depth, _) in metrics.items() if maze_id <= 30 and low <= depth <= high
+			}
+			self.assertEqual({entry.id for entry in entries}, expected)
+			for entry in entries:
+				self.assertEqual((entry.solution_length, entry.depth, entry.dead_ends), metrics[entry.id])
+			self.assertEqual({entry.id for entry in corpus.select(cols=9, dead_ends=(None, 10**6))}, set(range(31, 51)))
+			unsolvable = {maze_id for maze_id, (solution_length, _, _) in metrics.items() if solution_length is None}
+			self.assertEqual(len(corpus.select(solution_length=(1, None))), 50 - len(unsolvable))
+			self.assertEqual(len(corpus.select(limit=5, rows=4)), 5)
+			with self.assertRaises(ValueError):
+				corpus.select(width=4)
+
+	def test_reopen(self):
+		with MazeCorpus(self.directory) as corpus:
+			corpus.add_many(zip(self.mazes[:10], self.sizes[:10]))
+		with MazeCorpus(self.directory) as corpus:
+			self.assertEqual(len(corpus), 10)
+			self.assertEqual(corpus.add(self.mazes[10], self.sizes[10]), 11)
+			self.assertEqual([record[0] for record in corpus.query()], self.mazes[:11])
+
+
+if __name__ == '__main__':
+	unittest.main()
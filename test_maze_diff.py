@@ -0,0 +1,121 @@
+import random
+import unittest
+
+from data_only_script import ORIGIN, decode_maze, default_directions, direct_pathing
+from maze_diff import apply_edits, diff, iter_pairwise_distances, origin_shift_edits, pairwise_distances
+from test_utils import random_directions
+
+
+def edges(directions, size) -> set[tuple[int, int]]:
+	cols = size[1]
+	return {
+		tuple(sorted((row * cols + col, parent[0] * cols + parent[1])))
+		for (row, col), parent in decode_maze(directions, size).items() if parent is not None
+	}
+
+
+def brute_force_solution(directions, size) -> list[int]:
+	rows, cols = size
+	maze = decode_maze(directions, size)
+
+	def root(node):
+		while maze[node] is not None:
+			node = maze[node]
+		return node
+
+	start, end = (rows - 1, 0), (0, cols - 1)
+	if root(start) != root(end):
+		return []
+	return [row * cols + col for row, col in direct_pathing(maze, start, end) or [start]]
+
+
+class TestDiff(unittest.TestCase):
+	def test_random_pairs(self):
+		random.seed(0)
+		for _ in range(30):
+			size = random.randint(1, 7), random.randint(2, 7)
+			first = random_directions(size, random.randint(0, 100), random.choice((1, 1, 2)))
+			second = random_directions(size, random.randint(0, 100), random.choice((1, 1, 3)))
+			difference = diff(first, second, size)
+			changed = [int(code != other_code) for code, other_code in zip(first, second)]
+			self.assertEqual(difference.changed_pointers, sum(changed))
+			self.assertEqual(list(difference.pointer_mask), changed)
+			first_edges, second_edges = edges(first, size), edges(second, size)
+			self.assertEqual(difference.removed_edges, sorted(first_edges - second_edges))
+			self.assertEqual(difference.added_edges, sorted(second_edges - first_edges))
+			self.assertEqual(difference.changed_edges, len(first_edges ^ second_edges))
+			solutions = brute_force_solution(first, size), brute_force_solution(second, size)
+			self.assertEqual(difference.solutions, solutions)
+			common = 0
+			while common < min(map(len, solutions)) and solutions[0][common] == solutions[1][common]:
+				common += 1
+			self.assertEqual(difference.diverging_at, common)
+
+	def test_same_maze(self):
+		directions = default_directions((3, 4))
+		difference = diff(directions, directions, (3, 4))
+		self.assertEqual((difference.changed_pointers, difference.changed_edges), (0, 0))
+		self.assertEqual(difference.diverging_at, len(difference.solutions[0]))
+
+	def test_sizes(self):
+		with self.assertRaises(ValueError):
+			diff(default_directions((3, 4)), default_directions((4, 3))[:-1], (3, 4))
+
+
+class TestPairwiseDistances(unittest.TestCase):
+	def test_distances(self):
+		random.seed(1)
+		size = 4, 5
+		batch = [random_directions(size, random.randint(0, 60)) for _ in range(12)]
+		n = len(batch)
+		for edges_only in (False, True):
+			with self.subTest(edges=edges_only):
+				distances = pairwise_distances(batch, size, edges=edges_only)
+				self.assertEqual(len(distances), n * (n - 1) // 2)
+				rows = list(iter_pairwise_distances(batch, size, edges=edges_only))
+				self.assertEqual([len(row) for row in rows], list(range(n - 1, -1, -1)))
+				for i in range(n):
+					for j in range(i + 1, n):
+						difference = diff(batch[i], batch[j], size)
+						expected = difference.changed_edges if edges_only else difference.changed_pointers
+						self.assertEqual(distances[n * i - i * (i + 1) // 2 + j - i - 1], expected)
+						self.assertEqual(rows[i][j - i - 1], expected)
+
+	def test_empty_batch(self):
+		self.assertEqual(len(pairwise_distances([], (2, 2))), 0)
+
+
+class TestEdits(unittest.TestCase):
+	def test_random_pairs(self):
+		random.seed(2)
+		for _ in range(30):
+			size = random.randint(1, 8), random.randint(2, 8)
+			first = random_directions(size, random.randint(0, 200))
+			second = random_directions(size, random.randint(0, 200))
+			edits = origin_shift_edits(first, second, size)
+			self.assertEqual(apply_edits(first, size, edits), second)
+		self.assertEqual(origin_shift_edits(first, first, size), [])
+
+	def test_invalid_edits(self):
+		directions = default_directions((3, 3))
+		# the origin of the default maze is the last node, in the bottom right corner
+		self.assertEqual(apply_edits(directions, (3, 3), [7, 6])[6], ORIGIN)
+		for node in (6, 2, 9, -1):
+			with self.assertRaises(ValueError):
+				apply_edits(directions, (3, 3), [node])
+		with self.assertRaises(ValueError):
+			apply_edits(directions, (3, 3), [7, 8, 5, 2, 3])
+
+	def test_single_origin(self):
+		several_origins = default_directions((4, 4))
+		several_origins[0] = ORIGIN
+		with self.assertRaises(ValueError):
+			origin_shift_edits(several_origins, default_directions((4, 4)), (4, 4))
+		with self.assertRaises(ValueError):
+			origin_shift_edits(default_directions((4, 4)), several_origins, (4, 4))
+		with self.assertRaises(ValueError):
+			apply_edits(several_origins, (4, 4), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
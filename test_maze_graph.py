@@ -0,0 +1,122 @@
+import random
+import unittest
+
+from data_only_script import decode_maze, direct_pathing, encode_maze, generate_default_maze, origin_shift
+from topology import Hex
+
+try:
+	import networkx as nx
+except ImportError:
+	nx = None
+else:
+	from maze_graph import DirectionsMaze, GridAdjacency, MazeDiGraph, MazeGraph
+
+
+def random_maze(size, nb_steps, seed=0):
+	random.seed(seed)
+	maze = generate_default_maze(size)
+	origin = size[0] - 1, size[1] - 1
+	for _ in range(nb_steps):
+		origin = origin_shift(maze, origin)
+	return maze, origin
+
+
+@unittest.skipIf(nx is None, "networkx is not installed")
+class TestMazeGraph(unittest.TestCase):
+	def test_undirected_view(self):
+		maze, _ = random_maze((6, 9), 500)
+		graph = MazeGraph(maze)
+		self.assertEqual(len(graph), 54)
+		self.assertEqual(graph.number_of_edges(), 53)
+		self.assertTrue(nx.is_tree(graph))
+		self.assertEqual(nx.shortest_path(graph, (5, 0), (0, 8)), direct_pathing(maze, (5, 0), (0, 8)))
+
+	def test_directed_view(self):
+		maze, origin = random_maze((5, 5), 300)
+		graph = MazeDiGraph(maze)
+		self.assertEqual([node for node, degree in graph.out_degree() if degree == 0], [origin])
+		for node, parent in maze.items():
+			self.assertEqual(list(graph.successors(node)), [] if parent is None else [parent])
+			self.assertEqual(set(graph.predecessors(node)), {child for child, p in maze.items() if p == node})
+		self.assertTrue(nx.is_arborescence(graph.reverse(copy=True)))
+
+	def test_views_follow_the_maze(self):
+		maze, origin = random_maze((5, 5), 0)
+		graph = MazeDiGraph(maze)
+		undirected = graph.undirected_view()
+		for _ in range(100):
+			origin = origin_shift(maze, origin)
+			self.assertEqual(list(graph.successors(origin)), [])
+		self.assertTrue(nx.is_tree(undirected))
+		self.assertEqual(set(undirected.edges), set(MazeGraph(dict(maze)).edges))
+
+	def test_read_only(self):
+		graph = MazeGraph(random_maze((3, 3), 10)[0])
+		with self.assertRaises(nx.NetworkXError):
+			graph.add_edge((0, 0), (2, 2))
+		copy = graph.copy()
+		copy.add_edge((0, 0), (2, 2))
+		self.assertEqual(copy.number_of_edges(), graph.number_of_edges() + 1)
+
+	def test_list_mazes(self):
+		topology = Hex(4, 5)
+		maze, origin = topology.default_maze(), topology.origin
+		random.seed(1)
+		for _ in range(300):
+			origin = origin_shift(maze, origin, topology.adjacency)
+		graph = MazeGraph(maze, topology.adjacency)
+		self.assertTrue(nx.is_tree(graph))
+		self.assertEqual(nx.shortest_path(graph, 0, 19), direct_pathing(maze, 0, 19))
+		self.assertNotIn(20, graph)
+		with self.assertRaises(ValueError):
+			MazeGraph(maze)
+
+	def test_directions_maze(self):
+		size = 4, 6
+		maze, _ = random_maze(size, 200)
+		directions = encode_maze(maze, size)
+		parents = DirectionsMaze(directions, size[1])
+		decoded = decode_maze(directions, size)
+		for index in range(len(parents)):
+			parent = decoded[divmod(index, size[1])]
+			self.assertEqual(parents[index], None if parent is None else parent[0] * size[1] + parent[1])
+		adjacency = GridAdjacency(*size)
+		self.assertEqual(adjacency[0], (6, 1))
+		self.assertEqual(adjacency[9], (3, 15, 8, 10))
+		with self.assertRaises(IndexError):
+			adjacency[24]
+		self.assertTrue(nx.is_tree(MazeGraph(parents, adjacency)))
+
+
+@unittest.skipIf(nx is None, "networkx is not installed")
+class TestGuiGraph(unittest.TestCase):
+	def setUp(self):
+		try:
+			import tkinter
+		except ImportError:
+			self.skipTest("tkinter is not installed")
+		try:
+			self.root = tkinter.Tk()
+		except tkinter.TclError as error:
+			self.skipTest(f"no display: {error}")
+		self.addCleanup(self.root.destroy)
+
+	def test_view_follows_redraw_and_resize(self):
+		from interface_script import Maze
+		from Vectors import Vector2i
+
+		maze = Maze(self.root, Vector2i(6, 8))
+		maze.redraw()
+		graph = maze.graph
+		for _ in range(20):
+			maze.step()
+		maze.resize(Vector2i(9, 5))
+		self.assertIs(maze.graph, graph)
+		self.assertEqual(len(graph), 45)
+		self.assertTrue(nx.is_tree(graph.undirected_view()))
+		maze.redraw()
+		self.assertEqual([node for node, degree in graph.out_degree() if degree == 0], [44])
+
+
+if __name__ == '__main__':
+	unittest.main()
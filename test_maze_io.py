@@ -0,0 +1,97 @@
+import io
+import random
+import struct
+import unittest
+import zlib
+
+from data_only_script import ORIGIN, UP, RIGHT
+from maze_io import (
+	decode_json_line, encode_json_line, encode_record, iter_records, maze_image_rows, pack_directions, read_record,
+	unpack_directions, write_maze_png
+)
+from test_utils import random_directions
+
+
+class TestPacking(unittest.TestCase):
+	def test_round_trip_of_every_length(self):
+		random.seed(1)
+		for nb_nodes in range(0, 40):
+			directions = bytearray(random.randint(UP, RIGHT) for _ in range(nb_nodes))
+			packed = pack_directions(directions)
+			self.assertEqual(len(packed), (nb_nodes + 3) // 4)
+			self.assertEqual(unpack_directions(packed, nb_nodes), directions)
+
+
+class TestRecords(unittest.TestCase):
+	def test_round_trip(self):
+		mazes = [
+			(random_directions((7, 5), 300, seed=2), (7, 5), 0),
+			(random_directions((1, 9), 50, seed=3), (1, 9), 1),
+			(random_directions((6, 6), 200, nb_origins=4, seed=4), (6, 6), 2 ** 40),
+		]
+		stream = io.BytesIO(b''.join(encode_record(*maze) for maze in mazes))
+		self.assertEqual(list(iter_records(stream)), mazes)
+		self.assertIsNone(read_record(stream))
+
+	def test_origins_are_restored(self):
+		# origins merge when they meet, they are kept apart by not moving them
+		directions = random_directions((8, 8), 0, nb_origins=3, seed=5)
+		restored, _, _ = read_record(io.BytesIO(encode_record(directions, (8, 8))))
+		origins = [i for i, code in enumerate(directions) if code == ORIGIN]
+		self.assertEqual(len(origins), 3)
+		self.assertEqual([i for i, code in enumerate(restored) if code == ORIGIN], origins)
+
+	def test_truncated_record(self):
+		record = encode_record(random_directions((5, 5), 100, seed=0), (5, 5))
+		for length in (3, len(record) - 1):
+			with self.assertRaises(ValueError):
+				read_record(io.BytesIO(record[:length]))
+
+	def test_bad_magic(self):
+		record = encode_record(random_directions((5, 5), 100, seed=0), (5, 5))
+		with self.assertRaises(ValueError):
+			read_record(io.BytesIO(b'XXXX' + record[4:]))
+
+
+class TestJsonLines(unittest.TestCase):
+	def test_round_trip(self):
+		directions = random_directions((4, 11), 400, nb_origins=2, seed=6)
+		line = encode_json_line(directions, (4, 11), 7)
+		self.assertTrue(line.endswith('\n'))
+		self.assertEqual(decode_json_line(line), (directions, (4, 11), 7))
+
+
+class TestPng(unittest.TestCase):
+	def read_png(self, data: bytes) -> tuple[int, int, list[bytes]]:
+		self.assertEqual(data[:8], b'\x89PNG\r\n\x1a\n')
+		chunks = {}
+		position = 8
+		while position < len(data):
+			length, = struct.unpack('>I', data[position:position + 4])
+			kind, content = data[position + 4:position + 8], data[position + 8:position + 8 + length]
+			crc, = struct.unpack('>I', data[position + 8 + length:position + 12 + length])
+			self.assertEqual(crc, zlib.crc32(kind + content))
+			chunks[kind] = content
+			position += 12 + length
+		width, height = struct.unpack('>II', chunks[b'IHDR'][:8])
+		raw = zlib.decompress(chunks[b'IDAT'])
+		line = 1 + 3 * width
+		return width, height, [raw[i + 1:i + line] for i in range(0, len(raw), line)]
+
+	def test_maze_png(self):
+		directions = random_directions((3, 4), 100, seed=8)
+		stream = io.BytesIO()
+		write_maze_png(stream, directions, (3, 4), scale=2)
+		self.assertEqual(self.read_png(stream.getvalue()), maze_image_rows(directions, (3, 4), 2))
+
+	def test_passages(self):
+		# the default maze goes right along every row, then down along the last column
+		width, height, rows = maze_image_rows(random_directions((2, 3), 0, seed=0), (2, 3))
+		self.assertEqual((width, height), (7, 5))
+		white, black = b'\xff\xff\xff', b'\x00\x00\x00'
+		self.assertEqual(rows[1], black + white * 5 + black)
+		self.assertEqual(rows[2], black * 5 + white + black)
+
+
+if __name__ == '__main__':
+	unittest.main()
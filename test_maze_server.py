@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+import unittest
+
+from data_only_script import encode_maze
+from maze_server import HISTORY_SIZE, HostedMaze, MazeServer, parse_maze_option
+
+
+def apply_changes(directions: bytearray, changes: dict[int, int]) -> bytearray:
+	directions = bytearray(directions)
+	for index, code in changes.items():
+		directions[index] = code
+	return directions
+
+
+class TestHostedMaze(unittest.TestCase):
+	def setUp(self):
+		random.seed(0)
+
+	def test_directions_follow_the_maze(self):
+		for mode, nb_origins in (('uniform', 1), ('multi', 5)):
+			maze = HostedMaze('test', (9, 7), mode, nb_origins, steps_per_tick=3)
+			for _ in range(50):
+				maze.advance()
+				self.assertEqual(maze.directions, encode_maze(maze.maze, (9, 7)))
+			self.assertEqual(maze.step, 150)
+
+	def test_changes_since(self):
+		maze = HostedMaze('test', (6, 6), steps_per_tick=2)
+		snapshots = {maze.step: bytearray(maze.directions)}
+		for _ in range(20):
+			maze.advance()
+			snapshots[maze.step] = bytearray(maze.directions)
+		for step, directions in snapshots.items():
+			self.assertEqual(apply_changes(directions, maze.changes_since(step)), maze.directions)
+		self.assertEqual(maze.changes_since(maze.step), {})
+
+	def test_history_is_bounded(self):
+		maze = HostedMaze('test', (4, 4))
+		for _ in range(HISTORY_SIZE + 10):
+			maze.advance()
+		self.assertIsNone(maze.changes_since(0))
+		self.assertIsNone(maze.delta_event(0))
+		self.assertIsNotNone(maze.changes_since(maze.step - HISTORY_SIZE))
+
+	def test_delta_events_are_shared(self):
+		maze = HostedMaze('test', (5, 5))
+		maze.advance()
+		self.assertIs(maze.delta_event(0), maze.delta_event(0))
+
+	def test_invalid_mazes(self):
+		for size, mode in (((0, 5), 'uniform'), ((1, 1), 'uniform'), ((5, 5), 'weighted')):
+			with self.assertRaises(ValueError):
+				HostedMaze('test', size, mode)
+
+	def test_parse_maze_option(self):
+		self.assertEqual(parse_maze_option('demo:32:16'), ('demo', (32, 16), 'uniform', 1))
+		self.assertEqual(parse_maze_option('crowd:8:8:multi:4'), ('crowd', (8, 8), 'multi', 4))
+
+
+class TestMazeServer(unittest.IsolatedAsyncioTestCase):
+	async def asyncSetUp(self):
+		random.seed(0)
+		# the mazes only advance when the test asks, the scheduler is not started
+		self.server = MazeServer()
+		self.listener = await asyncio.start_server(self.server.handle, '127.0.0.1', 0)
+		self.port = self.listener.sockets[0].getsockname()[1]
+
+	async def asyncTearDown(self):
+		self.listener.close()
+		await self.listener.wait_closed()
+
+	async def request(self, method: str, target: str, headers: str = '') -> tuple[int, object]:
+		reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+		writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+		await writer.drain()
+		response = await reader.read()
+		writer.close()
+		head, _, body = response.partition(b'\r\n\r\n')
+		return int(head.split()[1]), json.loads(body)
+
+	async def read_event(self, reader: asyncio.StreamReader) -> tuple[str, dict]:
+		name = (await reader.readline()).decode().removeprefix('event: ').strip()
+		data = json.loads((await reader.readline()).decode().removeprefix('data: '))
+		self.assertEqual(await reader.readline(), b'\n')
+		return name, data
+
+	async def test_routes(self):
+		status, info = await self.request('POST', '/mazes/demo?rows=6&cols=8')
+		self.assertEqual((status, info["rows"], info["cols"]), (201, 6, 8))
+		self.assertEqual((await self.request('POST', '/mazes/demo'))[0], 409)
+		self.assertEqual((await self.request('POST', '/mazes/big?rows=100000'))[0], 400)
+		status, mazes = await self.request('GET', '/mazes')
+		self.assertEqual([maze["name"] for maze in mazes], ['demo'])
+		status, snapshot = await self.request('GET', '/mazes/demo')
+		self.assertEqual((status, len(snapshot["directions"])), (200, 48))
+		self.assertEqual((await self.request('DELETE', '/mazes/demo'))[0], 200)
+		self.assertEqual((await self.request('GET', '/mazes/demo'))[0], 404)
+
+	async def test_content_length(self):
+		for value in ('abc', '-4', '1.5'):
+			with self.subTest(value=value):
+				status, error = await self.request('POST', '/mazes/demo', f"Content-Length: {value}\r\n")
+				self.assertEqual((status, error), (400, {"error": "invalid Content-Length"}))
+		self.assertEqual(self.server.mazes, {})
+		status, info = await self.request('POST', '/mazes/demo?rows=3&cols=3', "Content-Length: 0\r\n")
+		self.assertEqual((status, info["name"]), (201, 'demo'))
+
+	async def test_events(self):
+		maze = self.server.add_maze('demo', (7, 7))
+		reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+		writer.write(b"GET /mazes/demo/events HTTP/1.1\r\n\r\n")
+		await writer.drain()
+		while await reader.readline() != b'\r\n':
+			pass
+		name, snapshot = await self.read_event(reader)
+		self.assertEqual(name, 'snapshot')
+		directions = bytearray(snapshot["directions"].encode()).translate(bytes(48) + bytes(range(10)) + bytes(198))
+		for _ in range(5):
+			# several ticks before the viewer reads are merged in a single event
+			maze.advance()
+			maze.advance()
+			name, delta = await self.read_event(reader)
+			self.assertEqual(name, 'delta')
+			self.assertEqual(delta["step"], maze.step)
+			directions = apply_changes(directions, dict(zip(delta["indexes"], delta["codes"])))
+			self.assertEqual(directions, maze.directions)
+		self.server.remove_maze('demo')
+		self.assertEqual((await self.read_event(reader))[0], 'closed')
+		writer.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+
+from data_only_script import origin_shift
+from maze_snapshot import PagedMaze
+from topology import Grid2D
+
+
+class TestPagedMaze(unittest.TestCase):
+	def setUp(self):
+		self.topology = Grid2D(12, 10)
+		self.parents = self.topology.default_maze()
+
+	def test_list_behaviour(self):
+		maze = PagedMaze(self.parents, page_size=16)
+		self.assertEqual(len(maze), 120)
+		self.assertEqual(list(maze), self.parents)
+		self.assertEqual(maze.to_list(), self.parents)
+		self.assertEqual([maze[index] for index in range(120)], self.parents)
+		maze[17] = None
+		self.assertIsNone(maze[17])
+		self.assertEqual(maze.to_list()[:17], self.parents[:17])
+		self.assertEqual(len(PagedMaze()), 0)
+
+	def test_page_size(self):
+		self.assertEqual(PagedMaze(self.parents, page_size=1).page_size, 1)
+		for page_size in (0, 3, 12):
+			with self.assertRaises(ValueError):
+				PagedMaze(self.parents, page_size=page_size)
+
+	def test_forks_are_independent(self):
+		trunk = PagedMaze(self.parents, page_size=16)
+		first, second = trunk.fork(), trunk.fork()
+		self.assertEqual((trunk.nb_private_pages(), first.nb_private_pages()), (0, 0))
+		first[0] = 1
+		second[119] = 118
+		self.assertEqual(trunk.to_list(), self.parents)
+		self.assertEqual((first[0], second[0]), (1, self.parents[0]))
+		self.assertEqual((first.nb_private_pages(), second.nb_private_pages()), (1, 1))
+		# a page already copied is written in place
+		first[1] = 2
+		self.assertEqual(first.nb_private_pages(), 1)
+		trunk[0] = None
+		self.assertEqual(first[0], 1)
+
+	def test_page_copies_per_step(self):
+		# 4096 pages of one node, under a root table and two levels of tables
+		topology = Grid2D(64, 64)
+		trunk = PagedMaze(topology.default_maze(), page_size=1)
+		self.assertEqual(trunk.nb_private_pages(), 4096)
+		branch = trunk.fork()
+		random.seed(0)
+		origin, written = topology.origin, set()
+		for _ in range(200):
+			nb_private_pages = branch.nb_private_pages()
+			new_origin = origin_shift(branch, origin, topology.adjacency)
+			# an origin shift writes the old and the new origin, and only copies the pages it writes in for the first time
+			self.assertLessEqual(branch.nb_private_pages() - nb_private_pages, 2)
+			written |= {origin, new_origin}
+			self.assertEqual(branch.nb_private_pages(), len(written))
+			origin = new_origin
+			# besides its pages, the branch only copied the root table and the tables leading to them
+			self.assertLessEqual(len(branch._PagedMaze__owned), 1 + 3 * len(written))
+		self.assertEqual(trunk.nb_private_pages(), 0)
+		self.assertEqual(trunk.to_list(), topology.default_maze())
+		self.assertEqual(sorted(branch.changed_pages(trunk)), sorted(written))
+
+	def test_branches_match_list_mazes(self):
+		trunk = PagedMaze(self.parents, page_size=8)
+		for seed in range(5):
+			branch, maze = trunk.fork(), list(self.parents)
+			random.seed(seed)
+			origin = self.topology.origin
+			for _ in range(300):
+				origin = origin_shift(branch, origin, self.topology.adjacency)
+			random.seed(seed)
+			origin = self.topology.origin
+			for _ in range(300):
+				origin = origin_shift(maze, origin, self.topology.adjacency)
+			self.assertEqual(branch.to_list(), maze)
+		self.assertEqual(trunk.to_list(), self.parents)
+
+	def test_diff(self):
+		trunk = PagedMaze(self.parents, page_size=16)
+		first, second = trunk.fork(), trunk.fork()
+		random.seed(0)
+		for branch in (first, second):
+			origin = self.topology.origin
+			for _ in range(50):
+				origin = origin_shift(branch, origin, self.topology.adjacency)
+		expected = {
+			index: (parent, other_parent)
+			for index, (parent, other_parent) in enumerate(zip(first.to_list(), second.to_list()))
+			if parent != other_parent
+		}
+		self.assertEqual(first.diff(second), expected)
+		self.assertLessEqual({index // 16 for index in expected}, set(first.changed_pages(second)))
+		self.assertEqual(first == second, not expected)
+		# a page copied then restored is compared but has no change
+		fork = first.fork()
+		fork[0] = fork[0]
+		self.assertEqual(fork.changed_pages(first), [0])
+		self.assertEqual(fork.diff(first), {})
+		self.assertEqual(fork, first)
+		with self.assertRaises(ValueError):
+			first.changed_pages(PagedMaze(self.parents, page_size=32))
+		with self.assertRaises(ValueError):
+			first.diff(PagedMaze(self.parents[:-1], page_size=16))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,160 @@
+import random
+import unittest
+
+from data_only_script import DIRECTION_OFFSETS, ORIGIN, default_directions
+from maze_view import is_solution_kept, node_at_pixel, solution_children, solution_path, visible_range
+from test_utils import random_directions
+
+SPACING, START, RADIUS = 50, (20, 20), 5
+
+
+def screen_position(node, view, zoom) -> tuple[float, float]:
+	row, col = node
+	return (START[0] + col * SPACING - view[0]) * zoom, (START[1] + row * SPACING - view[1]) * zoom
+
+
+def parent_getter(directions, cols):
+	def get_parent(node):
+		offset = DIRECTION_OFFSETS[directions[node]]
+		return None if offset is None else node + offset[0] * cols + offset[1]
+	return get_parent
+
+
+class TestViewport(unittest.TestCase):
+	# (view, zoom) at the default position, panned, zoomed in and out, and panned outside the maze
+	VIEWS = (((0, 0), 1.0), ((130.5, -40), 1.0), ((75, 260), 2.5), ((-300, 410.25), 0.3), ((5000, 5000), 1.0))
+
+	def test_visible_range(self):
+		size, viewport = (40, 30), (400, 300)
+		for view, zoom in self.VIEWS:
+			with self.subTest(view=view, zoom=zoom):
+				row0, row1, col0, col1 = visible_range(size, viewport, view, zoom, SPACING, START)
+				for row in range(size[0]):
+					for col in range(size[1]):
+						x, y = screen_position((row, col), view, zoom)
+						is_kept = row0 <= row < row1 and col0 <= col < col1
+						# every node on the canvas is kept, the kept nodes are at most one node away from the canvas
+						if 0 <= x <= viewport[0] and 0 <= y <= viewport[1]:
+							self.assertTrue(is_kept, (row, col))
+						if is_kept:
+							margin = SPACING * zoom
+							self.assertTrue(-margin <= x <= viewport[0] + margin, (row, col))
+							self.assertTrue(-margin <= y <= viewport[1] + margin, (row, col))
+		self.assertEqual(visible_range(size, viewport, (0, 0), 1.0, SPACING, START), (0, 7, 0, 9))
+		# past the maze, the ranges are empty
+		row0, row1, col0, col1 = visible_range(size, viewport, (5000, 5000), 1.0, SPACING, START)
+		self.assertTrue(row0 >= row1 and col0 >= col1)
+		self.assertEqual(visible_range(size, viewport, (0, 0), 0.001, SPACING, START), (0, 40, 0, 30))
+
+	def test_node_at_pixel(self):
+		size = 12, 9
+		for view, zoom in self.VIEWS:
+			with self.subTest(view=view, zoom=zoom):
+				for node in ((0, 0), (5, 3), (11, 8)):
+					x, y = screen_position(node, view, zoom)
+					self.assertEqual(node_at_pixel(x, y, size, view, zoom, SPACING, START, RADIUS), node)
+					inside = (RADIUS - 1) * zoom
+					self.assertEqual(node_at_pixel(x + inside, y, size, view, zoom, SPACING, START, RADIUS), node)
+					self.assertEqual(node_at_pixel(x, y - inside, size, view, zoom, SPACING, START, RADIUS), node)
+					# between the circles of 2 nodes
+					outside = (RADIUS + 1) * zoom
+					self.assertIsNone(node_at_pixel(x + outside, y, size, view, zoom, SPACING, START, RADIUS))
+					self.assertIsNone(node_at_pixel(x + inside, y + inside, size, view, zoom, SPACING, START, RADIUS))
+					# in the raster, the node is a square of half the spacing
+					corner = SPACING / 4 * zoom
+					for dx, dy in ((corner, corner), (-corner, corner), (outside, -outside)):
+						self.assertEqual(
+							node_at_pixel(x + dx, y + dy, size, view, zoom, SPACING, START, RADIUS, is_rasterized=True),
+							node
+						)
+					self.assertIsNone(
+						node_at_pixel(x + corner + 1, y, size, view, zoom, SPACING, START, RADIUS, is_rasterized=True)
+					)
+				# the places of the missing nodes around the maze
+				for node in ((-1, 0), (0, -1), (12, 0), (0, 9)):
+					x, y = screen_position(node, view, zoom)
+					self.assertIsNone(node_at_pixel(x, y, size, view, zoom, SPACING, START, RADIUS))
+
+
+class TestSolution(unittest.TestCase):
+	def check_solution(self, directions, size, start, end) -> tuple[list[int], int]:
+		get_parent = parent_getter(directions, size[1])
+		path, separation = solution_path(start, end, get_parent)
+		if not path:
+			return path, separation
+		self.assertEqual((path[0], path[-1]), (start, end))
+		self.assertEqual(len(set(path)), len(path))
+		# the arrows go toward the intersection, path[separation - 1]
+		for child, parent in zip(path[:separation - 1], path[1:separation]):
+			self.assertEqual(get_parent(child), parent)
+		for parent, child in zip(path[separation - 1:], path[separation:]):
+			self.assertEqual(get_parent(child), parent)
+		self.assertEqual(solution_children(path, separation), set(path) - {path[separation - 1]})
+		return path, separation
+
+	def test_default_maze(self):
+		size = 3, 4
+		directions = default_directions(size)
+		# every node leads to the right column, then down to the origin in the bottom right corner
+		self.assertEqual(self.check_solution(directions, size, 8, 3), ([8, 9, 10, 11, 7, 3], 4))
+		self.assertEqual(self.check_solution(directions, size, 3, 11), ([3, 7, 11], 3))
+		self.assertEqual(self.check_solution(directions, size, 5, 5), ([5], 1))
+		self.assertEqual(solution_children([5], 1), set())
+
+	def test_different_trees(self):
+		size = 3, 4
+		directions = default_directions(size)
+		# the node 7 becomes an origin, cutting the nodes 3 and 7 from the tree of 11
+		directions[7] = ORIGIN
+		self.assertEqual(solution_path(8, 3, parent_getter(directions, 4)), ([], 0))
+		self.assertEqual(solution_path(3, 8, parent_getter(directions, 4)), ([], 0))
+		self.assertEqual(self.check_solution(directions, size, 3, 7), ([3, 7], 2))
+		self.assertFalse(is_solution_kept([], set(), set()))
+
+	def test_random_mazes(self):
+		random.seed(0)
+		for _ in range(30):
+			size = random.randint(1, 8), random.randint(2, 8)
+			directions = random_directions(size, random.randint(0, 200), random.choice((1, 1, 3)))
+			nb_nodes = size[0] * size[1]
+			self.check_solution(directions, size, random.randrange(nb_nodes), random.randrange(nb_nodes))
+
+	def test_kept_solution(self):
+		random.seed(1)
+		size = 6, 7
+		cols = size[1]
+		directions = random_directions(size, 100, nb_origins=2)
+		origins = {index for index, code in enumerate(directions) if code == ORIGIN}
+		get_parent = parent_getter(directions, cols)
+		start, end = (size[0] - 1) * cols, cols - 1
+		path, separation = solution_path(start, end, get_parent)
+		children = solution_children(path, separation)
+		nb_kept = 0
+		for _ in range(300):
+			# one origin shift of every origin, like a step of the GUI
+			changed, new_origins = set(origins), set()
+			for origin in origins:
+				row, col = divmod(origin, cols)
+				code = random.choice([
+					code for code, offset in enumerate(DIRECTION_OFFSETS)
+					if offset and 0 <= row + offset[0] < size[0] and 0 <= col + offset[1] < cols
+				])
+				row_offset, col_offset = DIRECTION_OFFSETS[code]
+				directions[origin] = code
+				new_origins.add(origin + row_offset * cols + col_offset)
+			for origin in new_origins:
+				directions[origin] = ORIGIN
+			changed |= new_origins
+			origins = new_origins
+			expected = solution_path(start, end, get_parent)
+			if is_solution_kept(path, children, changed):
+				nb_kept += 1
+				self.assertEqual((path, separation), expected)
+			else:
+				path, separation = expected
+				children = solution_children(path, separation)
+		self.assertTrue(0 < nb_kept < 300)
+
+
+if __name__ == '__main__':
+	unittest.main()
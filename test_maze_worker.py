@@ -0,0 +1,76 @@
+import time
+import unittest
+
+from data_only_script import ORIGIN, default_directions
+from maze_worker import BATCH_SIZE, StepWorker
+
+
+def apply_changes(directions: bytearray, changes: dict[int, int]) -> bytearray:
+	for index, code in changes.items():
+		directions[index] = code
+	return directions
+
+
+class TestStepWorker(unittest.TestCase):
+	def setUp(self):
+		self.size = 9, 11
+		self.directions = default_directions(self.size)
+		self.origin = 9 * 11 - 1
+
+	def test_net_changes(self):
+		worked = bytearray(self.directions)
+		worker = StepWorker(self.size, worked, {self.origin}, {self.origin: 1}, nb_steps=3 * BATCH_SIZE + 5)
+		self.assertFalse(worker.is_auto_playing)
+		worker.start()
+		worker.join(timeout=10)
+		self.assertFalse(worker.is_alive())
+		changes, nb_steps = worker.collect()
+		self.assertEqual(nb_steps, 3 * BATCH_SIZE + 5)
+		# only the latest direction of every node is kept, and applying it gives the maze of the worker
+		self.assertEqual(apply_changes(bytearray(self.directions), changes), worked)
+		self.assertLess(len(changes), 2 * nb_steps)
+		self.assertEqual(worked.count(ORIGIN), 1)
+		self.assertEqual(worker.collect(), ({}, 0))
+
+	def test_auto_play(self):
+		worked, shown = bytearray(self.directions), bytearray(self.directions)
+		origins = {self.origin, 0, 50}
+		for origin in origins:
+			worked[origin] = shown[origin] = ORIGIN
+		worker = StepWorker(self.size, worked, origins, {}, steps_per_frame=7)
+		self.assertTrue(worker.is_auto_playing)
+		worker.start()
+		nb_frames, deadline = 0, time.monotonic() + 10
+		while nb_frames < 20 and time.monotonic() < deadline:
+			changes, nb_steps = worker.collect()
+			if nb_steps:
+				# the worker waits for every frame to be collected before doing the next one
+				self.assertEqual(nb_steps, 7)
+				apply_changes(shown, changes)
+				nb_frames += 1
+			time.sleep(0.001)
+		worker.stop()
+		worker.join(timeout=10)
+		self.assertFalse(worker.is_alive())
+		changes, nb_steps = worker.collect()
+		self.assertIn(nb_steps, (0, 7))
+		self.assertEqual(nb_frames, 20)
+		self.assertEqual(apply_changes(shown, changes), worked)
+		# origins moving onto each other merge
+		self.assertTrue(1 <= worked.count(ORIGIN) <= 3)
+
+	def test_weights(self):
+		# the origin in the corner has 2 neighbours, the visited one is chosen about 1 time in 1001
+		size = 2, 2
+		nb_chosen = 0
+		for _ in range(200):
+			worked = default_directions(size)
+			worker = StepWorker(size, worked, {3}, {1: 1000}, nb_steps=1)
+			worker.start()
+			worker.join(timeout=10)
+			nb_chosen += worked[1] == ORIGIN
+		self.assertLessEqual(nb_chosen, 3)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,146 @@
+import random
+import unittest
+
+from data_only_script import (
+	decode_maze, dijkstra, direct_pathing, encode_maze, generate_default_maze, multi_origins_shift, origin_shift,
+	weighted_origin_shift
+)
+from topology import Grid2D, Grid3D, Hex, RowMajor, Tiled, Torus, ZOrder
+
+ORDERINGS = (RowMajor(), ZOrder(), Tiled(3))
+
+
+def topologies():
+	for ordering in ORDERINGS:
+		yield Grid2D(5, 7, ordering=ordering)
+		yield Torus(4, 6, ordering=ordering)
+		yield Hex(6, 5, ordering=ordering)
+		yield Grid3D(3, 4, 5, ordering=ordering)
+
+
+def roots(topology, maze) -> set[int]:
+	"""
+	:return: the origins reached from every node, after checking that every parent is a neighbor
+	"""
+	found = set()
+	for node in range(topology.nb_nodes):
+		for _ in range(topology.nb_nodes):
+			parent = maze[node]
+			if parent is None:
+				break
+			assert parent in topology.adjacency[node], (node, parent)
+			node = parent
+		else:
+			raise AssertionError("cycle")
+		found.add(node)
+	return found
+
+
+class TestTopology(unittest.TestCase):
+	def test_tables(self):
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				self.assertEqual(sorted(topology.from_storage), list(range(topology.nb_nodes)))
+				for index in range(topology.nb_nodes):
+					self.assertEqual(topology.from_storage[topology.to_storage[index]], index)
+					self.assertEqual(topology.index(topology.position(index)), index)
+
+	def test_adjacency(self):
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				for node, node_neighbors in enumerate(topology.adjacency):
+					self.assertNotIn(node, node_neighbors)
+					self.assertEqual(len(set(node_neighbors)), len(node_neighbors))
+					self.assertEqual(
+						node_neighbors, tuple(topology.neighbors[topology.offsets[node]:topology.offsets[node + 1]])
+					)
+					for neighbor in node_neighbors:
+						self.assertIn(node, topology.adjacency[neighbor])
+
+	def test_neighbor_counts(self):
+		self.assertEqual({len(n) for n in Torus(4, 6).adjacency}, {4})
+		self.assertEqual(max(len(n) for n in Hex(6, 5).adjacency), 6)
+		self.assertEqual(max(len(n) for n in Grid3D(3, 4, 5).adjacency), 6)
+
+	def test_default_maze(self):
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				self.assertEqual(roots(topology, topology.default_maze()), {topology.origin})
+
+	def test_origin_shift_keeps_a_tree(self):
+		random.seed(0)
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				maze, origin = topology.default_maze(), topology.origin
+				for _ in range(20 * topology.nb_nodes):
+					origin = origin_shift(maze, origin, topology.adjacency)
+				self.assertEqual(roots(topology, maze), {origin})
+				visit_count = dict.fromkeys(range(topology.nb_nodes), 0)
+				for _ in range(20 * topology.nb_nodes):
+					origin = weighted_origin_shift(maze, origin, visit_count, topology.adjacency)
+				self.assertEqual(roots(topology, maze), {origin})
+
+	def test_multi_origins_shift_keeps_a_forest(self):
+		random.seed(1)
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				maze = topology.default_maze()
+				origins = {topology.origin, *random.sample(range(topology.nb_nodes), 3)}
+				for origin in origins:
+					maze[origin] = None
+				for _ in range(10 * topology.nb_nodes):
+					origins = multi_origins_shift(maze, origins, topology.adjacency)
+				self.assertEqual(roots(topology, maze), origins)
+
+	def test_solvers(self):
+		random.seed(2)
+		for topology in topologies():
+			with self.subTest(topology=topology):
+				maze, origin = topology.default_maze(), topology.origin
+				for _ in range(20 * topology.nb_nodes):
+					origin = origin_shift(maze, origin, topology.adjacency)
+				for _ in range(20):
+					start, end = random.sample(range(topology.nb_nodes), 2)
+					path = direct_pathing(maze, start, end)
+					# the path between two nodes of a tree is unique
+					self.assertEqual(dijkstra(maze, start, end, topology.adjacency), path)
+					self.assertEqual((path[0], path[-1]), (start, end))
+					for node, next_node in zip(path, path[1:]):
+						self.assertTrue(maze[node] == next_node or maze[next_node] == node)
+
+	def test_grid_matches_dict_mazes(self):
+		random.seed(3)
+		size = 6, 4
+		maze = generate_default_maze(size)
+		origin = size[0] - 1, size[1] - 1
+		for _ in range(200):
+			origin = origin_shift(maze, origin)
+		directions = encode_maze(maze, size)
+		for ordering in ORDERINGS:
+			with self.subTest(ordering=ordering):
+				grid = Grid2D(*size, ordering=ordering)
+				self.assertEqual(grid.directions(grid.default_maze()), encode_maze(generate_default_maze(size), size))
+				index_maze = grid.from_directions(directions)
+				self.assertEqual(grid.directions(index_maze), directions)
+				start, end = grid.index((5, 0)), grid.index((0, 3))
+				self.assertEqual(
+					[grid.position(node) for node in direct_pathing(index_maze, start, end)],
+					direct_pathing(decode_maze(directions, size), (5, 0), (0, 3))
+				)
+
+	def test_orderings(self):
+		self.assertEqual(list(Grid2D(4, 4, ordering=ZOrder()).from_storage[:8]), [0, 1, 4, 5, 2, 3, 6, 7])
+		self.assertEqual(list(Grid2D(4, 4, ordering=Tiled(2)).from_storage[:8]), [0, 1, 4, 5, 2, 3, 6, 7])
+		# the last tiles of a layout which is not a multiple of the tile size are smaller
+		self.assertEqual(list(Grid2D(3, 3, ordering=Tiled(2)).from_storage), [0, 1, 3, 4, 2, 5, 6, 7, 8])
+		with self.assertRaises(ValueError):
+			Tiled(0)
+
+	def test_invalid_shapes(self):
+		for shape in ((0, 5), (1, 1)):
+			with self.assertRaises(ValueError):
+				Grid2D(*shape)
+
+
+if __name__ == '__main__':
+	unittest.main()
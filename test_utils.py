@@ -0,0 +1,22 @@
+"""
+Helpers shared by the tests.
+"""
+import random
+
+from data_only_script import encode_maze, generate_default_maze, multi_origins_shift, origin_shift
+
+
+def random_directions(size, nb_steps, nb_origins=1, seed=None) -> bytearray:
+	"""
+	:param seed: seed of the random module, if given
+	:return: direction codes of a default maze with nb_origins origins, after nb_steps origin-shift steps
+	"""
+	if seed is not None:
+		random.seed(seed)
+	maze = generate_default_maze(size)
+	origins = {(size[0] - 1, size[1] - 1), *random.sample(sorted(maze), nb_origins - 1)}
+	for origin in origins:
+		maze[origin] = None
+	for _ in range(nb_steps):
+		origins = {origin_shift(maze, *origins)} if len(origins) == 1 else multi_origins_shift(maze, origins)
+	return encode_maze(maze, size)
@@ -0,0 +1,325 @@
+"""
+Layouts of the nodes of a maze, compiled once into flat arrays so that the origin-shift functions of data_only_script
+run on any of them the same way.
+
+A compiled topology identifies its nodes by their index. A maze on a topology is a list with the index of the parent of
+every node, None for the origins, and can be given with ``topology.adjacency`` to ``origin_shift``,
+``weighted_origin_shift``, ``multi_origins_shift``, ``dijkstra`` and ``direct_pathing``::
+
+	topology = Grid3D(10, 10, 10)
+	maze = topology.default_maze()
+	origin = topology.origin
+	for _ in range(10 * topology.nb_nodes):
+		origin = origin_shift(maze, origin, topology.adjacency)
+
+The nodes are stored in the order given by the cell ordering of the topology. With the default row by row order, the
+index of a node is row * cols + col. On very large mazes, the Z-order or tiled orders store the nodes close to each
+other in the maze close to each other in memory too, which makes long walks in the maze faster.
+"""
+import math
+from array import array
+from itertools import product
+
+from data_only_script import ORIGIN, UP, DOWN, LEFT, RIGHT
+
+IndexMaze = list[int | None]
+Shape = tuple[int, ...]
+
+
+# region cell_ordering
+class CellOrdering:
+	"""
+	Order in which the nodes of a layout are stored.
+	"""
+	def tables(self, shape: Shape) -> tuple[array, array]:
+		"""
+		:return: (to_storage, from_storage). to_storage maps the row by row index of a node to its storage index,
+			from_storage is the inverse table
+		"""
+		keys = self._keys(shape)
+		from_storage = array('Q', sorted(range(len(keys)), key=keys.__getitem__))
+		to_storage = array('Q', bytes(8 * len(keys)))
+		for storage_index, index in enumerate(from_storage):
+			to_storage[index] = storage_index
+		return to_storage, from_storage
+
+	def _keys(self, shape: Shape) -> list[int]:
+		"""
+		:return: the sort key of every node, row by row
+		"""
+		raise NotImplementedError
+
+
+class RowMajor(CellOrdering):
+	def tables(self, shape: Shape) -> tuple[array, array]:
+		identity = array('Q', range(math.prod(shape)))
+		return identity, array('Q', identity)
+
+	def __repr__(self) -> str:
+		return "RowMajor()"
+
+
+class ZOrder(CellOrdering):
+	"""
+	Morton order: the bits of the coordinates are interleaved, so that every aligned square of 2^k by 2^k nodes is stored
+	contiguously.
+	"""
+	def _keys(self, shape: Shape) -> list[int]:
+		nb_axes = len(shape)
+		nb_bits = max(size - 1 for size in shape).bit_length()
+		# interleaved bits of every value of every coordinate
+		spread_tables = []
+		for axis, size in enumerate(shape):
+			shift = nb_axes - 1 - axis
+			spread_tables.append([
+				sum(((value >> bit) & 1) << (bit * nb_axes + shift) for bit in range(nb_bits)) for value in range(size)
+			])
+		if nb_axes == 2:
+			rows_bits, cols_bits = spread_tables
+			return [row_bits | col_bits for row_bits in rows_bits for col_bits in cols_bits]
+		return [sum(bits) for bits in product(*spread_tables)]
+
+	def __repr__(self) -> str:
+		return "ZOrder()"
+
+
+class Tiled(CellOrdering):
+	"""
+	The layout is cut in tiles of `tile_size` nodes along every coordinate. The tiles are stored one after the other,
+	and the nodes of a tile row by row.
+	"""
+	def __init__(self, tile_size: int = 32) -> None:
+		if tile_size < 1:
+			raise ValueError("The tiles need at least 1 node")
+		self.tile_size: int = tile_size
+
+	def _keys(self, shape: Shape) -> list[int]:
+		tile_size = self.tile_size
+		tile_volume = tile_size ** len(shape)
+		nb_tiles = [-(-size // tile_size) for size in shape]
+		keys = []
+		for position in product(*map(range, shape)):
+			tile = offset = 0
+			for coordinate, tiles in zip(position, nb_tiles):
+				tile = tile * tiles + coordinate // tile_size
+				offset = offset * tile_size + coordinate % tile_size
+			keys.append(tile * tile_volume + offset)
+		return keys
+
+	def __repr__(self) -> str:
+		return f"Tiled({self.tile_size})"
+
+
+# endregion cell_ordering
+
+
+class Topology:
+	"""
+	Base class of the layouts. A layout only describes the neighbors and the default parent of a node from its row by
+	row index, everything else is computed once by the constructor, in storage order.
+
+	:ivar ordering: order in which the nodes are stored
+	:ivar to_storage: row by row index -> storage index
+	:ivar from_storage: storage index -> row by row index
+	:ivar shape: size of the layout along each of its coordinates
+	:ivar nb_nodes: number of nodes
+	:ivar offsets: the neighbors of node i are neighbors[offsets[i]:offsets[i + 1]]
+	:ivar neighbors: the neighbors of every node, one node after the other
+	:ivar adjacency: tuple of the neighbors of every node, the fastest access for the origin-shift steps
+	:ivar default_parents: a spanning tree of the layout, with a single origin
+	:ivar origin: the origin of the default spanning tree
+	"""
+	def __init__(self, *shape: int, ordering: CellOrdering | None = None) -> None:
+		if any(n < 1 for n in shape) or math.prod(shape) < 2:
+			raise ValueError(f"Invalid shape {shape} for {type(self).__name__}")
+		self.shape: Shape = shape
+		self.nb_nodes: int = math.prod(shape)
+		self.ordering: CellOrdering = RowMajor() if ordering is None else ordering
+		self.to_storage, self.from_storage = self.ordering.tables(shape)
+		to_storage = self.to_storage
+		self.offsets: array = array('Q', [0])
+		self.neighbors: array = array('Q')
+		# the neighbor tuples share the same int objects, instead of one object per neighbor
+		nodes = range(self.nb_nodes)
+		shared = list(nodes)
+		adjacency = []
+		default_parents = []
+		for index in self.from_storage:
+			node_neighbors = tuple(shared[to_storage[n]] for n in self._neighbors(index))
+			adjacency.append(node_neighbors)
+			self.neighbors.extend(node_neighbors)
+			self.offsets.append(len(self.neighbors))
+			parent = self._default_parent(index)
+			default_parents.append(None if parent is None else shared[to_storage[parent]])
+		self.adjacency: tuple[tuple[int, ...], ...] = tuple(adjacency)
+		self.default_parents: tuple[int | None, ...] = tuple(default_parents)
+		self.origin: int = self.default_parents.index(None)
+
+	def _neighbors(self, index: int) -> list[int]:
+		raise NotImplementedError
+
+	def _default_parent(self, index: int) -> int | None:
+		raise NotImplementedError
+
+	def default_maze(self) -> IndexMaze:
+		return list(self.default_parents)
+
+	def index(self, position: Shape) -> int:
+		"""
+		:return: storage index of the node at this position
+		"""
+		index = 0
+		for coordinate, size in zip(position, self.shape):
+			index = index * size + coordinate
+		return self.to_storage[index]
+
+	def position(self, index: int) -> Shape:
+		index = self.from_storage[index]
+		position = []
+		for size in reversed(self.shape):
+			index, coordinate = divmod(index, size)
+			position.append(coordinate)
+		return tuple(reversed(position))
+
+	def to_row_major(self, maze: IndexMaze) -> IndexMaze:
+		"""
+		:return: the maze with its nodes and parents in row by row order, independent of the ordering of the topology
+		"""
+		to_storage, from_storage = self.to_storage, self.from_storage
+		return [None if (parent := maze[to_storage[index]]) is None else from_storage[parent] for index in range(self.nb_nodes)]
+
+	def from_row_major(self, parents: IndexMaze) -> IndexMaze:
+		to_storage, from_storage = self.to_storage, self.from_storage
+		return [None if (parent := parents[index]) is None else to_storage[parent] for index in from_storage]
+
+	def __repr__(self) -> str:
+		arguments = [str(size) for size in self.shape]
+		if not isinstance(self.ordering, RowMajor):
+			arguments.append(f"ordering={self.ordering!r}")
+		return f"{type(self).__name__}({', '.join(arguments)})"
+
+
+class _Rectangle(Topology):
+	def __init__(self, rows: int, cols: int, ordering: CellOrdering | None = None) -> None:
+		self.rows, self.cols = rows, cols
+		super(_Rectangle, self).__init__(rows, cols, ordering=ordering)
+
+	def _default_parent(self, index: int) -> int | None:
+		# same tree as data_only_script.generate_default_maze: every row points right, the last column points down
+		if index == self.nb_nodes - 1:
+			return None
+		if index % self.cols == self.cols - 1:
+			return index + self.cols
+		return index + 1
+
+
+class Grid2D(_Rectangle):
+	"""
+	The rectangular grid of data_only_script, where a node is linked to the nodes above, below, left and right of it.
+	"""
+	def _neighbors(self, index: int) -> list[int]:
+		# same order as data_only_script.neighbors
+		cols = self.cols
+		row, col = divmod(index, cols)
+		nodes = []
+		if row > 0:
+			nodes.append(index - cols)
+		if row + 1 < self.rows:
+			nodes.append(index + cols)
+		if col > 0:
+			nodes.append(index - 1)
+		if col + 1 < cols:
+			nodes.append(index + 1)
+		return nodes
+
+	def directions(self, maze: IndexMaze) -> bytearray:
+		"""
+		:return: the direction code of every node row by row, as used by maze_io and the GUI
+		"""
+		cols = self.cols
+		codes = {-cols: UP, cols: DOWN, -1: LEFT, 1: RIGHT}
+		return bytearray(ORIGIN if parent is None else codes[parent - index] for index, parent in enumerate(self.to_row_major(maze)))
+
+	def from_directions(self, directions: bytes | bytearray) -> IndexMaze:
+		cols = self.cols
+		offsets = (None, -cols, cols, -1, 1)
+		return self.from_row_major([None if code == ORIGIN else index + offsets[code] for index, code in enumerate(directions)])
+
+
+class Torus(_Rectangle):
+	"""
+	Rectangular grid whose borders wrap around: the first and last rows are linked, like the first and last columns.
+	"""
+	def _neighbors(self, index: int) -> list[int]:
+		rows, cols = self.rows, self.cols
+		row, col = divmod(index, cols)
+		candidates = (
+			((row - 1) % rows) * cols + col, ((row + 1) % rows) * cols + col,
+			row * cols + (col - 1) % cols, row * cols + (col + 1) % cols
+		)
+		# small tori have nodes reached from several sides
+		return [n for i, n in enumerate(candidates) if n != index and n not in candidates[:i]]
+
+
+class Hex(_Rectangle):
+	"""
+	Hexagonal grid in "odd-r" offset coordinates: odd rows are shifted half a cell to the right and every node has up to
+	6 neighbors.
+	"""
+	def _neighbors(self, index: int) -> list[int]:
+		rows, cols = self.rows, self.cols
+		row, col = divmod(index, cols)
+		# the diagonal neighbors are on the left in even rows and on the right in odd rows
+		diagonal = col - 1 if row % 2 == 0 else col + 1
+		nodes = []
+		for r in (row - 1, row + 1):
+			if 0 <= r < rows:
+				nodes.append(r * cols + col)
+				if 0 <= diagonal < cols:
+					nodes.append(r * cols + diagonal)
+		if col > 0:
+			nodes.append(index - 1)
+		if col + 1 < cols:
+			nodes.append(index + 1)
+		return nodes
+
+
+class Grid3D(Topology):
+	"""
+	Layers of rectangular grids, where a node is also linked to the nodes at the same position in the layers above and
+	below it.
+	"""
+	def __init__(self, layers: int, rows: int, cols: int, ordering: CellOrdering | None = None) -> None:
+		self.layers, self.rows, self.cols = layers, rows, cols
+		super(Grid3D, self).__init__(layers, rows, cols, ordering=ordering)
+
+	def _neighbors(self, index: int) -> list[int]:
+		layer_size = self.rows * self.cols
+		layer, rest = divmod(index, layer_size)
+		row, col = divmod(rest, self.cols)
+		nodes = []
+		if layer > 0:
+			nodes.append(index - layer_size)
+		if layer + 1 < self.layers:
+			nodes.append(index + layer_size)
+		if row > 0:
+			nodes.append(index - self.cols)
+		if row + 1 < self.rows:
+			nodes.append(index + self.cols)
+		if col > 0:
+			nodes.append(index - 1)
+		if col + 1 < self.cols:
+			nodes.append(index + 1)
+		return nodes
+
+	def _default_parent(self, index: int) -> int | None:
+		# the default tree of every layer, whose origin points to the next layer
+		layer_size = self.rows * self.cols
+		if index == self.nb_nodes - 1:
+			return None
+		rest = index % layer_size
+		if rest == layer_size - 1:
+			return index + layer_size
+		if rest % self.cols == self.cols - 1:
+			return index + self.cols
+		return index + 1